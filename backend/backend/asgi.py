@@ -2,6 +2,9 @@
 ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (``uvicorn backend.asgi:application``) so the
+server-sent event endpoints in ``projects.streaming`` stream as they produce
+output instead of being buffered like under WSGI.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'projects',
     'subscriptions',
     'referrals',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -168,3 +169,103 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
 
+
+# RAG ingestion
+# Local checkouts are resolved as RAG_REPOSITORIES_ROOT / Project.repository_name
+# (names that are absolute or resolve outside the root are rejected);
+# per-project artifacts live under RAG_DATA_DIR / <project id>.
+RAG_REPOSITORIES_ROOT = Path(os.getenv('RAG_REPOSITORIES_ROOT', BASE_DIR / 'repositories'))
+RAG_DATA_DIR = Path(os.getenv('RAG_DATA_DIR', BASE_DIR / 'rag_data'))
+RAG_MAX_CHUNK_BYTES = int(os.getenv('RAG_MAX_CHUNK_BYTES', 8 * 1024))
+RAG_MAX_FILE_BYTES = int(os.getenv('RAG_MAX_FILE_BYTES', 5 * 1024 * 1024))
+# Parallel chunking: worker processes, files per pool task and chunks per
+# downstream batch (embedding/indexing).
+RAG_INGEST_WORKERS = int(os.getenv('RAG_INGEST_WORKERS', os.cpu_count() or 1))
+RAG_INGEST_FILES_PER_TASK = int(os.getenv('RAG_INGEST_FILES_PER_TASK', 32))
+RAG_INGEST_CHUNK_BATCH_SIZE = int(os.getenv('RAG_INGEST_CHUNK_BATCH_SIZE', 256))
+# Vector index: builds with at least RAG_IVF_MIN_VECTORS chunks also get an
+# IVF coarse quantiser; approximate search scans RAG_IVF_NPROBE lists.
+RAG_IVF_MIN_VECTORS = int(os.getenv('RAG_IVF_MIN_VECTORS', 100_000))
+RAG_IVF_NPROBE = int(os.getenv('RAG_IVF_NPROBE', 8))
+# Embedding cache shared by all projects, keyed by hash(model id + chunk text)
+RAG_EMBEDDING_CACHE_PATH = Path(os.getenv('RAG_EMBEDDING_CACHE_PATH', RAG_DATA_DIR / 'embedding_cache.sqlite3'))
+RAG_EMBEDDING_CACHE_MAX_BYTES = int(os.getenv('RAG_EMBEDDING_CACHE_MAX_BYTES', 1024 ** 3))
+# Embedding backend: 'hashing' (deterministic, offline), 'http' (OpenAI-
+# compatible /embeddings endpoint) or '' to build BM25-only indexes.
+RAG_EMBEDDING_BACKEND = os.getenv('RAG_EMBEDDING_BACKEND', 'hashing')
+RAG_EMBEDDING_DIM = int(os.getenv('RAG_EMBEDDING_DIM', 384))
+RAG_EMBEDDING_URL = os.getenv('RAG_EMBEDDING_URL', '')
+RAG_EMBEDDING_MODEL = os.getenv('RAG_EMBEDDING_MODEL', '')
+RAG_EMBEDDING_API_KEY = os.getenv('RAG_EMBEDDING_API_KEY', '')
+RAG_EMBEDDING_BATCH_SIZE = int(os.getenv('RAG_EMBEDDING_BATCH_SIZE', 64))
+RAG_EMBEDDING_CONCURRENCY = int(os.getenv('RAG_EMBEDDING_CONCURRENCY', 4))
+# Uploaded repository archives: compressed upload size, and limits enforced
+# while streaming members (file count, total uncompressed bytes).
+RAG_ARCHIVE_MAX_UPLOAD_BYTES = int(os.getenv('RAG_ARCHIVE_MAX_UPLOAD_BYTES', 200 * 1024 * 1024))
+RAG_ARCHIVE_MAX_FILES = int(os.getenv('RAG_ARCHIVE_MAX_FILES', 100_000))
+RAG_ARCHIVE_MAX_TOTAL_BYTES = int(os.getenv('RAG_ARCHIVE_MAX_TOTAL_BYTES', 1024 ** 3))
+# Docs panel file descriptions: 'heuristic' (docstrings/comments/symbols from
+# the chunk store), 'http' (OpenAI-compatible chat completions) or '' for none.
+# Cached across projects by blob SHA; misses are described on a thread pool.
+RAG_DOCS_DESCRIBER = os.getenv('RAG_DOCS_DESCRIBER', 'heuristic')
+RAG_DOCS_DESCRIBE_WORKERS = int(os.getenv('RAG_DOCS_DESCRIBE_WORKERS', 8))
+RAG_DOCS_CACHE_PATH = Path(os.getenv('RAG_DOCS_CACHE_PATH', RAG_DATA_DIR / 'descriptions.sqlite3'))
+RAG_DOCS_LLM_URL = os.getenv('RAG_DOCS_LLM_URL', '')
+RAG_DOCS_LLM_MODEL = os.getenv('RAG_DOCS_LLM_MODEL', '')
+RAG_DOCS_LLM_API_KEY = os.getenv('RAG_DOCS_LLM_API_KEY', '')
+# Deepest subtree one docs/nodes request may expand.
+DOCS_TREE_MAX_DEPTH = int(os.getenv('DOCS_TREE_MAX_DEPTH', 8))
+# Code search: per-request latency budget (exact search degrades to IVF or
+# BM25-only when it no longer fits), open indexes kept per process and
+# snippet length returned per hit.
+RAG_SEARCH_LATENCY_BUDGET_MS = float(os.getenv('RAG_SEARCH_LATENCY_BUDGET_MS', 50))
+RAG_SEARCH_MAX_OPEN_INDEXES = int(os.getenv('RAG_SEARCH_MAX_OPEN_INDEXES', 32))
+RAG_SEARCH_SNIPPET_CHARS = int(os.getenv('RAG_SEARCH_SNIPPET_CHARS', 600))
+RAG_SEARCH_MAX_RESULTS = int(os.getenv('RAG_SEARCH_MAX_RESULTS', 50))
+# Background jobs (jobs app, run with `python manage.py run_jobs`): the
+# database is the queue. A claimed job is leased for JOBS_LEASE_SECONDS and
+# renewed by heartbeats; failures retry after JOBS_RETRY_BACKOFF_SECONDS,
+# doubling per attempt.
+JOBS_WORKER_CONCURRENCY = int(os.getenv('JOBS_WORKER_CONCURRENCY', 4))
+JOBS_LEASE_SECONDS = int(os.getenv('JOBS_LEASE_SECONDS', 60))
+JOBS_POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', 1.0))
+JOBS_RETRY_BACKOFF_SECONDS = int(os.getenv('JOBS_RETRY_BACKOFF_SECONDS', 10))
+# Generated prompt content is cached by a fingerprint of the project fields it
+# is built from and shared across users. 0 disables expiry / the size limit.
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv('PROMPT_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+PROMPT_CACHE_MAX_ENTRIES = int(os.getenv('PROMPT_CACHE_MAX_ENTRIES', 10_000))
+# Bulk regeneration (`manage.py generate_prompts_bulk` and the admin endpoint):
+# projects per batch / bulk_update, and prompts generated at once per batch.
+PROMPT_BULK_BATCH_SIZE = int(os.getenv('PROMPT_BULK_BATCH_SIZE', 500))
+PROMPT_BULK_CONCURRENCY = int(os.getenv('PROMPT_BULK_CONCURRENCY', 4))
+# Re-read edited prompt templates (projects/prompt_templates/) without a restart.
+PROMPT_TEMPLATES_AUTO_RELOAD = os.getenv('PROMPT_TEMPLATES_AUTO_RELOAD', str(DEBUG)) == 'True'
+# Plans chat history page size (GET plans/messages/?limit=&before=) and search
+# results (GET plans/search/?q=&limit=&offset=).
+PLAN_MESSAGES_PAGE_SIZE = int(os.getenv('PLAN_MESSAGES_PAGE_SIZE', 50))
+PLAN_MESSAGES_MAX_PAGE_SIZE = int(os.getenv('PLAN_MESSAGES_MAX_PAGE_SIZE', 200))
+PLAN_SEARCH_PAGE_SIZE = int(os.getenv('PLAN_SEARCH_PAGE_SIZE', 20))
+# Only the newest matches are ranked, bounding the cost of very common terms.
+PLAN_SEARCH_MAX_CANDIDATES = int(os.getenv('PLAN_SEARCH_MAX_CANDIDATES', 2000))
+# Items accepted per request by POST/PATCH status/items/bulk/.
+STATUS_ITEMS_BULK_MAX = int(os.getenv('STATUS_ITEMS_BULK_MAX', 500))
+# Plans chat replies: estimated tokens of context per turn (system prompt,
+# rolling summary and recent messages), and the summary's share of it.
+PLAN_CONTEXT_TOKEN_BUDGET = int(os.getenv('PLAN_CONTEXT_TOKEN_BUDGET', 4000))
+PLAN_SUMMARY_MAX_TOKENS = int(os.getenv('PLAN_SUMMARY_MAX_TOKENS', 600))
+# Plans chat assistant: an OpenAI-compatible chat completions endpoint that
+# supports streaming. Without a URL a placeholder reply is streamed.
+PLAN_ASSISTANT_URL = os.getenv('PLAN_ASSISTANT_URL', '')
+PLAN_ASSISTANT_MODEL = os.getenv('PLAN_ASSISTANT_MODEL', '')
+PLAN_ASSISTANT_API_KEY = os.getenv('PLAN_ASSISTANT_API_KEY', '')
+PLAN_ASSISTANT_TIMEOUT = float(os.getenv('PLAN_ASSISTANT_TIMEOUT', 60))
+PLAN_ASSISTANT_MAX_TOKENS = int(os.getenv('PLAN_ASSISTANT_MAX_TOKENS', 1024))
+
+# Project change events streamed to the editor. The database broker reaches
+# streams in every process, including changes made by the run_jobs worker;
+# projects.events.InProcessBroker only reaches the publishing process.
+PROJECT_EVENTS_BROKER = os.getenv('PROJECT_EVENTS_BROKER', 'projects.events.DatabaseBroker')
+PROJECT_EVENTS_QUEUE_SIZE = int(os.getenv('PROJECT_EVENTS_QUEUE_SIZE', 100))
+PROJECT_EVENTS_KEEPALIVE_SECONDS = float(os.getenv('PROJECT_EVENTS_KEEPALIVE_SECONDS', 15))
+PROJECT_EVENTS_POLL_INTERVAL = float(os.getenv('PROJECT_EVENTS_POLL_INTERVAL', 0.5))
+PROJECT_EVENTS_RETENTION_SECONDS = int(os.getenv('PROJECT_EVENTS_RETENTION_SECONDS', 3600))
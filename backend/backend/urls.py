@@ -11,5 +11,6 @@ urlpatterns = [
     path('api/projects/', include('projects.urls')),
     path('api/subscriptions/', include('subscriptions.urls')),
     path('api/referrals/', include('referrals.urls')),
+    path('api/jobs/', include('jobs.urls')),
 ]
 
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'status', 'priority', 'attempts', 'project', 'user', 'created_at', 'finished_at')
+    list_filter = ('status', 'task', 'created_at')
+    search_fields = ('task', 'dedupe_key', 'user__email')
+    readonly_fields = ('locked_by', 'locked_until', 'started_at', 'finished_at', 'created_at', 'updated_at')
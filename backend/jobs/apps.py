@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+
+    def ready(self):
+        # Register every app's ``tasks`` module so handlers are known to
+        # both the web process (enqueue) and the worker (run).
+        from django.utils.module_loading import autodiscover_modules
+
+        autodiscover_modules('tasks')
@@ -0,0 +1,73 @@
+"""
+Django management command to run background jobs from the database queue.
+Usage: python manage.py run_jobs [--concurrency N] [--lease-seconds S] [--poll-interval S]
+       python manage.py run_jobs --burst [--tasks projects.initialize_docs,...]
+"""
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from jobs.queue import get_handler
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Claims and runs queued jobs until interrupted (or until the queue is empty with --burst).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.JOBS_WORKER_CONCURRENCY,
+            help=f'Jobs run at once (default: {settings.JOBS_WORKER_CONCURRENCY})',
+        )
+        parser.add_argument(
+            '--lease-seconds',
+            type=int,
+            default=settings.JOBS_LEASE_SECONDS,
+            help=f'How long a claimed job stays locked without a heartbeat (default: {settings.JOBS_LEASE_SECONDS})',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.JOBS_POLL_INTERVAL,
+            help=f'Seconds to wait when the queue is empty (default: {settings.JOBS_POLL_INTERVAL})',
+        )
+        parser.add_argument(
+            '--tasks',
+            type=str,
+            default='',
+            help='Comma-separated task names to run (default: all)',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty',
+        )
+
+    def handle(self, *args, **options):
+        tasks = [name.strip() for name in options['tasks'].split(',') if name.strip()]
+        unknown = [name for name in tasks if get_handler(name) is None]
+        if unknown:
+            raise CommandError(f'Unknown tasks: {", ".join(unknown)}')
+        if options['lease_seconds'] < 3:
+            raise CommandError('--lease-seconds must be at least 3')
+
+        worker = Worker(
+            options['concurrency'],
+            options['lease_seconds'],
+            options['poll_interval'],
+            tasks=tasks,
+            burst=options['burst'],
+        )
+
+        def shutdown(signum, frame):
+            self.stderr.write('Stopping after running jobs finish...')
+            worker.stop()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        self.stdout.write(f'Worker {worker.worker_id} running {worker.concurrency} job(s) at a time')
+        processed = worker.run()
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} job(s)'))
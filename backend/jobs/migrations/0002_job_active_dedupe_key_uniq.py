@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-17 18:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+        ('projects', '0010_project_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ('queued', 'running')), models.Q(('dedupe_key', ''), _negated=True)), fields=('dedupe_key',), name='job_active_dedupe_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,173 @@
+"""
+Database-backed job queue.
+
+Jobs are rows in ``jobs_job``; there is no broker. A worker claims a job
+with a conditional ``UPDATE`` (only succeeds while the row is still
+claimable), which is atomic on every database Django supports, including
+SQLite, so concurrent workers never run the same job twice. A claim is a
+lease: the worker must heartbeat before ``locked_until`` or the job becomes
+claimable again, which is how jobs of a crashed worker are recovered.
+
+Failed attempts are retried with exponential backoff until
+``max_attempts``; handlers raise ``PermanentJobError`` for failures that a
+retry cannot fix.
+
+Handlers are registered with ``@task('app.name')`` in each app's
+``tasks`` module and receive the claimed ``Job``; their return value is
+stored as the job's JSON ``result``.
+"""
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+
+CLAIM_CANDIDATES = 10
+MAX_ERROR_CHARS = 10_000
+
+_handlers = {}
+
+
+class PermanentJobError(Exception):
+    """Fail the job immediately instead of retrying."""
+
+
+def task(name, max_attempts=3, priority=0):
+    def register(fn):
+        fn.task_name = name
+        fn.max_attempts = max_attempts
+        fn.priority = priority
+        _handlers[name] = fn
+        return fn
+    return register
+
+
+def get_handler(name):
+    return _handlers.get(name)
+
+
+def enqueue(name, payload=None, user=None, project=None, priority=None, max_attempts=None,
+            dedupe_key='', delay=None):
+    """
+    Queue ``name`` to run with ``payload``.
+
+    With a ``dedupe_key``, an already queued or running job with the same
+    key is returned instead of queueing a duplicate.
+    """
+    handler = get_handler(name)
+    if handler is None:
+        raise ValueError(f'Unknown job task: {name}')
+    fields = dict(
+        task=name,
+        payload=payload or {},
+        user=user,
+        project=project,
+        priority=handler.priority if priority is None else priority,
+        max_attempts=handler.max_attempts if max_attempts is None else max_attempts,
+        dedupe_key=dedupe_key,
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+    if not dedupe_key:
+        return Job.objects.create(**fields)
+    # The partial unique constraint on active dedupe keys settles races
+    # between concurrent enqueues: the loser's insert fails and it returns
+    # the winner's job. Retried because that job may finish in between.
+    for _ in range(3):
+        existing = Job.objects.filter(dedupe_key=dedupe_key, status__in=Job.ACTIVE_STATUSES).first()
+        if existing is not None:
+            return existing
+        try:
+            with transaction.atomic():
+                return Job.objects.create(**fields)
+        except IntegrityError:
+            continue
+    raise IntegrityError(f'Could not enqueue {name} with dedupe key {dedupe_key!r}')
+
+
+def _claimable(now):
+    return Q(status=Job.STATUS_QUEUED, run_after__lte=now) | Q(status=Job.STATUS_RUNNING, locked_until__lt=now)
+
+
+def claim(worker_id, lease_seconds, tasks=None):
+    """Lease the next runnable job to ``worker_id``, or return ``None``."""
+    while True:
+        now = timezone.now()
+        candidates = Job.objects.filter(_claimable(now))
+        if tasks:
+            candidates = candidates.filter(task__in=tasks)
+        ids = list(candidates.order_by('-priority', 'run_after', 'id').values_list('id', flat=True)[:CLAIM_CANDIDATES])
+        if not ids:
+            return None
+        for job_id in ids:
+            claimed = Job.objects.filter(_claimable(now), id=job_id).update(
+                status=Job.STATUS_RUNNING,
+                locked_by=worker_id,
+                locked_until=now + timedelta(seconds=lease_seconds),
+                attempts=F('attempts') + 1,
+                started_at=now,
+                updated_at=now,
+            )
+            if not claimed:
+                continue  # another worker won the race
+            job = Job.objects.get(id=job_id)
+            if job.attempts > job.max_attempts:
+                # Reclaimed after its last attempt's lease ran out.
+                _finish(job, worker_id, Job.STATUS_FAILED, error='Lease expired on final attempt')
+                continue
+            return job
+
+
+def heartbeat(job_ids, worker_id, lease_seconds):
+    """Extend the leases ``worker_id`` holds on ``job_ids``."""
+    if not job_ids:
+        return 0
+    now = timezone.now()
+    return Job.objects.filter(id__in=job_ids, locked_by=worker_id, status=Job.STATUS_RUNNING).update(
+        locked_until=now + timedelta(seconds=lease_seconds),
+        updated_at=now,
+    )
+
+
+def _finish(job, worker_id, status, **fields):
+    now = timezone.now()
+    # Guarded by locked_by so a worker whose lease was taken over cannot
+    # overwrite the new owner's outcome.
+    return Job.objects.filter(id=job.id, locked_by=worker_id, status=Job.STATUS_RUNNING).update(
+        status=status,
+        locked_by='',
+        locked_until=None,
+        updated_at=now,
+        **fields,
+    )
+
+
+def complete(job, worker_id, result=None):
+    return _finish(job, worker_id, Job.STATUS_SUCCEEDED, result=result, error='', finished_at=timezone.now())
+
+
+def fail(job, worker_id, error, retry=True):
+    error = error[-MAX_ERROR_CHARS:]
+    if retry and job.attempts < job.max_attempts:
+        backoff = settings.JOBS_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+        return _finish(job, worker_id, Job.STATUS_QUEUED, error=error,
+                       run_after=timezone.now() + timedelta(seconds=backoff))
+    return _finish(job, worker_id, Job.STATUS_FAILED, error=error, finished_at=timezone.now())
+
+
+def run_job(job, worker_id):
+    """Run a claimed job's handler and record the outcome."""
+    handler = get_handler(job.task)
+    if handler is None:
+        return fail(job, worker_id, f'No handler registered for {job.task}', retry=False)
+    try:
+        result = handler(job)
+    except PermanentJobError as e:
+        return fail(job, worker_id, str(e), retry=False)
+    except Exception:
+        return fail(job, worker_id, traceback.format_exc())
+    return complete(job, worker_id, result)
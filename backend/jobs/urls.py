@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import job_detail
+
+urlpatterns = [
+    path('<int:job_id>/', job_detail, name='job-detail'),
+]
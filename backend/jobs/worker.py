@@ -0,0 +1,92 @@
+"""
+Thread-pool worker for the database job queue.
+
+Each of ``concurrency`` threads loops claiming and running one job at a
+time; a separate heartbeat thread renews the leases of every job in flight
+every third of the lease, so long jobs are not reclaimed while a crashed
+worker's jobs become claimable once their lease runs out. Threads close
+their stale database connections between jobs like a request would.
+"""
+import logging
+import os
+import socket
+import threading
+import uuid
+
+from django.db import close_old_connections, connection
+
+from .queue import claim, heartbeat, run_job
+
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    def __init__(self, concurrency, lease_seconds, poll_interval, tasks=None, burst=False):
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.tasks = tasks or None
+        self.burst = burst
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.stop_event = threading.Event()
+        self.processed = 0
+        self._running = {}
+        self._idle = set()
+        self._lock = threading.Lock()
+
+    def stop(self):
+        """Stop claiming; jobs already running are finished first."""
+        self.stop_event.set()
+
+    def run(self):
+        threads = [
+            threading.Thread(target=self._work, name=f'job-worker-{n}', daemon=True)
+            for n in range(self.concurrency)
+        ]
+        beat = threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True)
+        for thread in threads:
+            thread.start()
+        beat.start()
+        for thread in threads:
+            thread.join()
+        self.stop_event.set()
+        beat.join()
+        return self.processed
+
+    def _work(self):
+        name = threading.current_thread().name
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+                job = claim(self.worker_id, self.lease_seconds, self.tasks)
+                if job is None:
+                    with self._lock:
+                        self._idle.add(name)
+                        # Burst mode ends once every thread found the queue empty.
+                        if self.burst and len(self._idle) == self.concurrency:
+                            self.stop_event.set()
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+                with self._lock:
+                    self._idle.discard(name)
+                    self._running[name] = job.id
+                logger.info('Running %s #%s (attempt %s)', job.task, job.id, job.attempts)
+                try:
+                    run_job(job, self.worker_id)
+                finally:
+                    with self._lock:
+                        self._running.pop(name, None)
+                        self.processed += 1
+        finally:
+            connection.close()
+
+    def _heartbeat(self):
+        try:
+            while not self.stop_event.wait(self.lease_seconds / 3):
+                with self._lock:
+                    job_ids = list(self._running.values())
+                close_old_connections()
+                heartbeat(job_ids, self.worker_id, self.lease_seconds)
+        finally:
+            connection.close()
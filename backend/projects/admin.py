@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Project
+from .models import Project, PromptCache
 
 
 @admin.register(Project)
@@ -9,3 +9,9 @@ class ProjectAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description', 'user__email')
     readonly_fields = ('created_at', 'updated_at')
 
+
+@admin.register(PromptCache)
+class PromptCacheAdmin(admin.ModelAdmin):
+    list_display = ('fingerprint', 'hits', 'created_at', 'last_used_at')
+    search_fields = ('fingerprint',)
+    readonly_fields = ('fingerprint', 'hits', 'created_at', 'last_used_at')
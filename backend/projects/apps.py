@@ -5,3 +5,5 @@ class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
 
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,163 @@
+"""
+Assistant replies for the Plans chat, streamed piece by piece.
+
+``HTTPAssistant`` talks to any OpenAI-compatible ``/chat/completions``
+endpoint with ``stream: true``. It is written directly on asyncio streams
+(there is no async HTTP client in the dependencies), so a reply in
+progress is an idle socket on the event loop rather than a blocked thread,
+and any number of chats can stream at once from one ASGI worker.
+
+Without ``PLAN_ASSISTANT_URL`` a ``PlaceholderAssistant`` answers instead,
+so the chat works end to end before a model is configured.
+"""
+import asyncio
+import json
+import ssl
+import urllib.parse
+
+
+MAX_ERROR_BODY = 2_000
+
+
+class AssistantError(Exception):
+    pass
+
+
+class PlaceholderAssistant:
+    async def stream(self, messages):
+        question = next((m['content'] for m in reversed(messages) if m['role'] == 'user'), '')
+        reply = (
+            f'You asked: "{" ".join(question.split())[:200]}". '
+            'Connect a model by setting PLAN_ASSISTANT_URL to get real planning answers.'
+        )
+        for word in reply.split(' '):
+            yield word + ' '
+            # Hand control back to the loop like a network read would.
+            await asyncio.sleep(0)
+
+
+async def _read_body(reader, headers, timeout):
+    """Yield the response body, undoing chunked transfer encoding."""
+    if 'chunked' in headers.get('transfer-encoding', ''):
+        while True:
+            size_line = await asyncio.wait_for(reader.readline(), timeout)
+            try:
+                size = int(size_line.split(b';', 1)[0].strip() or b'0', 16)
+            except ValueError:
+                raise AssistantError(f'Malformed chunk from assistant endpoint: {size_line[:100]!r}')
+            if size == 0:
+                return
+            data = await asyncio.wait_for(reader.readexactly(size), timeout)
+            await reader.readline()
+            yield data
+    else:
+        while True:
+            data = await asyncio.wait_for(reader.read(65536), timeout)
+            if not data:
+                return
+            yield data
+
+
+class HTTPAssistant:
+    def __init__(self, url, model, api_key='', timeout=60, max_tokens=1024):
+        self.url = url
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_tokens = max_tokens
+
+    async def _request(self, body):
+        parts = urllib.parse.urlsplit(self.url)
+        https = parts.scheme == 'https'
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    parts.hostname, parts.port or (443 if https else 80),
+                    ssl=ssl.create_default_context() if https else None,
+                ),
+                self.timeout,
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise AssistantError(f'Cannot reach assistant endpoint: {e}')
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        head = [
+            f'POST {path} HTTP/1.1',
+            f'Host: {parts.netloc}',
+            'Content-Type: application/json',
+            'Accept: text/event-stream',
+            f'Content-Length: {len(body)}',
+            'Connection: close',
+        ]
+        if self.api_key:
+            head.append(f'Authorization: Bearer {self.api_key}')
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+        return reader, writer
+
+    async def stream(self, messages):
+        body = json.dumps({
+            'model': self.model,
+            'messages': messages,
+            'max_tokens': self.max_tokens,
+            'stream': True,
+        }).encode('utf-8')
+        reader, writer = await self._request(body)
+        try:
+            status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+            try:
+                status = int(status_line.split()[1])
+            except (IndexError, ValueError):
+                raise AssistantError(f'Malformed response from assistant endpoint: {status_line[:100]!r}')
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), self.timeout)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip().lower()
+
+            if status != 200:
+                error = b''
+                async for data in _read_body(reader, headers, self.timeout):
+                    error += data
+                    if len(error) > MAX_ERROR_BODY:
+                        break
+                raise AssistantError(f'Assistant endpoint returned {status}: {error[:MAX_ERROR_BODY].decode("utf-8", "replace")}')
+
+            buffer = b''
+            async for data in _read_body(reader, headers, self.timeout):
+                buffer += data
+                *lines, buffer = buffer.split(b'\n')
+                for line in lines:
+                    line = line.strip()
+                    if not line.startswith(b'data:'):
+                        continue
+                    payload = line[5:].strip()
+                    if payload == b'[DONE]':
+                        return
+                    try:
+                        delta = json.loads(payload)['choices'][0]['delta'].get('content')
+                    except (ValueError, KeyError, IndexError) as e:
+                        raise AssistantError(f'Unexpected stream event: {e}')
+                    if delta:
+                        yield delta
+        except asyncio.TimeoutError:
+            raise AssistantError('Assistant endpoint timed out')
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            raise AssistantError(f'Assistant connection lost: {e}')
+        finally:
+            writer.close()
+
+
+def get_assistant():
+    from django.conf import settings
+
+    if not settings.PLAN_ASSISTANT_URL:
+        return PlaceholderAssistant()
+    return HTTPAssistant(
+        settings.PLAN_ASSISTANT_URL,
+        settings.PLAN_ASSISTANT_MODEL,
+        api_key=settings.PLAN_ASSISTANT_API_KEY,
+        timeout=settings.PLAN_ASSISTANT_TIMEOUT,
+        max_tokens=settings.PLAN_ASSISTANT_MAX_TOKENS,
+    )
@@ -0,0 +1,94 @@
+"""
+Bulk prompt regeneration over many projects.
+
+Projects are walked in primary-key order, ``batch_size`` at a time, so a
+run can resume after the last completed batch: ``on_batch`` receives the
+progress (including ``last_id``) after every batch is written, and a later
+call given that progress picks up from there. Within a batch, projects
+sharing a spec are generated once, specs already in the prompt cache are
+not generated at all, and the rest are generated ``concurrency`` at a time;
+results are written back with a single ``bulk_update``.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.utils import timezone
+
+from .events import publish_event
+from .models import Project, PromptCache
+from .prompts import project_spec, render_prompts, spec_fingerprint
+from .signals import project_delta
+
+
+UPDATE_FIELDS = ['content', 'content_fingerprint', 'updated_at']
+
+
+def new_progress():
+    return {'last_id': 0, 'processed': 0, 'generated': 0, 'cached': 0, 'unchanged': 0}
+
+
+def bulk_queryset(project_ids=None, statuses=('active', 'archived'), output_type=None):
+    """Projects selected for bulk regeneration."""
+    queryset = Project.objects.filter(status__in=statuses)
+    if project_ids:
+        queryset = queryset.filter(id__in=project_ids)
+    if output_type:
+        queryset = queryset.filter(output_type=output_type)
+    return queryset
+
+
+def _regenerate_batch(projects, concurrency, force, progress):
+    specs = {}
+    pending = []
+    for project in projects:
+        spec = project_spec(project)
+        fingerprint = spec_fingerprint(spec)
+        if not force and project.content and project.content_fingerprint == fingerprint:
+            progress['unchanged'] += 1
+            continue
+        specs.setdefault(fingerprint, spec)
+        pending.append((project, fingerprint))
+
+    contents = {} if force else PromptCache.objects.lookup_many(list(specs))
+    missing = [fingerprint for fingerprint in specs if fingerprint not in contents]
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            generated = dict(zip(missing, pool.map(lambda fingerprint: render_prompts(specs[fingerprint]), missing)))
+        PromptCache.objects.store_many(generated)
+        contents.update(generated)
+
+    now = timezone.now()
+    generated_fingerprints = set(missing)
+    for project, fingerprint in pending:
+        project.content = contents[fingerprint]
+        project.content_fingerprint = fingerprint
+        # bulk_update skips auto_now fields.
+        project.updated_at = now
+        if fingerprint in generated_fingerprints:
+            progress['generated'] += 1
+        else:
+            progress['cached'] += 1
+    Project.objects.bulk_update([project for project, _ in pending], UPDATE_FIELDS)
+    # bulk_update sends no post_save, so publish the change events here.
+    for project, _ in pending:
+        publish_event(project.id, 'project.updated', project_delta(project, UPDATE_FIELDS))
+
+
+def regenerate_prompts(queryset, batch_size=500, concurrency=4, force=False, progress=None, on_batch=None):
+    """
+    Regenerate ``project.content`` for every project in ``queryset``.
+
+    With ``force`` every project is regenerated and the cache refreshed,
+    even if its spec did not change. ``progress`` is a checkpoint from an
+    earlier run to resume. Returns the final progress dict.
+    """
+    progress = {**new_progress(), **(progress or {})}
+    queryset = queryset.order_by('id')
+    while True:
+        projects = list(queryset.filter(id__gt=progress['last_id'])[:batch_size])
+        if not projects:
+            return progress
+        _regenerate_batch(projects, concurrency, force, progress)
+        progress['processed'] += len(projects)
+        progress['last_id'] = projects[-1].id
+        if on_batch is not None:
+            on_batch(dict(progress))
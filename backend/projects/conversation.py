@@ -0,0 +1,155 @@
+"""
+Context assembly for Plans chat replies.
+
+A reply's prompt is the project's rolling ``PlanSummary`` plus as many of
+the most recent messages as fit in the token budget. Messages carry a
+token count computed once when saved, and only messages after the
+summary's checkpoint are ever read, so the cost of a turn does not grow
+with the length of the conversation.
+
+When the unsummarized tail no longer fits, its oldest messages are folded
+into the summary and the checkpoint moves past them. Folding goes down to
+half the budget, so it happens once every few turns rather than on every
+one. When a concurrent turn folds first, the context is rebuilt from the
+summary it saved.
+"""
+from django.conf import settings
+from django.db.models import Q
+
+from .models import PlanMessage, PlanSummary
+from .tokens import estimate_tokens
+
+
+SYSTEM_PROMPT = (
+    'You are a planning assistant helping the user scope and design their software project. '
+    'Answer concisely and build on the decisions already made in the conversation.'
+)
+
+MESSAGE_FIELDS = ('id', 'role', 'content', 'token_count', 'created_at')
+FOLD_ATTEMPTS = 3
+
+
+def _first_sentence(text, max_chars=200):
+    text = ' '.join(text.split())
+    for end in ('. ', '? ', '! '):
+        index = text.find(end)
+        if 0 < index < max_chars:
+            return text[:index + 1]
+    if len(text) > max_chars:
+        return text[:max_chars - 1].rsplit(' ', 1)[0] + '…'
+    return text
+
+
+class HeuristicSummarizer:
+    """
+    Extractive summary: one line per folded message, oldest lines dropped
+    once the summary exceeds ``max_tokens``.
+    """
+
+    def __init__(self, max_tokens):
+        self.max_tokens = max_tokens
+
+    def summarize(self, summary, messages):
+        lines = summary.splitlines() if summary else []
+        for message in messages:
+            lines.append(f'- {message["role"].capitalize()}: {_first_sentence(message["content"])}')
+        while len(lines) > 1 and estimate_tokens('\n'.join(lines)) > self.max_tokens:
+            lines.pop(0)
+        return '\n'.join(lines)
+
+
+def _after_checkpoint(summary):
+    messages = PlanMessage.objects.filter(project_id=summary.project_id)
+    if summary.last_created_at is None:
+        return messages
+    return messages.filter(
+        Q(created_at__gt=summary.last_created_at)
+        | Q(created_at=summary.last_created_at, id__gt=summary.last_message_id)
+    )
+
+
+def _fold(summary, messages, summarizer):
+    """
+    Fold ``messages`` (chronological, all after the checkpoint) into
+    ``summary``; ``False`` when another turn moved the checkpoint first.
+    """
+    last = messages[-1]
+    content = summarizer.summarize(summary.content, messages)
+    # Only the first of two concurrent turns folding the same messages wins.
+    updated = PlanSummary.objects.filter(
+        id=summary.id,
+        last_created_at=summary.last_created_at,
+        last_message_id=summary.last_message_id,
+    ).update(
+        content=content,
+        token_count=estimate_tokens(content),
+        last_created_at=last['created_at'],
+        last_message_id=last['id'],
+        message_count=summary.message_count + len(messages),
+    )
+    if updated:
+        summary.refresh_from_db()
+    return bool(updated)
+
+
+def _split_tail(summary, recent_budget):
+    """
+    ``(recent, overflow)`` for the messages after ``summary``'s checkpoint:
+    the newest ones to send (newest first) and the older ones to fold
+    (chronological).
+    """
+    # Newest first: keep what fits (always the latest message); everything
+    # older gets folded.
+    recent, overflow, used = [], [], 0
+    tail = _after_checkpoint(summary).order_by('-created_at', '-id').values(*MESSAGE_FIELDS)
+    for message in tail.iterator(chunk_size=200):
+        tokens = message['token_count'] or estimate_tokens(message['content'])
+        if overflow or (recent and used + tokens > recent_budget):
+            overflow.append(message)
+        else:
+            recent.append(message)
+            used += tokens
+
+    if overflow:
+        # Fold down to half the recent budget so the next turns have headroom.
+        keep, kept = [], 0
+        for message in recent:
+            tokens = message['token_count'] or estimate_tokens(message['content'])
+            if kept + tokens > recent_budget // 2 and keep:
+                break
+            keep.append(message)
+            kept += tokens
+        overflow = recent[len(keep):] + overflow
+        recent = keep
+        overflow.reverse()
+    return recent, overflow
+
+
+def build_plan_context(project, budget_tokens=None, summarizer=None):
+    """
+    Chat messages (``[{'role', 'content'}]``, system prompt first) to send
+    for the next assistant reply in ``project``'s Plans chat.
+    """
+    budget = budget_tokens or settings.PLAN_CONTEXT_TOKEN_BUDGET
+    summary_budget = min(settings.PLAN_SUMMARY_MAX_TOKENS, budget // 4)
+    summarizer = summarizer or HeuristicSummarizer(summary_budget)
+    summary, _ = PlanSummary.objects.get_or_create(project=project)
+    recent_budget = budget - estimate_tokens(SYSTEM_PROMPT) - summary_budget
+
+    for _ in range(FOLD_ATTEMPTS):
+        recent, overflow = _split_tail(summary, recent_budget)
+        if not overflow or _fold(summary, overflow, summarizer):
+            break
+        # Another turn folded first: start over from the summary it saved,
+        # so no message is both in the summary and sent verbatim.
+        summary.refresh_from_db()
+    else:
+        # Still contended; send this turn without folding.
+        recent, _ = _split_tail(summary, recent_budget)
+
+    system = SYSTEM_PROMPT
+    if summary.content:
+        system += f'\n\nSummary of the earlier conversation:\n{summary.content}'
+    context = [{'role': 'system', 'content': system}]
+    context.extend({'role': message['role'], 'content': message['content']} for message in reversed(recent))
+    return context
@@ -0,0 +1,210 @@
+"""
+Per-project change events.
+
+Saves to a project, its plan messages, status items and documentation
+publish a small delta (see ``projects.signals``) once the transaction
+commits. ``/api/projects/<id>/events/`` streams them to the editor, so
+clients apply changes as they happen rather than re-fetching lists.
+
+Delivery goes through the broker named by ``PROJECT_EVENTS_BROKER``. A
+broker has ``publish(project_id, event)`` (callable from any thread) and
+``subscribe(project_id)`` (called on the event loop, returns a
+``Subscription``):
+
+- ``DatabaseBroker`` (default) writes events to ``ProjectEvent``. One
+  thread per process reads new rows and fans them out locally, so changes
+  made by the job worker (always a separate process) or other ASGI workers
+  reach every stream, at one query per poll interval per process rather
+  than per client.
+- ``InProcessBroker`` fans events out in memory, so it only reaches streams
+  served by the process that made the change. It suits a single process
+  that also runs its jobs, e.g. ``run_jobs --burst`` in tests.
+
+A subscriber that falls more than ``PROJECT_EVENTS_QUEUE_SIZE`` events
+behind gets a single ``resync`` event instead, telling it to reload.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+RESYNC = {'type': 'resync', 'data': {}}
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, broker, project_id, queue_size):
+        self.broker = broker
+        self.project_id = project_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+        # Events committed from here on are this subscriber's.
+        self.since = timezone.now()
+
+    def _put(self, event):
+        # Runs on the subscriber's loop.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    def deliver(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    async def get(self, timeout=None):
+        """The next event, or ``None`` after ``timeout`` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    CLOCK_SKEW = timedelta(0)
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or settings.PROJECT_EVENTS_QUEUE_SIZE
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, project_id):
+        subscription = Subscription(self, project_id, self.queue_size)
+        with self._lock:
+            self._subscriptions[project_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.project_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.project_id]
+
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def publish(self, project_id, event):
+        self.fan_out(project_id, event)
+
+    def fan_out(self, project_id, event, created_at=None):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(project_id, ()))
+        for subscription in subscriptions:
+            if created_at is not None and created_at < subscription.since - self.CLOCK_SKEW:
+                continue
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # The subscriber's loop has shut down.
+                self.unsubscribe(subscription)
+
+
+class DatabaseBroker(InProcessBroker):
+    PRUNE_EVERY = 60
+    MAX_BACKOFF = 30
+    # ProjectEvent.created_at comes from the publishing process's clock.
+    # Erring early can only repeat a change the subscriber already loaded.
+    CLOCK_SKEW = timedelta(seconds=2)
+
+    def __init__(self, queue_size=None, poll_interval=None, retention_seconds=None):
+        super().__init__(queue_size)
+        self.poll_interval = poll_interval or settings.PROJECT_EVENTS_POLL_INTERVAL
+        self.retention_seconds = retention_seconds or settings.PROJECT_EVENTS_RETENTION_SECONDS
+        self._poller = None
+        self._last_id = None
+
+    def publish(self, project_id, event):
+        from .models import ProjectEvent
+
+        ProjectEvent.objects.create(project_id=project_id, type=event['type'], data=event['data'])
+
+    def subscribe(self, project_id):
+        subscription = super().subscribe(project_id)
+        with self._lock:
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll_forever, name='project-events', daemon=True)
+                self._poller.start()
+        return subscription
+
+    def _poll_forever(self):
+        pruned_at = 0
+        failures = 0
+        while True:
+            try:
+                self.poll()
+                if time.monotonic() - pruned_at >= self.PRUNE_EVERY:
+                    self.prune()
+                    pruned_at = time.monotonic()
+                failures = 0
+            except Exception:
+                # e.g. "database is locked"; the cursor has not moved, so
+                # nothing is lost by trying again later.
+                failures += 1
+                logger.exception('Polling project events failed (%d in a row)', failures)
+            finally:
+                close_old_connections()
+            time.sleep(min(self.poll_interval * 2 ** failures, self.MAX_BACKOFF))
+
+    def poll(self):
+        """Fan out events written since the last poll; returns how many."""
+        from .models import ProjectEvent
+
+        with self._lock:
+            since = min(
+                (subscription.since for subscriptions in self._subscriptions.values() for subscription in subscriptions),
+                default=None,
+            )
+        if since is None:
+            # Nobody to deliver to; catch up from subscription times when someone is.
+            self._last_id = None
+            return 0
+        if self._last_id is None:
+            # Each subscriber gets the events committed since it subscribed,
+            # including any written before this first poll.
+            rows = ProjectEvent.objects.filter(created_at__gte=since - self.CLOCK_SKEW)
+        else:
+            rows = ProjectEvent.objects.filter(id__gt=self._last_id)
+        rows = list(
+            rows.order_by('id').values_list('id', 'project_id', 'type', 'data', 'created_at')[:1000]
+        )
+        for event_id, project_id, event_type, data, created_at in rows:
+            self.fan_out(project_id, {'type': event_type, 'data': data}, created_at)
+            self._last_id = event_id
+        return len(rows)
+
+    def prune(self):
+        from .models import ProjectEvent
+
+        cutoff = timezone.now() - timedelta(seconds=self.retention_seconds)
+        ProjectEvent.objects.filter(created_at__lt=cutoff).delete()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.PROJECT_EVENTS_BROKER)()
+    return _broker
+
+
+_broker = None
+
+
+def publish_event(project_id, event_type, data):
+    """Publish ``data`` as a ``event_type`` event for ``project_id`` once the current transaction commits."""
+    event = {'type': event_type, 'data': data}
+    transaction.on_commit(lambda: get_broker().publish(project_id, event))
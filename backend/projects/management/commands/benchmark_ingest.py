@@ -0,0 +1,125 @@
+"""
+Django management command to benchmark repository ingestion on synthetic repositories.
+Usage: python manage.py benchmark_ingest [--sizes 1k,10k,100k] [--scenarios files,git] [--workers N] [--output FILE]
+       python manage.py benchmark_ingest --baseline FILE [--tolerance 0.15]
+       python manage.py benchmark_ingest --save-baseline FILE
+"""
+import json
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from services.RAG.benchmark import DEFAULT_TOLERANCE, SCENARIOS, SIZES, compare, run_suite
+
+
+class Command(BaseCommand):
+    help = 'Runs the RAG ingest pipeline over synthetic repositories and reports throughput, RSS and index size as JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=str,
+            default='1k,10k',
+            help=f'Comma-separated repository sizes to run, from {", ".join(SIZES)} (default: 1k,10k)',
+        )
+        parser.add_argument(
+            '--scenarios',
+            type=str,
+            default=','.join(SCENARIOS),
+            help=f'Comma-separated scenarios: files (plain directory) and/or git (checkout) (default: {",".join(SCENARIOS)})',
+        )
+        parser.add_argument(
+            '--workdir',
+            type=str,
+            default=str(settings.RAG_DATA_DIR / 'benchmarks'),
+            help='Where synthetic repositories are generated and cached',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.RAG_INGEST_WORKERS,
+            help=f'Chunking worker processes (default: {settings.RAG_INGEST_WORKERS})',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed for repository generation (default: 0)')
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Write the JSON report to this file instead of stdout',
+        )
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            help='Compare against this report and exit non-zero on regressions',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=DEFAULT_TOLERANCE,
+            help=f'Relative change treated as a regression (default: {DEFAULT_TOLERANCE})',
+        )
+        parser.add_argument(
+            '--save-baseline',
+            type=str,
+            help='Also write the report to this file for later comparisons',
+        )
+
+    def handle(self, *args, **options):
+        sizes = [size.strip() for size in options['sizes'].split(',') if size.strip()]
+        unknown = [size for size in sizes if size not in SIZES]
+        if unknown:
+            raise CommandError(f'Unknown sizes: {", ".join(unknown)}. Choose from {", ".join(SIZES)}.')
+        scenarios = [scenario.strip() for scenario in options['scenarios'].split(',') if scenario.strip()]
+        unknown = [scenario for scenario in scenarios if scenario not in SCENARIOS]
+        if unknown or not scenarios:
+            raise CommandError(f'Unknown scenarios: {", ".join(unknown)}. Choose from {", ".join(SCENARIOS)}.')
+
+        baseline = None
+        if options.get('baseline'):
+            try:
+                with open(options['baseline'], encoding='utf-8') as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read baseline: {e}')
+
+        for size in sizes:
+            self.stderr.write(f'Running {size} ({SIZES[size]} files) as {", ".join(scenarios)}...')
+        report = run_suite(
+            sizes,
+            options['workdir'],
+            scenarios=scenarios,
+            workers=options['workers'],
+            files_per_task=settings.RAG_INGEST_FILES_PER_TASK,
+            seed=options['seed'],
+            embedding_dim=settings.RAG_EMBEDDING_DIM,
+            batch_size=settings.RAG_INGEST_CHUNK_BATCH_SIZE,
+        )
+        if baseline is not None:
+            report['regressions'] = compare(report, baseline, options['tolerance'])
+
+        encoded = json.dumps(report, indent=2)
+        if options.get('output'):
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                fh.write(encoded + '\n')
+        else:
+            self.stdout.write(encoded)
+        if options.get('save_baseline'):
+            with open(options['save_baseline'], 'w', encoding='utf-8') as fh:
+                fh.write(encoded + '\n')
+            self.stderr.write(self.style.SUCCESS(f'Saved baseline to {options["save_baseline"]}'))
+
+        for name, case in report['cases'].items():
+            self.stderr.write(
+                f'{name}: {case["files_per_sec"]} files/s, {case["chunks_per_sec"]} chunks/s, '
+                f'peak RSS {case["peak_rss_bytes"] / 1024 ** 2:.0f} MiB, '
+                f'index {case["index_bytes"] / 1024 ** 2:.1f} MiB'
+            )
+        regressions = report.get('regressions')
+        if regressions:
+            for item in regressions:
+                self.stderr.write(self.style.ERROR(
+                    f'REGRESSION {item["case"]} {item["metric"]}: '
+                    f'{item["baseline"]} -> {item["current"]} ({item["change"]:+.1%})'
+                ))
+            sys.exit(1)
+        if baseline is not None:
+            self.stderr.write(self.style.SUCCESS('No regressions against baseline'))
@@ -0,0 +1,32 @@
+"""
+Django management command to inspect or clear the shared embedding cache.
+Usage: python manage.py embedding_cache [--clear]
+"""
+from django.core.management.base import BaseCommand
+from services.RAG.embeddings.cache import default_cache
+
+
+class Command(BaseCommand):
+    help = 'Shows hit/miss counters and size of the shared embedding cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Remove every cached vector and reset the counters',
+        )
+
+    def handle(self, *args, **options):
+        cache = default_cache()
+        if options['clear']:
+            cache.clear()
+            self.stdout.write(self.style.WARNING(f'Cleared embedding cache at {cache.path}'))
+
+        stats = cache.stats()
+        self.stdout.write(f'Cache:      {cache.path}')
+        self.stdout.write(f'Entries:    {stats["entries"]}')
+        self.stdout.write(f'Size:       {stats["bytes"] / 1024 ** 2:.1f} MiB of {stats["max_bytes"] / 1024 ** 2:.1f} MiB')
+        self.stdout.write(f'Hits:       {stats["hits"]}')
+        self.stdout.write(f'Misses:     {stats["misses"]}')
+        self.stdout.write(f'Evictions:  {stats["evictions"]}')
+        self.stdout.write(self.style.SUCCESS(f'Hit rate:   {stats["hit_rate"]:.1%}'))
@@ -0,0 +1,104 @@
+"""
+Django management command to regenerate prompt content for many projects.
+Usage: python manage.py generate_prompts_bulk [--projects 1,2,3] [--output-type page] [--force]
+       python manage.py generate_prompts_bulk --checkpoint FILE [--resume]
+"""
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from projects.bulk import bulk_queryset, regenerate_prompts
+
+
+class Command(BaseCommand):
+    help = 'Regenerates prompt content in batches for every selected project, resumable from a checkpoint file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--projects',
+            type=str,
+            default='',
+            help='Comma-separated project IDs (default: all projects)',
+        )
+        parser.add_argument(
+            '--output-type',
+            type=str,
+            help='Only projects with this output type',
+        )
+        parser.add_argument(
+            '--status',
+            type=str,
+            default='active,archived',
+            help='Comma-separated project statuses to include (default: active,archived)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate even projects whose spec has not changed, bypassing the prompt cache',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.PROMPT_BULK_BATCH_SIZE,
+            help=f'Projects per batch (default: {settings.PROMPT_BULK_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.PROMPT_BULK_CONCURRENCY,
+            help=f'Prompts generated at once (default: {settings.PROMPT_BULK_CONCURRENCY})',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            type=str,
+            help='File to record progress in after every batch',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue from the progress recorded in --checkpoint',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            project_ids = [int(pid) for pid in options['projects'].split(',') if pid.strip()]
+        except ValueError:
+            raise CommandError('--projects must be a comma-separated list of IDs')
+        statuses = [status.strip() for status in options['status'].split(',') if status.strip()]
+        checkpoint_path = options.get('checkpoint')
+        if options['resume'] and not checkpoint_path:
+            raise CommandError('--resume requires --checkpoint')
+
+        progress = None
+        if options['resume'] and os.path.exists(checkpoint_path):
+            try:
+                with open(checkpoint_path, encoding='utf-8') as fh:
+                    progress = json.load(fh)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read checkpoint: {e}')
+            self.stdout.write(f'Resuming after project {progress["last_id"]} ({progress["processed"]} done)')
+
+        def checkpoint(progress):
+            if checkpoint_path:
+                tmp_path = f'{checkpoint_path}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as fh:
+                    json.dump(progress, fh)
+                os.replace(tmp_path, checkpoint_path)
+            self.stdout.write(
+                f'{progress["processed"]} projects: {progress["generated"]} generated, '
+                f'{progress["cached"]} from cache, {progress["unchanged"]} unchanged'
+            )
+
+        progress = regenerate_prompts(
+            bulk_queryset(project_ids=project_ids, statuses=statuses, output_type=options.get('output_type')),
+            batch_size=max(1, options['batch_size']),
+            concurrency=options['concurrency'],
+            force=options['force'],
+            progress=progress,
+            on_batch=checkpoint,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Regenerated prompts for {progress["processed"]} projects '
+            f'({progress["generated"]} generated, {progress["cached"]} from cache, {progress["unchanged"]} unchanged)'
+        ))
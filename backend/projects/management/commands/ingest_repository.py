@@ -0,0 +1,206 @@
+"""
+Django management command to ingest a project's connected repository offline.
+Usage: python manage.py ingest_repository PROJECT_ID [--path PATH] [--output FILE] [--max-chunk-bytes N] [--workers N]
+       python manage.py ingest_repository PROJECT_ID --sync [--force]
+       python manage.py ingest_repository PROJECT_ID --archive repo.tar.gz
+"""
+import json
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from projects.models import Project
+from services.RAG.embeddings.backends import get_embedder
+from services.RAG.embeddings.cache import CachedEmbedder, default_cache
+from services.RAG.index.generations import build_lock
+from services.RAG.ingest.archive import ArchiveError, ingest_archive
+from services.RAG.ingest.incremental import GitError, ingest_incremental, rebuild_index
+from services.RAG.ingest.pipeline import read_repository_parallel
+from services.RAG.paths import index_dir, project_data_dir, repository_path
+
+
+class Command(BaseCommand):
+    help = 'Streams a project repository through the RAG reader and writes chunks as JSON lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int, help='ID of the project to ingest')
+        parser.add_argument(
+            '--path',
+            type=str,
+            help='Local checkout to read instead of resolving Project.repository_name',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Write chunks as JSON lines to this file ("-" for stdout). Default: summary only.',
+        )
+        parser.add_argument(
+            '--max-chunk-bytes',
+            type=int,
+            default=settings.RAG_MAX_CHUNK_BYTES,
+            help=f'Upper bound on chunk size in bytes (default: {settings.RAG_MAX_CHUNK_BYTES})',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.RAG_INGEST_WORKERS,
+            help=f'Chunking worker processes; 1 disables the pool (default: {settings.RAG_INGEST_WORKERS})',
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Incrementally update the project chunk store and search index, re-reading only changed files',
+        )
+        parser.add_argument(
+            '--archive',
+            type=str,
+            help='Ingest a .tar.gz/.tgz/.tar/.zip archive into the project chunk store and search index',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='With --sync, discard the manifest and rebuild the chunk store from scratch',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(pk=options['project_id'])
+        except Project.DoesNotExist:
+            raise CommandError(f'Project {options["project_id"]} not found.')
+
+        if options.get('archive'):
+            with build_lock(index_dir(project.id)):
+                return self._ingest_archive(project, options['archive'], options)
+
+        if options.get('path'):
+            # An operator-supplied checkout may live anywhere on disk.
+            root = Path(options['path']).expanduser().resolve()
+            if not root.is_dir():
+                raise CommandError(f'Repository checkout not found: {root}')
+        else:
+            try:
+                root = repository_path(project.repository_name)
+            except (ValueError, FileNotFoundError) as e:
+                raise CommandError(str(e))
+
+        if options['sync']:
+            # Waits for a queued sync of the same project to finish first.
+            with build_lock(index_dir(project.id)):
+                return self._sync(project, root, options)
+
+        output = options.get('output')
+        out = None
+        if output == '-':
+            out = sys.stdout
+        elif output:
+            out = open(output, 'w', encoding='utf-8')
+
+        self.stderr.write(f'Ingesting {root} for project "{project.name}"')
+        started = time.monotonic()
+        files, chunks, total_bytes = 0, 0, 0
+        last_path = None
+        try:
+            for chunk in read_repository_parallel(
+                root,
+                workers=options['workers'],
+                max_chunk_bytes=options['max_chunk_bytes'],
+                max_file_bytes=settings.RAG_MAX_FILE_BYTES,
+                files_per_task=settings.RAG_INGEST_FILES_PER_TASK,
+            ):
+                # Chunks of a file are contiguous, so counting path changes is enough.
+                if chunk.path != last_path:
+                    files += 1
+                    last_path = chunk.path
+                chunks += 1
+                total_bytes += chunk.end_byte - chunk.start_byte
+                if out is not None:
+                    out.write(json.dumps(asdict(chunk)) + '\n')
+        finally:
+            if out is not None and out is not sys.stdout:
+                out.close()
+
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(
+            f'Ingested {files} files, {chunks} chunks, {total_bytes} bytes in {elapsed:.2f}s'
+        ))
+
+    def _sync(self, project, root, options):
+        started = time.monotonic()
+        data_dir = project_data_dir(project.id)
+        try:
+            result = ingest_incremental(
+                root,
+                data_dir,
+                max_chunk_bytes=options['max_chunk_bytes'],
+                max_file_bytes=settings.RAG_MAX_FILE_BYTES,
+                force=options['force'],
+                workers=options['workers'],
+                files_per_task=settings.RAG_INGEST_FILES_PER_TASK,
+            )
+        except GitError as e:
+            raise CommandError(f'git failed: {e}')
+
+        elapsed = time.monotonic() - started
+        if result.skipped:
+            self.stderr.write(self.style.SUCCESS(f'Already up to date at {result.commit} ({elapsed:.3f}s)'))
+        else:
+            self.stderr.write(self.style.SUCCESS(
+                f'Synced {root}: {len(result.added)} added, {len(result.modified)} modified, '
+                f'{len(result.deleted)} deleted, {result.unchanged} unchanged, '
+                f'{result.chunks_written} chunks written in {elapsed:.3f}s'
+            ))
+
+        self._rebuild_index(project, data_dir, options)
+
+    def _ingest_archive(self, project, archive_path, options):
+        started = time.monotonic()
+        data_dir = project_data_dir(project.id)
+        try:
+            with open(archive_path, 'rb') as fh:
+                result = ingest_archive(
+                    fh,
+                    archive_path,
+                    data_dir,
+                    max_chunk_bytes=options['max_chunk_bytes'],
+                    max_file_bytes=settings.RAG_MAX_FILE_BYTES,
+                    max_total_bytes=settings.RAG_ARCHIVE_MAX_TOTAL_BYTES,
+                    max_files=settings.RAG_ARCHIVE_MAX_FILES,
+                    workers=options['workers'],
+                    files_per_task=settings.RAG_INGEST_FILES_PER_TASK,
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+        except ArchiveError as e:
+            raise CommandError(f'Failed to ingest archive: {e}')
+
+        self.stderr.write(self.style.SUCCESS(
+            f'Ingested {archive_path}: {len(result.added)} added, {len(result.modified)} modified, '
+            f'{len(result.deleted)} deleted, {result.unchanged} unchanged, '
+            f'{result.chunks_written} chunks written in {time.monotonic() - started:.3f}s'
+        ))
+        self._rebuild_index(project, data_dir, options)
+
+    def _rebuild_index(self, project, data_dir, options):
+        started = time.monotonic()
+        embedder = get_embedder()
+        if embedder is not None:
+            embedder = CachedEmbedder(embedder, default_cache())
+        generation = rebuild_index(
+            data_dir,
+            index_dir(project.id),
+            embedder=embedder,
+            force=options['force'],
+            batch_size=settings.RAG_INGEST_CHUNK_BATCH_SIZE,
+            ivf_min_vectors=settings.RAG_IVF_MIN_VECTORS,
+        )
+        if generation:
+            self.stderr.write(self.style.SUCCESS(
+                f'Built search index {generation} in {time.monotonic() - started:.3f}s'
+            ))
+            if embedder is not None:
+                self.stderr.write(
+                    f'Embeddings ({embedder.model_id}): {embedder.hits} cached, {embedder.misses} computed'
+                )
@@ -0,0 +1,31 @@
+"""
+Django management command to rebuild the denormalized project progress fields.
+Usage: python manage.py recount_progress [--projects 1,2,3]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from projects.models import Project
+from projects.progress import recount
+
+
+class Command(BaseCommand):
+    help = 'Recomputes status item counters and last-activity timestamps from the underlying rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--projects',
+            type=str,
+            default='',
+            help='Comma-separated project IDs (default: all projects)',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Project.objects.all()
+        if options['projects']:
+            try:
+                project_ids = [int(pid) for pid in options['projects'].split(',') if pid.strip()]
+            except ValueError:
+                raise CommandError('--projects must be a comma-separated list of IDs')
+            queryset = queryset.filter(id__in=project_ids)
+
+        updated = recount(queryset)
+        self.stdout.write(self.style.SUCCESS(f'Recounted progress for {updated} projects'))
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.1 on 2026-10-17 17:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_repository_name_documentation_planmessage_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocNode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=1024)),
+                ('parent_path', models.CharField(blank=True, max_length=1024)),
+                ('name', models.CharField(max_length=255)),
+                ('type', models.CharField(choices=[('directory', 'Directory'), ('file', 'File')], max_length=20)),
+                ('depth', models.PositiveIntegerField()),
+                ('position', models.PositiveIntegerField()),
+                ('child_count', models.PositiveIntegerField(default=0)),
+                ('summary', models.CharField(blank=True, max_length=160)),
+                ('description', models.TextField(blank=True)),
+                ('documentation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nodes', to='projects.documentation')),
+            ],
+            options={
+                'ordering': ['parent_path', 'position'],
+                'indexes': [models.Index(fields=['documentation', 'parent_path', 'position'], name='doc_node_parent_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='docnode',
+            constraint=models.UniqueConstraint(fields=('documentation', 'path'), name='unique_doc_node_path'),
+        ),
+    ]
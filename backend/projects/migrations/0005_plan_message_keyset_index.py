@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-17 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_prompt_cache'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='planmessage',
+            options={'ordering': ['created_at', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='planmessage',
+            index=models.Index(fields=['project', 'created_at', 'id'], name='plan_message_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.0.1 on 2026-10-17 18:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_token_counts(apps, schema_editor):
+    from projects.tokens import estimate_tokens
+
+    PlanMessage = apps.get_model('projects', 'PlanMessage')
+    batch = []
+    for message in PlanMessage.objects.only('id', 'content').iterator(chunk_size=1000):
+        message.token_count = estimate_tokens(message.content)
+        batch.append(message)
+        if len(batch) >= 1000:
+            PlanMessage.objects.bulk_update(batch, ['token_count'])
+            batch = []
+    PlanMessage.objects.bulk_update(batch, ['token_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_plan_message_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='planmessage',
+            name='token_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='PlanSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content', models.TextField(blank=True)),
+                ('token_count', models.PositiveIntegerField(default=0)),
+                ('last_created_at', models.DateTimeField(blank=True, null=True)),
+                ('last_message_id', models.BigIntegerField(default=0)),
+                ('message_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='plan_summary', to='projects.project')),
+            ],
+        ),
+        migrations.RunPython(backfill_token_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+from django.db import migrations, OperationalError
+
+# External-content FTS5 table over PlanMessage. project_id is indexed as a
+# token so a project's matches are found by intersecting posting lists
+# rather than filtering every match; triggers keep it in step with
+# inserts, updates and deletes, including bulk writes and raw SQL.
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE projects_planmessage_fts USING fts5(
+        content, project_id,
+        content='projects_planmessage', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER projects_planmessage_fts_insert AFTER INSERT ON projects_planmessage BEGIN
+        INSERT INTO projects_planmessage_fts(rowid, content, project_id)
+        VALUES (new.id, new.content, new.project_id);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_planmessage_fts_delete AFTER DELETE ON projects_planmessage BEGIN
+        INSERT INTO projects_planmessage_fts(projects_planmessage_fts, rowid, content, project_id)
+        VALUES ('delete', old.id, old.content, old.project_id);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_planmessage_fts_update AFTER UPDATE OF content, project_id ON projects_planmessage BEGIN
+        INSERT INTO projects_planmessage_fts(projects_planmessage_fts, rowid, content, project_id)
+        VALUES ('delete', old.id, old.content, old.project_id);
+        INSERT INTO projects_planmessage_fts(rowid, content, project_id)
+        VALUES (new.id, new.content, new.project_id);
+    END
+    """,
+    "INSERT INTO projects_planmessage_fts(projects_planmessage_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS projects_planmessage_fts_insert',
+    'DROP TRIGGER IF EXISTS projects_planmessage_fts_delete',
+    'DROP TRIGGER IF EXISTS projects_planmessage_fts_update',
+    'DROP TABLE IF EXISTS projects_planmessage_fts',
+]
+
+# PostgreSQL maintains expression indexes itself; queries must use the same
+# to_tsvector('english', content) expression to hit it.
+POSTGRES_CREATE = [
+    "CREATE INDEX plan_message_search_idx ON projects_planmessage USING GIN (to_tsvector('english', content))",
+]
+
+POSTGRES_DROP = [
+    'DROP INDEX IF EXISTS plan_message_search_idx',
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            _run(schema_editor, SQLITE_CREATE)
+        except OperationalError:
+            # SQLite built without FTS5: plan search falls back to LIKE.
+            _run(schema_editor, SQLITE_DROP)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_CREATE)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_DROP)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_project_events'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
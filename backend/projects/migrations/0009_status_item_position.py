@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-17 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_plan_message_search'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='statusitem',
+            options={'ordering': ['position', '-created_at']},
+        ),
+        migrations.AddField(
+            model_name='statusitem',
+            name='position',
+            field=models.IntegerField(default=0),
+        ),
+    ]
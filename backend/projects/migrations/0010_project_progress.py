@@ -0,0 +1,60 @@
+# Generated by Django 5.0.1 on 2026-10-17 18:23
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_progress(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    StatusItem = apps.get_model('projects', 'StatusItem')
+    PlanMessage = apps.get_model('projects', 'PlanMessage')
+    Documentation = apps.get_model('projects', 'Documentation')
+
+    def count(condition=Q()):
+        counts = (
+            StatusItem.objects.filter(condition, project=OuterRef('pk'))
+            .order_by().values('project').annotate(n=Count('id')).values('n')
+        )
+        return Coalesce(Subquery(counts), 0)
+
+    def latest(model, field):
+        return Subquery(model.objects.filter(project=OuterRef('pk')).order_by(f'-{field}').values(field)[:1])
+
+    Project.objects.update(
+        status_items_total=count(),
+        status_items_completed=count(Q(completed=True)),
+        last_message_at=latest(PlanMessage, 'created_at'),
+        docs_updated_at=latest(Documentation, 'updated_at'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_status_item_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='docs_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='status_items_completed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='status_items_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-17 19:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0010_project_progress'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='documentation',
+            name='file_tree',
+        ),
+    ]
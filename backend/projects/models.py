@@ -1,5 +1,16 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import F
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .tokens import estimate_tokens
+
+
+# Maintained by projects.progress.
+PROGRESS_FIELDS = ('status_items_total', 'status_items_completed', 'last_message_at', 'docs_updated_at')
 
 
 class Project(models.Model):
@@ -55,7 +66,14 @@ class Project(models.Model):
     database = models.CharField(max_length=50, blank=True)
     language = models.CharField(max_length=50, blank=True)
     content = models.TextField(blank=True)
+    # Spec fingerprint ``content`` was generated from; cleared on manual edits.
+    content_fingerprint = models.CharField(max_length=64, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    # Denormalized for the dashboard (PROGRESS_FIELDS); never written by save().
+    status_items_total = models.PositiveIntegerField(default=0)
+    status_items_completed = models.PositiveIntegerField(default=0)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    docs_updated_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -65,6 +83,16 @@ class Project(models.Model):
     def __str__(self):
         return f"{self.name} - {self.user.email}"
 
+    def save(self, *args, **kwargs):
+        # A full save of an instance loaded before a concurrent increment
+        # must not write the stale counters back.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in PROGRESS_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class PlanMessage(models.Model):
     ROLE_CHOICES = [
@@ -75,36 +103,240 @@ class PlanMessage(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='plan_messages')
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
     content = models.TextField()
+    # Estimated once on save so building a reply's context never re-tokenizes history.
+    token_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
-        ordering = ['created_at']
+        ordering = ['created_at', 'id']
+        indexes = [
+            # Keyset pagination of a project's chat history.
+            models.Index(fields=['project', 'created_at', 'id'], name='plan_message_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.project.name} - {self.role} - {self.created_at}"
 
+    def save(self, *args, **kwargs):
+        self.token_count = estimate_tokens(self.content)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'token_count'}
+        super().save(*args, **kwargs)
+
+
+class PlanSummary(models.Model):
+    """
+    Rolling summary of a project's older plan messages.
+
+    Every message up to and including ``(last_created_at, last_message_id)``
+    is folded into ``content``; only messages after that checkpoint are read
+    when building a reply's context.
+    """
+
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, related_name='plan_summary')
+    content = models.TextField(blank=True)
+    token_count = models.PositiveIntegerField(default=0)
+    last_created_at = models.DateTimeField(null=True, blank=True)
+    last_message_id = models.BigIntegerField(default=0)
+    message_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.project.name} - Plan summary ({self.message_count} messages)"
+
 
 class StatusItem(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='status_items')
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     completed = models.BooleanField(default=False)
+    # Board order, ascending; new items go on top (see ``top_positions``).
+    position = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['position', '-created_at']
     
     def __str__(self):
         return f"{self.project.name} - {self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the project's completed counter currently reflects for this item.
+        instance._counted_completed = instance.__dict__.get('completed')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # The post_save receiver adjusts the project's counters; run it in
+        # the same transaction as the write.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    @classmethod
+    def top_positions(cls, project, count):
+        """``count`` positions above every existing item on ``project``'s board, in order."""
+        lowest = cls.objects.filter(project=project).aggregate(lowest=models.Min('position'))['lowest']
+        start = (lowest if lowest is not None else 0) - count
+        return range(start, start + count)
+
 
 class Documentation(models.Model):
     project = models.OneToOneField(Project, on_delete=models.CASCADE, related_name='documentation')
-    file_tree = models.JSONField(default=dict)
+    # The tree itself lives in DocNode rows (served by docs/nodes).
     generated_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.project.name} - Documentation"
 
+
+class DocNodeManager(models.Manager):
+    SYNC_FIELDS = ('parent_path', 'name', 'type', 'depth', 'position', 'child_count', 'summary', 'description')
+
+    def sync_tree(self, documentation, rows):
+        """
+        Make ``documentation``'s nodes match ``rows`` (see ``flatten_file_tree``).
+
+        Only new, changed and removed nodes are written, so refreshing an
+        unchanged tree costs one SELECT.
+        """
+        existing = {
+            node['path']: node
+            for node in self.filter(documentation=documentation).values('id', 'path', *self.SYNC_FIELDS)
+        }
+        to_create, to_update = [], []
+        for row in rows:
+            current = existing.pop(row['path'], None)
+            if current is None:
+                to_create.append(self.model(documentation=documentation, **row))
+            elif any(current[field] != row[field] for field in self.SYNC_FIELDS):
+                to_update.append(self.model(id=current['id'], documentation=documentation, **row))
+        with transaction.atomic():
+            if existing:
+                self.filter(id__in=[node['id'] for node in existing.values()]).delete()
+            self.bulk_create(to_create, batch_size=1000)
+            self.bulk_update(to_update, self.SYNC_FIELDS, batch_size=1000)
+        return len(to_create), len(to_update), len(existing)
+
+
+class DocNode(models.Model):
+    TYPE_CHOICES = [
+        ('directory', 'Directory'),
+        ('file', 'File'),
+    ]
+
+    documentation = models.ForeignKey(Documentation, on_delete=models.CASCADE, related_name='nodes')
+    # Materialized path ("src/components/App.tsx"); parent_path is '' at the top level.
+    path = models.CharField(max_length=1024)
+    parent_path = models.CharField(max_length=1024, blank=True)
+    name = models.CharField(max_length=255)
+    type = models.CharField(max_length=20, choices=TYPE_CHOICES)
+    depth = models.PositiveIntegerField()
+    position = models.PositiveIntegerField()
+    child_count = models.PositiveIntegerField(default=0)
+    summary = models.CharField(max_length=160, blank=True)
+    description = models.TextField(blank=True)
+
+    objects = DocNodeManager()
+
+    class Meta:
+        ordering = ['parent_path', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['documentation', 'path'], name='unique_doc_node_path'),
+        ]
+        indexes = [
+            models.Index(fields=['documentation', 'parent_path', 'position'], name='doc_node_parent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.documentation.project.name} - {self.path}"
+
+
+class PromptCacheManager(models.Manager):
+    # Stores only evict once the cache is this fraction over
+    # PROMPT_CACHE_MAX_ENTRIES, so most stores skip eviction entirely.
+    EVICT_SLACK = 0.1
+
+    def _fresh(self):
+        ttl = settings.PROMPT_CACHE_TTL_SECONDS
+        if ttl:
+            return self.filter(created_at__gte=timezone.now() - timedelta(seconds=ttl))
+        return self.all()
+
+    def lookup(self, fingerprint):
+        """Cached content for ``fingerprint``, or ``None`` when missing or expired."""
+        return self.lookup_many([fingerprint]).get(fingerprint)
+
+    def lookup_many(self, fingerprints):
+        """``{fingerprint: content}`` for the cached, unexpired subset of ``fingerprints``."""
+        found = dict(self._fresh().filter(fingerprint__in=fingerprints).values_list('fingerprint', 'content'))
+        if found:
+            self.filter(fingerprint__in=found).update(hits=F('hits') + 1, last_used_at=timezone.now())
+        return found
+
+    def store(self, fingerprint, content):
+        self.store_many({fingerprint: content})
+
+    def store_many(self, contents):
+        """Cache ``{fingerprint: content}``, replacing existing entries."""
+        now = timezone.now()
+        self.bulk_create(
+            [
+                self.model(fingerprint=fingerprint, content=content, created_at=now, last_used_at=now)
+                for fingerprint, content in contents.items()
+            ],
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['fingerprint'],
+            update_fields=['content', 'created_at', 'last_used_at'],
+        )
+        limit = settings.PROMPT_CACHE_MAX_ENTRIES
+        if limit and self.count() > limit * (1 + self.EVICT_SLACK):
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones beyond the size limit."""
+        ttl = settings.PROMPT_CACHE_TTL_SECONDS
+        if ttl:
+            self.filter(created_at__lt=timezone.now() - timedelta(seconds=ttl)).delete()
+        limit = settings.PROMPT_CACHE_MAX_ENTRIES
+        excess = self.count() - limit if limit else 0
+        if excess > 0:
+            # Oldest first along the last_used_at index, reading only the
+            # rows being dropped.
+            stale_ids = list(self.order_by('last_used_at', 'id').values_list('id', flat=True)[:excess])
+            self.filter(id__in=stale_ids).delete()
+
+
+class PromptCache(models.Model):
+    """Generated prompt content shared by every project with the same spec."""
+
+    fingerprint = models.CharField(max_length=64, unique=True)
+    content = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    objects = PromptCacheManager()
+
+    def __str__(self):
+        return f"{self.fingerprint[:12]} ({self.hits} hits)"
+
+
+class ProjectEvent(models.Model):
+    """
+    A change published by ``projects.events.DatabaseBroker`` for delivery to
+    event streams served by other processes. Rows are pruned after
+    ``PROJECT_EVENTS_RETENTION_SECONDS``.
+    """
+
+    project_id = models.BigIntegerField()
+    type = models.CharField(max_length=50)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.project_id} - {self.type}"
@@ -0,0 +1,45 @@
+"""
+Keyset (cursor) pagination over ``(created_at, id)``.
+
+Pages are fetched newest first with ``WHERE (created_at, id) < cursor``, so
+every page, however far back, is a single range scan on a
+``(project, created_at, id)`` index instead of an ``OFFSET`` that reads and
+discards everything after it. Cursors are opaque, URL-safe tokens.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(obj):
+    raw = f'{obj.created_at.isoformat()}|{obj.id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """``(created_at, id)`` from a cursor; ``ValueError`` if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, obj_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(obj_id)
+    except (UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+
+
+def keyset_page(queryset, limit, before=None):
+    """
+    Up to ``limit`` of the newest rows in ``queryset`` older than the
+    ``before`` cursor, in chronological order.
+
+    Returns ``(rows, next_cursor)``; ``next_cursor`` fetches the page before
+    this one and is ``None`` once the beginning has been reached.
+    """
+    if before:
+        created_at, obj_id = decode_cursor(before)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=obj_id))
+    rows = list(queryset.order_by('-created_at', '-id')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    return rows, encode_cursor(rows[0]) if has_more else None
@@ -0,0 +1,81 @@
+"""
+Denormalized project progress for the dashboard.
+
+``Project.status_items_total``/``status_items_completed`` and the
+``last_message_at``/``docs_updated_at`` activity timestamps are adjusted
+with single ``UPDATE ... SET col = col + n`` statements as items, messages
+and docs are written (see ``projects.signals`` and
+``projects.status_items``), so listing projects never touches their
+children and concurrent writers cannot lose each other's increments.
+``recount`` rebuilds them from scratch.
+"""
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Documentation, PlanMessage, Project, StatusItem
+
+
+def _adjust(project_id, total=0, completed=0):
+    changes = {}
+    if total:
+        changes['status_items_total'] = Greatest(F('status_items_total') + total, Value(0))
+    if completed:
+        changes['status_items_completed'] = Greatest(F('status_items_completed') + completed, Value(0))
+    if changes:
+        Project.objects.filter(id=project_id).update(**changes)
+
+
+def _mark_counted(items):
+    for item in items:
+        item._counted_completed = item.completed
+
+
+def status_items_created(project_id, items):
+    _adjust(project_id, total=len(items), completed=sum(item.completed for item in items))
+    _mark_counted(items)
+
+
+def status_items_updated(project_id, items):
+    """Count changes to ``completed`` on ``items``, which must have been loaded from the database."""
+    if any(getattr(item, '_counted_completed', None) is None for item in items):
+        # Not loaded with ``completed`` (deferred, or built by hand); the
+        # previous value is unknown.
+        recount(Project.objects.filter(id=project_id))
+    else:
+        _adjust(project_id, completed=sum(item.completed - item._counted_completed for item in items))
+    _mark_counted(items)
+
+
+def status_item_deleted(item):
+    counted = getattr(item, '_counted_completed', None)
+    _adjust(item.project_id, total=-1, completed=-int(item.completed if counted is None else counted))
+
+
+def message_created(message):
+    Project.objects.filter(id=message.project_id).update(last_message_at=message.created_at)
+
+
+def docs_updated(documentation):
+    Project.objects.filter(id=documentation.project_id).update(docs_updated_at=documentation.updated_at)
+
+
+def recount(queryset):
+    """Recompute progress fields for every project in ``queryset`` in one UPDATE."""
+    def count(condition=Q()):
+        counts = (
+            StatusItem.objects.filter(condition, project=OuterRef('pk'))
+            .order_by().values('project').annotate(n=Count('id')).values('n')
+        )
+        return Coalesce(Subquery(counts), 0)
+
+    def latest(model, field):
+        return Subquery(
+            model.objects.filter(project=OuterRef('pk')).order_by(f'-{field}').values(field)[:1]
+        )
+
+    return queryset.update(
+        status_items_total=count(),
+        status_items_completed=count(Q(completed=True)),
+        last_message_at=latest(PlanMessage, 'created_at'),
+        docs_updated_at=latest(Documentation, 'updated_at'),
+    )
@@ -0,0 +1,123 @@
+"""
+Prompt generation for projects, memoized by a fingerprint of the project
+spec.
+
+Content is rendered from the compiled fragments in ``template_registry``:
+a header, then one section per selected AI tool. The fingerprint is a
+SHA-256 of every field the generator reads plus ``GENERATOR_VERSION`` and
+the template digest, so identical specs share one ``PromptCache`` entry
+whichever user or project produced it, and editing a template invalidates
+the entries rendered from it. Bump ``GENERATOR_VERSION`` whenever the code
+below changes the output for the same input.
+"""
+import hashlib
+import json
+from html import escape
+
+from .models import Project, PromptCache
+from .template_registry import default_registry
+
+
+GENERATOR_VERSION = 2
+
+_AI_TOOL_LABELS = dict(Project.AI_TOOLS)
+_OUTPUT_TYPE_LABELS = dict(Project.OUTPUT_TYPES)
+
+
+def project_spec(project):
+    """The project data prompt generation is based on."""
+    return {
+        'name': project.name or 'Untitled Project',
+        'description': project.description or '',
+        'ai_tools': project.ai_tools or [],
+        'target_users': project.target_users or '',
+        'experience_level': project.experience_level or '',
+        'output_type': project.output_type or '',
+        'expected_outputs': project.expected_outputs or {},
+        'frontend_framework': project.frontend_framework or '',
+        'styling': project.styling or '',
+        'backend_framework': project.backend_framework or '',
+        'database': project.database or '',
+        'language': project.language or '',
+    }
+
+
+def spec_fingerprint(spec):
+    encoded = json.dumps([GENERATOR_VERSION, default_registry().digest, spec], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def prompt_context(spec):
+    """HTML-escaped template values for ``spec``, with readable fallbacks."""
+    ai_tools = [_AI_TOOL_LABELS.get(tool, tool) for tool in spec['ai_tools']]
+    context = {
+        'name': spec['name'],
+        'description': spec['description'] or 'No description provided',
+        'ai_tools': ', '.join(ai_tools) if ai_tools else 'None selected',
+        'target_users': spec['target_users'] or 'Not specified',
+        'experience_level': spec['experience_level'] or 'Not specified',
+        'output_type': spec['output_type'],
+        'output_type_label': _OUTPUT_TYPE_LABELS.get(spec['output_type'], spec['output_type']) or 'Not specified',
+        'frontend_framework': spec['frontend_framework'],
+        'styling': spec['styling'] or 'a styling approach of your choice',
+        'backend_framework': spec['backend_framework'],
+        'database': spec['database'] or 'a suitable database',
+        'language': spec['language'],
+    }
+    return {key: escape(value) for key, value in context.items()}
+
+
+def iter_render_prompts(spec):
+    """
+    Yield the generated content in pieces: the header, then one section per
+    AI tool (a generic one when none is selected).
+
+    Streaming callers forward each piece as soon as it is rendered;
+    everything else joins them with ``render_prompts``.
+    """
+    registry = default_registry()
+    context = prompt_context(spec)
+    yield registry.fragment('header').render(context)
+    for tool in spec['ai_tools'] or ['']:
+        section = registry.section(spec['output_type'], spec['frontend_framework'], spec['backend_framework'], tool)
+        yield section.render({
+            **context,
+            'ai_tool': escape(tool),
+            'ai_tool_label': escape(_AI_TOOL_LABELS.get(tool, tool) or 'Generic'),
+        })
+
+
+def render_prompts(spec):
+    return ''.join(iter_render_prompts(spec))
+
+
+def save_generated(project, fingerprint, content, cache=True):
+    """Write generated ``content`` to ``project`` (and the shared cache) in one go."""
+    if cache:
+        PromptCache.objects.store(fingerprint, content)
+    project.content = content
+    project.content_fingerprint = fingerprint
+    project.save(update_fields=['content', 'content_fingerprint', 'updated_at'])
+
+
+def generate_project_prompts(project, generate=True):
+    """
+    Set ``project.content`` for its current spec and save it.
+
+    Returns ``'unchanged'`` when the content already matches the spec,
+    ``'hit'`` when it came from the shared cache and ``'miss'`` when it was
+    generated. With ``generate=False`` a miss leaves the project untouched,
+    for callers that hand generation off to a background job.
+    """
+    spec = project_spec(project)
+    fingerprint = spec_fingerprint(spec)
+    if project.content and project.content_fingerprint == fingerprint:
+        return 'unchanged'
+    content = PromptCache.objects.lookup(fingerprint)
+    if content is not None:
+        save_generated(project, fingerprint, content, cache=False)
+        return 'hit'
+    if not generate:
+        return 'miss'
+    save_generated(project, fingerprint, render_prompts(spec))
+    return 'miss'
@@ -0,0 +1,197 @@
+"""
+Full-text search over a project's plan messages.
+
+- SQLite: the ``projects_planmessage_fts`` FTS5 table (migration 0008),
+  kept in sync by triggers, ranked by BM25 with FTS5 snippets.
+- PostgreSQL: the ``to_tsvector('english', content)`` GIN index, ranked by
+  ``ts_rank_cd`` with ``ts_headline`` snippets. The tsquery is built from
+  the parsed terms, never from the raw query.
+- Anything else (or SQLite without FTS5): every term must appear
+  (``icontains``), newest first, snippets cut in Python.
+
+Queries are plain words, all of which must match; ``"double quotes"``
+match a phrase. Highlights are HTML-escaped message excerpts with matches
+wrapped in ``<mark>``.
+"""
+import html
+import re
+
+from django.conf import settings
+from django.db import connection
+
+from .models import PlanMessage
+
+
+FTS_TABLE = 'projects_planmessage_fts'
+
+# Snippet delimiters that cannot occur in escaped text; swapped for <mark>
+# once the excerpt has been escaped.
+START, STOP = '\x02', '\x03'
+ELLIPSIS = '…'
+SNIPPET_TOKENS = 24
+
+_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r'\w+')
+
+
+class SearchQueryError(ValueError):
+    pass
+
+
+def parse_query(query):
+    """
+    ``[(words, is_phrase)]`` for a user query; ``SearchQueryError`` when it
+    contains no searchable words.
+    """
+    terms = []
+    for phrase, word in _TERM_RE.findall(query or ''):
+        words = _WORD_RE.findall(phrase if phrase else word)
+        if words:
+            terms.append((words, bool(phrase)))
+    if not terms:
+        raise SearchQueryError('"q" must contain at least one word')
+    return terms
+
+
+def highlight(snippet):
+    escaped = html.escape(snippet)
+    return escaped.replace(START, '<mark>').replace(STOP, '</mark>')
+
+
+def _fts_available():
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def _fts_match(project_id, terms):
+    # Every word is quoted, so user input never reaches FTS5 query syntax.
+    expression = ' '.join('"' + ' '.join(words) + '"' for words, _ in terms)
+    return f'project_id : "{project_id}" AND content : ({expression})'
+
+
+def _sqlite_search(project_id, terms, limit, offset, max_candidates):
+    match = _fts_match(project_id, terms)
+    # BM25 is computed per match, so only the newest ``max_candidates``
+    # matches (a rowid range FTS5 can seek to) are ranked.
+    rank_sql = f"""
+        SELECT rowid, bm25({FTS_TABLE}, 1.0, 0.0) AS rank
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH %s AND rowid >= (
+            SELECT coalesce(min(rowid), 0) FROM (
+                SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rowid DESC LIMIT %s
+            )
+        )
+        ORDER BY rank, rowid DESC
+        LIMIT %s OFFSET %s
+    """
+    # Snippets only for the page being returned.
+    snippet_sql = f"""
+        SELECT rowid, snippet({FTS_TABLE}, 0, %s, %s, %s, %s)
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH %s AND rowid IN ({{}})
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(rank_sql, [match, match, max_candidates, limit, offset])
+        ranked = cursor.fetchall()
+        if not ranked:
+            return []
+        ids = [message_id for message_id, _ in ranked]
+        cursor.execute(
+            snippet_sql.format(', '.join(['%s'] * len(ids))),
+            [START, STOP, ELLIPSIS, SNIPPET_TOKENS, match, *ids],
+        )
+        snippets = dict(cursor.fetchall())
+    # BM25 is lower-is-better; flip it so every backend ranks higher-is-better.
+    return [(message_id, -rank, snippets.get(message_id, '')) for message_id, rank in ranked]
+
+
+def _postgres_tsquery(terms):
+    """
+    ``(sql, params)`` for a tsquery requiring every term. Each term goes
+    through ``plainto_tsquery`` (``phraseto_tsquery`` for phrases), so words
+    like ``or`` or a leading ``-`` are never read as operators.
+    """
+    parts = [
+        f"{'phraseto_tsquery' if is_phrase else 'plainto_tsquery'}('english', %s)"
+        for _, is_phrase in terms
+    ]
+    return ' && '.join(parts), [' '.join(words) for words, _ in terms]
+
+
+def _postgres_search(project_id, terms, limit, offset, max_candidates):
+    tsquery, query_params = _postgres_tsquery(terms)
+    options = f'StartSel={START}, StopSel={STOP}, FragmentDelimiter={ELLIPSIS}, MaxFragments=2, MaxWords={SNIPPET_TOKENS}, MinWords=8'
+    sql = f"""
+        WITH q AS (SELECT {tsquery} AS query),
+        candidates AS (
+            SELECT m.id, m.content FROM projects_planmessage m, q
+            WHERE m.project_id = %s AND to_tsvector('english', m.content) @@ q.query
+            ORDER BY m.id DESC
+            LIMIT %s
+        ),
+        page AS (
+            SELECT c.id, c.content, ts_rank_cd(to_tsvector('english', c.content), q.query) AS rank
+            FROM candidates c, q
+            ORDER BY rank DESC, c.id DESC
+            LIMIT %s OFFSET %s
+        )
+        SELECT page.id, page.rank, ts_headline('english', page.content, q.query, %s)
+        FROM page, q
+        ORDER BY page.rank DESC, page.id DESC
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*query_params, project_id, max_candidates, limit, offset, options])
+        return cursor.fetchall()
+
+
+def _python_snippet(content, terms):
+    words = [word for term_words, _ in terms for word in term_words]
+    pattern = re.compile('|'.join(re.escape(word) for word in words), re.IGNORECASE)
+    match = pattern.search(content)
+    start = max(0, match.start() - 60) if match else 0
+    excerpt = content[start:start + 200]
+    excerpt = pattern.sub(lambda m: f'{START}{m.group(0)}{STOP}', excerpt)
+    return (ELLIPSIS if start else '') + excerpt + (ELLIPSIS if start + 200 < len(content) else '')
+
+
+def _fallback_search(project_id, terms, limit, offset, max_candidates):
+    queryset = PlanMessage.objects.filter(project_id=project_id)
+    for words, is_phrase in terms:
+        for needle in [' '.join(words)] if is_phrase else words:
+            queryset = queryset.filter(content__icontains=needle)
+    rows = queryset.order_by('-created_at', '-id').values_list('id', 'content')[offset:min(offset + limit, max_candidates)]
+    return [(message_id, 0.0, _python_snippet(content, terms)) for message_id, content in rows]
+
+
+def search_plan_messages(project, query, limit=20, offset=0, max_candidates=None):
+    """
+    Up to ``limit`` of ``project``'s plan messages matching ``query``, best
+    first, skipping ``offset``. Only the newest ``max_candidates`` matches
+    (``PLAN_SEARCH_MAX_CANDIDATES``) are ranked, which bounds the cost of
+    very common terms in very long chats.
+
+    Returns ``(results, has_more)``; each result is ``{'message', 'rank',
+    'highlight'}``.
+    """
+    terms = parse_query(query)
+    if _fts_available():
+        search = _sqlite_search
+    elif connection.vendor == 'postgresql':
+        search = _postgres_search
+    else:
+        search = _fallback_search
+    max_candidates = max_candidates or settings.PLAN_SEARCH_MAX_CANDIDATES
+    rows = search(project.id, terms, limit + 1, offset, max_candidates)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    messages = PlanMessage.objects.in_bulk([message_id for message_id, _, _ in rows])
+    results = [
+        {'message': messages[message_id], 'rank': rank, 'highlight': highlight(snippet)}
+        for message_id, rank, snippet in rows
+        if message_id in messages
+    ]
+    return results, has_more
@@ -1,22 +1,43 @@
 from rest_framework import serializers
-from .models import Project, PlanMessage, StatusItem, Documentation
+from services.RAG.paths import check_repository_name
+from .models import Project, PlanMessage, StatusItem, Documentation, DocNode
 
 
 class ProjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
         fields = '__all__'
-        read_only_fields = ('user', 'created_at', 'updated_at')
+        read_only_fields = (
+            'user', 'content_fingerprint', 'status_items_total', 'status_items_completed',
+            'last_message_at', 'docs_updated_at', 'created_at', 'updated_at',
+        )
     
+    def validate_repository_name(self, value):
+        if value:
+            try:
+                check_repository_name(value)
+            except ValueError as e:
+                raise serializers.ValidationError(str(e))
+        return value
+
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
+    def update(self, instance, validated_data):
+        if 'content' in validated_data:
+            # Hand-edited content no longer matches any generated spec.
+            validated_data['content_fingerprint'] = ''
+        return super().update(instance, validated_data)
+
 
 class ProjectListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
-        fields = ('id', 'name', 'description', 'created_at', 'updated_at', 'ai_tools', 'status', 'output_type', 'repository_name')
+        fields = (
+            'id', 'name', 'description', 'created_at', 'updated_at', 'ai_tools', 'status', 'output_type',
+            'repository_name', 'status_items_total', 'status_items_completed', 'last_message_at', 'docs_updated_at',
+        )
         read_only_fields = fields
 
 
@@ -24,7 +45,7 @@ class PlanMessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = PlanMessage
         fields = '__all__'
-        read_only_fields = ('project', 'created_at')
+        read_only_fields = ('project', 'token_count', 'created_at')
 
 
 class StatusItemSerializer(serializers.ModelSerializer):
@@ -37,6 +58,31 @@ class StatusItemSerializer(serializers.ModelSerializer):
 class DocumentationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Documentation
-        fields = '__all__'
-        read_only_fields = ('project', 'generated_at', 'updated_at')
+        fields = ('id', 'project', 'generated_at', 'updated_at')
+        read_only_fields = fields
+
+
+class DocNodeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DocNode
+        fields = ('id', 'path', 'parent_path', 'name', 'type', 'depth', 'child_count', 'summary', 'description')
+        read_only_fields = fields
+
+
+class StatusListField(serializers.ListField):
+    """A list of project statuses; a single status may be given as a string."""
+    child = serializers.ChoiceField(choices=Project.STATUS_CHOICES)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [data]
+        return super().to_internal_value(data)
+
 
+class BulkGeneratePromptsSerializer(serializers.Serializer):
+    project_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    statuses = StatusListField(required=False, allow_empty=False)
+    output_type = serializers.ChoiceField(choices=Project.OUTPUT_TYPES, required=False, allow_blank=True, allow_null=True)
+    force = serializers.BooleanField(required=False, default=False)
+    batch_size = serializers.IntegerField(required=False, min_value=1)
+    concurrency = serializers.IntegerField(required=False, min_value=1)
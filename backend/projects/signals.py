@@ -0,0 +1,71 @@
+"""
+Publish project change events (see ``projects.events``) and keep project
+progress counters (see ``projects.progress``) current from model saves.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import progress
+from .events import publish_event
+from .models import Documentation, PlanMessage, Project, StatusItem
+from .serializers import PlanMessageSerializer, ProjectListSerializer, StatusItemSerializer
+
+
+def project_delta(project, update_fields=None):
+    """
+    The ``project.updated`` payload: the list fields plus whether ``content``
+    may have changed. Content itself is left out to keep events small;
+    clients re-fetch the project when they need it.
+    """
+    return {
+        **ProjectListSerializer(project).data,
+        'content_fingerprint': project.content_fingerprint,
+        'content_changed': update_fields is None or 'content' in update_fields,
+    }
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Nobody can be subscribed to a project before it exists.
+    if not created:
+        publish_event(instance.id, 'project.updated', project_delta(instance, update_fields))
+
+
+@receiver(post_save, sender=PlanMessage)
+def plan_message_saved(sender, instance, created, **kwargs):
+    if created:
+        progress.message_created(instance)
+    event_type = 'plan_message.created' if created else 'plan_message.updated'
+    publish_event(instance.project_id, event_type, PlanMessageSerializer(instance).data)
+
+
+@receiver(post_delete, sender=PlanMessage)
+def plan_message_deleted(sender, instance, **kwargs):
+    publish_event(instance.project_id, 'plan_message.deleted', {'id': instance.id})
+
+
+@receiver(post_save, sender=StatusItem)
+def status_item_saved(sender, instance, created, **kwargs):
+    if created:
+        progress.status_items_created(instance.project_id, [instance])
+    else:
+        progress.status_items_updated(instance.project_id, [instance])
+    event_type = 'status_item.created' if created else 'status_item.updated'
+    publish_event(instance.project_id, event_type, StatusItemSerializer(instance).data)
+
+
+@receiver(post_delete, sender=StatusItem)
+def status_item_deleted(sender, instance, **kwargs):
+    progress.status_item_deleted(instance)
+    publish_event(instance.project_id, 'status_item.deleted', {'id': instance.id})
+
+
+@receiver(post_save, sender=Documentation)
+def documentation_saved(sender, instance, **kwargs):
+    progress.docs_updated(instance)
+    # The tree is fetched through docs/nodes, so only announce the change.
+    publish_event(instance.project_id, 'documentation.updated', {
+        'id': instance.id,
+        'generated_at': instance.generated_at.isoformat(),
+        'updated_at': instance.updated_at.isoformat(),
+    })
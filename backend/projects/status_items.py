@@ -0,0 +1,118 @@
+"""
+Bulk status item writes.
+
+Every item in a request is validated before anything is written; if any
+fails, nothing is written and the errors come back per item (``index`` is
+the item's position in the request). Valid requests are applied with one
+``bulk_create`` or ``bulk_update`` inside a transaction, along with the
+progress counter updates and change events ``post_save`` would have done.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import progress
+from .events import publish_event
+from .models import StatusItem
+from .serializers import StatusItemSerializer
+
+
+UPDATABLE_FIELDS = ('title', 'description', 'completed', 'position')
+
+
+class BulkValidationError(Exception):
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or []
+
+
+def _items(data):
+    items = data.get('items') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        raise BulkValidationError('"items" must be a non-empty list')
+    if len(items) > settings.STATUS_ITEMS_BULK_MAX:
+        raise BulkValidationError(f'At most {settings.STATUS_ITEMS_BULK_MAX} items per request')
+    return items
+
+
+def _item_id(item):
+    item_id = item.get('id') if isinstance(item, dict) else None
+    # bool is an int subclass, but true is not an id.
+    return item_id if type(item_id) is int else None
+
+
+def _publish(project, event_type, items):
+    for item in items:
+        publish_event(project.id, event_type, StatusItemSerializer(item).data)
+
+
+def bulk_create_status_items(project, data):
+    """
+    Create ``data['items']`` on ``project``'s board, in request order and
+    above the existing items unless they give a ``position``.
+    """
+    items = _items(data)
+    errors, validated = [], []
+    for index, item in enumerate(items):
+        serializer = StatusItemSerializer(data=item)
+        if serializer.is_valid():
+            validated.append(serializer.validated_data)
+        else:
+            errors.append({'index': index, 'errors': serializer.errors})
+    if errors:
+        raise BulkValidationError('Some items are invalid; nothing was created', errors)
+
+    with transaction.atomic():
+        positions = iter(StatusItem.top_positions(project, len(validated)))
+        created = StatusItem.objects.bulk_create([
+            StatusItem(project=project, **{'position': next(positions), **fields})
+            for fields in validated
+        ])
+        progress.status_items_created(project.id, created)
+        _publish(project, 'status_item.created', created)
+    return created
+
+
+def bulk_update_status_items(project, data):
+    """
+    Apply partial updates (``{'id', ...fields}``) to ``project``'s items,
+    e.g. toggling ``completed`` or reordering by ``position``.
+    """
+    items = _items(data)
+    ids = [_item_id(item) for item in items]
+    with transaction.atomic():
+        existing = StatusItem.objects.select_for_update().in_bulk(
+            [item_id for item_id in ids if item_id is not None]
+        )
+        errors, changed, fields = [], {}, set()
+        for index, (item_id, item) in enumerate(zip(ids, items)):
+            instance = existing.get(item_id)
+            if instance is None or instance.project_id != project.id:
+                errors.append({'index': index, 'errors': {'id': ['Status item not found']}})
+                continue
+            if item_id in changed:
+                errors.append({'index': index, 'errors': {'id': ['Duplicate item in request']}})
+                continue
+            serializer = StatusItemSerializer(instance, data=item, partial=True)
+            if not serializer.is_valid():
+                errors.append({'index': index, 'errors': serializer.errors})
+                continue
+            for field, value in serializer.validated_data.items():
+                if field in UPDATABLE_FIELDS:
+                    setattr(instance, field, value)
+                    fields.add(field)
+            changed[item_id] = instance
+        if errors:
+            raise BulkValidationError('Some items are invalid; nothing was updated', errors)
+
+        updated = [changed[item_id] for item_id in ids]
+        if fields:
+            now = timezone.now()
+            for instance in updated:
+                # bulk_update skips auto_now fields.
+                instance.updated_at = now
+            StatusItem.objects.bulk_update(updated, [*sorted(fields), 'updated_at'])
+            progress.status_items_updated(project.id, updated)
+            _publish(project, 'status_item.updated', updated)
+    return updated
@@ -0,0 +1,209 @@
+"""
+Server-sent event endpoints.
+
+These are plain async Django views rather than DRF actions: DRF views are
+synchronous, so a streamed response would hold a worker thread for the
+whole generation. Served through ``backend.asgi`` (e.g. ``uvicorn
+backend.asgi:application``) each open stream is just a coroutine on the
+event loop; blocking generator steps run on a thread pool one at a time.
+
+Under ``runserver``/WSGI the endpoints still work, but Django buffers the
+async iterator, so events only arrive once generation finishes.
+"""
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.conf import settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .assistant import AssistantError, get_assistant
+from .conversation import build_plan_context
+from .events import get_broker
+from .models import PlanMessage, Project, PromptCache
+from .prompts import iter_render_prompts, project_spec, save_generated, spec_fingerprint
+from .serializers import PlanMessageSerializer
+
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+def _authenticate(request):
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return result[0] if result else None
+
+
+async def _aiter_sync(iterable):
+    """Iterate a blocking iterator without blocking the event loop."""
+    iterator = iter(iterable)
+    sentinel = object()
+    step = sync_to_async(next, thread_sensitive=False)
+    while True:
+        item = await step(iterator, sentinel)
+        if item is sentinel:
+            return
+        yield item
+
+
+async def _request_project(request, pk, method='POST'):
+    """``(project, None)`` for the authenticated owner, else ``(None, error response)``."""
+    if request.method != method:
+        return None, JsonResponse({'error': 'Method not allowed'}, status=405)
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return None, JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    try:
+        return await Project.objects.aget(id=pk, user=user, status__in=['active', 'archived']), None
+    except (Project.DoesNotExist, ValueError):
+        return None, JsonResponse({'detail': 'Not found.'}, status=404)
+
+
+def event_stream_response(events):
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx and similar proxies from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# Token-authenticated like the DRF views, which are CSRF exempt too.
+@csrf_exempt
+async def generate_prompts_stream(request, pk):
+    """
+    Stream prompt generation for a project as server-sent events.
+
+    Events: ``start`` (immediately), ``delta`` for each generated piece,
+    then ``done`` with the saved project fields, or ``error``. The project
+    is written once, after the last piece. Unchanged specs and cache hits
+    send the whole content as a single ``delta``.
+    """
+    project, error = await _request_project(request, pk)
+    if error is not None:
+        return error
+
+    async def events():
+        spec = project_spec(project)
+        fingerprint = spec_fingerprint(spec)
+        yield sse_event('start', {'project_id': project.id})
+        try:
+            if project.content and project.content_fingerprint == fingerprint:
+                outcome, content = 'unchanged', project.content
+                yield sse_event('delta', {'content': content})
+            else:
+                content = await sync_to_async(PromptCache.objects.lookup)(fingerprint)
+                if content is not None:
+                    outcome = 'hit'
+                    yield sse_event('delta', {'content': content})
+                else:
+                    outcome = 'miss'
+                    pieces = []
+                    async for piece in _aiter_sync(iter_render_prompts(spec)):
+                        pieces.append(piece)
+                        yield sse_event('delta', {'content': piece})
+                    content = ''.join(pieces)
+                if outcome != 'unchanged':
+                    await sync_to_async(save_generated)(project, fingerprint, content, cache=outcome == 'miss')
+        except Exception as e:
+            yield sse_event('error', {'error': str(e), 'message': 'Failed to generate prompts'})
+            return
+        yield sse_event('done', {
+            'message': 'Prompts generated successfully',
+            'cached': outcome != 'miss',
+            'cache': outcome,
+            'project': {
+                'id': project.id,
+                'content_fingerprint': project.content_fingerprint,
+                'updated_at': project.updated_at.isoformat(),
+            },
+        })
+
+    return event_stream_response(events())
+
+
+@csrf_exempt
+async def plan_reply_stream(request, pk):
+    """
+    Save a Plans chat message and stream the assistant's reply as server-sent
+    events.
+
+    Events: ``message`` (the saved user message), ``delta`` for each piece of
+    the reply, then ``done`` with the saved assistant message, or ``error``.
+    The reply is written in one insert once it is complete; nothing is saved
+    if generation fails or the client disconnects first.
+    """
+    project, error = await _request_project(request, pk)
+    if error is not None:
+        return error
+    try:
+        content = json.loads(request.body or b'{}').get('content', '').strip()
+    except (ValueError, AttributeError):
+        content = ''
+    if not content:
+        return JsonResponse({'error': '"content" is required'}, status=400)
+
+    message = await PlanMessage.objects.acreate(project=project, role='user', content=content)
+    context = await sync_to_async(build_plan_context)(project)
+
+    async def events():
+        yield sse_event('message', PlanMessageSerializer(message).data)
+        pieces = []
+        try:
+            async for piece in get_assistant().stream(context):
+                pieces.append(piece)
+                yield sse_event('delta', {'content': piece})
+        except AssistantError as e:
+            yield sse_event('error', {'error': str(e), 'message': 'Failed to generate a reply'})
+            return
+        except Exception as e:
+            # Network/TLS errors, timeouts, malformed payloads. A client
+            # disconnect (CancelledError) is a BaseException and propagates.
+            logger.exception('Plan reply stream failed for project %s', project.id)
+            yield sse_event('error', {'error': str(e), 'message': 'Failed to generate a reply'})
+            return
+        reply = await PlanMessage.objects.acreate(project=project, role='assistant', content=''.join(pieces))
+        yield sse_event('done', PlanMessageSerializer(reply).data)
+
+    return event_stream_response(events())
+
+
+@csrf_exempt
+async def project_events(request, pk):
+    """
+    Stream a project's change events (see ``projects.events``) as server-sent
+    events until the client disconnects.
+
+    ``ready`` is sent once subscribed; after that each event is named by its
+    type (``plan_message.created``, ``status_item.updated``,
+    ``documentation.updated``, ``project.updated``, ...) and carries the
+    changed fields. ``resync`` means events were dropped and the client
+    should reload. A comment line is sent every
+    ``PROJECT_EVENTS_KEEPALIVE_SECONDS`` to keep idle connections open.
+    """
+    project, error = await _request_project(request, pk, method='GET')
+    if error is not None:
+        return error
+
+    async def events():
+        subscription = get_broker().subscribe(project.id)
+        try:
+            yield sse_event('ready', {'project_id': project.id})
+            while True:
+                event = await subscription.get(timeout=settings.PROJECT_EVENTS_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ': keepalive\n\n'
+                else:
+                    yield sse_event(event['type'], event['data'])
+        finally:
+            subscription.close()
+
+    return event_stream_response(events())
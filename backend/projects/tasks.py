@@ -0,0 +1,157 @@
+"""
+Background job handlers for project endpoints that are too slow to run
+inside a request. Views enqueue these with ``jobs.queue.enqueue`` and
+return 202; ``python manage.py run_jobs`` executes them.
+"""
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from jobs.models import Job
+from jobs.queue import PermanentJobError, task
+from services.RAG.docs import build_repository_file_tree, flatten_file_tree
+from services.RAG.ingest.archive import ArchiveError, sync_project_archive
+from services.RAG.ingest.incremental import Manifest, sync_project_repository
+from services.RAG.paths import project_data_dir
+
+from .bulk import bulk_queryset, regenerate_prompts
+from .models import Project, Documentation, DocNode
+from .prompts import generate_project_prompts
+from .serializers import ProjectSerializer
+
+
+def _get_project(job):
+    try:
+        return Project.objects.get(id=job.payload['project_id'])
+    except Project.DoesNotExist:
+        raise PermanentJobError('Project no longer exists')
+
+
+@task('projects.generate_prompts', priority=10)
+def generate_prompts(job):
+    """Generate prompts for a project, reusing cached output for an identical spec."""
+    project = _get_project(job)
+    outcome = generate_project_prompts(project)
+    return {
+        'message': 'Prompts generated successfully',
+        'cached': outcome != 'miss',
+        'cache': outcome,
+        'project': ProjectSerializer(project).data,
+    }
+
+
+@task('projects.bulk_generate_prompts', priority=-10)
+def bulk_generate_prompts(job):
+    """Regenerate prompts for many projects, resuming from the job's last checkpoint."""
+    payload = job.payload
+
+    def checkpoint(progress):
+        Job.objects.filter(id=job.id).update(result=progress, updated_at=timezone.now())
+
+    return regenerate_prompts(
+        bulk_queryset(
+            project_ids=payload.get('project_ids'),
+            statuses=payload.get('statuses') or ('active', 'archived'),
+            output_type=payload.get('output_type'),
+        ),
+        batch_size=payload.get('batch_size') or settings.PROMPT_BULK_BATCH_SIZE,
+        concurrency=payload.get('concurrency') or settings.PROMPT_BULK_CONCURRENCY,
+        force=payload.get('force', False),
+        # A retried job carries the progress of the attempt that failed.
+        progress=job.result,
+        on_batch=checkpoint,
+    )
+
+
+@task('projects.initialize_docs')
+def initialize_docs(job):
+    """Sync the project's repository and rebuild its documentation tree."""
+    project = _get_project(job)
+
+    if project.repository_name:
+        # Incremental sync: only files whose blob SHA changed since the
+        # last run are re-read, so an unchanged repository is near-free.
+        try:
+            sync_project_repository(project)
+        except (ValueError, FileNotFoundError) as e:
+            # A missing checkout will not appear by retrying; GitError may.
+            raise PermanentJobError(str(e))
+    # Projects without a checkout may still have an uploaded archive ingested.
+    data_dir = project_data_dir(project.id, create=False)
+    manifest = Manifest.load(data_dir)
+    if manifest.files:
+        # Descriptions are cached by blob SHA, so only changed files are described.
+        file_tree = build_repository_file_tree(data_dir, manifest)
+    else:
+        file_tree = placeholder_file_tree()
+
+    # One transaction, so the documentation.updated event goes out once the
+    # nodes it announces are in place.
+    with transaction.atomic():
+        documentation, created = Documentation.objects.get_or_create(project=project)
+        if not created:
+            documentation.save()  # bumps updated_at
+        DocNode.objects.sync_tree(documentation, flatten_file_tree(file_tree))
+
+    # The tree itself is served by the docs/nodes endpoints.
+    return {
+        'message': 'Documentation initialized',
+        'documentation_id': documentation.id,
+        'files': len(manifest.files),
+    }
+
+
+@task('projects.ingest_archive')
+def ingest_archive(job):
+    """Ingest and index an archive staged by the repository upload endpoint, then remove it."""
+    path = job.payload['path']
+    if not os.path.exists(path):
+        raise PermanentJobError('Staged archive is missing')
+    retrying = False
+    try:
+        project = _get_project(job)
+        with open(path, 'rb') as fileobj:
+            result = sync_project_archive(project, fileobj, job.payload['name'])
+    except ArchiveError as e:
+        raise PermanentJobError(str(e))
+    except PermanentJobError:
+        raise
+    except Exception:
+        # Keep the archive for the next attempt.
+        retrying = job.attempts < job.max_attempts
+        raise
+    finally:
+        if not retrying:
+            os.remove(path)
+    return {'message': 'Archive ingested', **result.as_dict()}
+
+
+def placeholder_file_tree():
+    # Used until a repository is connected to the project
+    return [
+        {
+            'name': 'src',
+            'type': 'directory',
+            'description': 'Source code directory',
+            'children': [
+                {
+                    'name': 'components',
+                    'type': 'directory',
+                    'description': 'React components',
+                    'children': []
+                },
+                {
+                    'name': 'pages',
+                    'type': 'directory',
+                    'description': 'Page components',
+                    'children': []
+                }
+            ]
+        },
+        {
+            'name': 'README.md',
+            'type': 'file',
+            'description': 'Project documentation and setup instructions'
+        }
+    ]
@@ -0,0 +1,161 @@
+"""
+Compiled prompt templates.
+
+Prompt text lives in ``prompt_templates/`` as HTML fragments with
+``{placeholder}`` fields (``{{``/``}}`` for literal braces):
+
+- ``header.html`` once per project, ``section.html`` once per AI tool;
+- ``output_type/<type>.html``, ``frontend/<framework>.html``,
+  ``backend/<framework>.html`` and ``ai_tool/<tool>.html`` appended to each
+  section. Names are slugs (``Next.js`` -> ``next-js``); a missing
+  ``output_type`` or ``ai_tool`` fragment falls back to ``default.html``, a
+  missing framework fragment is left out.
+
+Every fragment is parsed once into ``(literal, field)`` pairs and the
+composed template for an ``(output_type, frontend_framework,
+backend_framework, ai_tool)`` combination is cached, so rendering is a few
+dict lookups plus a string join. With ``auto_reload`` (``DEBUG`` by
+default) the directory is re-scanned at most once per ``check_interval``
+seconds and edits are picked up without a restart. ``digest`` changes with the template
+sources and is part of the prompt cache fingerprint.
+"""
+import hashlib
+import re
+import string
+import threading
+import time
+from pathlib import Path
+
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / 'prompt_templates'
+
+CONTEXT_FIELDS = frozenset({
+    'name', 'description', 'ai_tools', 'target_users', 'experience_level', 'output_type',
+    'output_type_label', 'frontend_framework', 'styling', 'backend_framework', 'database',
+    'language', 'ai_tool', 'ai_tool_label',
+})
+
+_FORMATTER = string.Formatter()
+
+
+class TemplateError(ValueError):
+    pass
+
+
+def slugify(value):
+    return re.sub(r'[^a-z0-9]+', '-', (value or '').lower()).strip('-')
+
+
+class CompiledTemplate:
+    __slots__ = ('parts',)
+
+    def __init__(self, parts):
+        self.parts = tuple(parts)
+
+    @classmethod
+    def compile(cls, source, name):
+        parts = []
+        try:
+            parsed = list(_FORMATTER.parse(source))
+        except ValueError as e:
+            raise TemplateError(f'{name}: {e}')
+        for literal, field, format_spec, conversion in parsed:
+            if field is not None and (field not in CONTEXT_FIELDS or format_spec or conversion):
+                raise TemplateError(f'{name}: unknown placeholder {{{field}}}')
+            parts.append((literal, field))
+        return cls(parts)
+
+    def __add__(self, other):
+        return CompiledTemplate(self.parts + other.parts)
+
+    def render(self, context):
+        return ''.join(literal + context[field] if field else literal for literal, field in self.parts)
+
+
+class _State:
+    def __init__(self, fragments, digest, mtime):
+        self.fragments = fragments
+        self.digest = digest
+        self.mtime = mtime
+        self.composed = {}
+
+
+class TemplateRegistry:
+    def __init__(self, directory=TEMPLATE_DIR, auto_reload=False, check_interval=1.0):
+        self.directory = Path(directory)
+        self.auto_reload = auto_reload
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._state = self._load()
+
+    def _scan_mtime(self):
+        # Directory mtimes change when fragments are added or removed.
+        paths = [self.directory, *self.directory.rglob('*')]
+        return max(path.stat().st_mtime_ns for path in paths)
+
+    def _load(self):
+        mtime = self._scan_mtime()
+        fragments = {}
+        digest = hashlib.sha256()
+        for path in sorted(self.directory.rglob('*.html')):
+            name = path.relative_to(self.directory).with_suffix('').as_posix()
+            source = path.read_text(encoding='utf-8')
+            fragments[name] = CompiledTemplate.compile(source, name)
+            digest.update(f'{name}\0{source}\0'.encode('utf-8'))
+        return _State(fragments, digest.hexdigest(), mtime)
+
+    def _current(self):
+        if self.auto_reload and time.monotonic() - self._checked_at >= self.check_interval:
+            with self._lock:
+                self._checked_at = time.monotonic()
+                if self._scan_mtime() != self._state.mtime:
+                    self._state = self._load()
+        return self._state
+
+    @property
+    def digest(self):
+        return self._current().digest
+
+    def fragment(self, name):
+        return self._current().fragments[name]
+
+    def section(self, output_type, frontend_framework, backend_framework, ai_tool):
+        """The composed template for one AI tool's section of a project's prompts."""
+        state = self._current()
+        # Keyed by the fragments used, so free-text framework names without a
+        # fragment share one entry instead of growing the cache.
+        key = self._resolve(
+            state.fragments, slugify(output_type), slugify(frontend_framework),
+            slugify(backend_framework), slugify(ai_tool),
+        )
+        template = state.composed.get(key)
+        if template is None:
+            template = CompiledTemplate(())
+            for name in key:
+                template += state.fragments[name]
+            state.composed[key] = template
+        return template
+
+    @staticmethod
+    def _resolve(fragments, output_type, frontend_framework, backend_framework, ai_tool):
+        names = (
+            'section',
+            f'output_type/{output_type}' if f'output_type/{output_type}' in fragments else 'output_type/default',
+            f'frontend/{frontend_framework}',
+            f'backend/{backend_framework}',
+            f'ai_tool/{ai_tool}' if f'ai_tool/{ai_tool}' in fragments else 'ai_tool/default',
+        )
+        return tuple(name for name in names if name in fragments)
+
+
+def default_registry():
+    global _default_registry
+    if _default_registry is None:
+        from django.conf import settings
+
+        _default_registry = TemplateRegistry(auto_reload=settings.PROMPT_TEMPLATES_AUTO_RELOAD)
+    return _default_registry
+
+
+_default_registry = None
@@ -0,0 +1,14 @@
+"""
+Token estimates for prompt budgeting.
+
+Counts are approximate (about four characters per token for English text
+and code, the usual rule of thumb for BPE tokenizers) so no model-specific
+tokenizer is needed; budgets should leave some headroom.
+"""
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
@@ -1,11 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .streaming import generate_prompts_stream, plan_reply_stream, project_events
 from .views import ProjectViewSet
 
 router = DefaultRouter()
 router.register(r'', ProjectViewSet, basename='project')
 
 urlpatterns = [
+    path('<int:pk>/generate-prompts/stream/', generate_prompts_stream, name='project-generate-prompts-stream'),
+    path('<int:pk>/plans/messages/stream/', plan_reply_stream, name='project-plan-reply-stream'),
+    path('<int:pk>/events/', project_events, name='project-events'),
     path('', include(router.urls)),
 ]
 
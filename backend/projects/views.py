@@ -1,16 +1,36 @@
+import hashlib
+import json
+import tempfile
+
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Project, PlanMessage, StatusItem, Documentation
+from .models import Project, PlanMessage, StatusItem, Documentation, DocNode
+from .pagination import keyset_page
+from .prompts import generate_project_prompts
+from .search import SearchQueryError, search_plan_messages
+from .status_items import BulkValidationError, bulk_create_status_items, bulk_update_status_items
 from .serializers import (
     ProjectSerializer, 
     ProjectListSerializer, 
     PlanMessageSerializer, 
     StatusItemSerializer, 
-    DocumentationSerializer
+    DocumentationSerializer,
+    DocNodeSerializer,
+    BulkGeneratePromptsSerializer
 )
+from django.conf import settings
+from django.urls import reverse
+from jobs.queue import enqueue
+from jobs.serializers import JobSerializer
+from services.RAG.docs import nest_doc_nodes
+from services.RAG.index.generations import IndexNotFound
+from services.RAG.ingest.archive import ArchiveError, archive_format
+from services.RAG.paths import repository_path, uploads_dir
+from services.RAG.search import search_project_code
 
 
 class ProjectViewSet(viewsets.ModelViewSet):
@@ -87,73 +107,61 @@ class ProjectViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], url_path='generate-prompts')
     def generate_prompts(self, request, pk=None):
         """
-        Generate prompts for a project using the Python prompt generation service.
-        This endpoint will call your Python service to generate prompts based on project data.
+        Generate prompts for a project.
+        Unchanged specs and specs already in the shared cache are answered
+        immediately; anything else is queued and its result is available from
+        the returned job once a worker has run it.
         """
-        try:
-            project = self.get_object()
-            
-            # Prepare project data for your Python service
-            import json
-            project_data = {
-                'id': project.id,
-                'name': project.name or 'Untitled Project',
-                'description': project.description or '',
-                'ai_tools': project.ai_tools or [],
-                'target_users': project.target_users or '',
-                'experience_level': project.experience_level or '',
-                'output_type': project.output_type or '',
-                'expected_outputs': project.expected_outputs or {},
-                'frontend_framework': project.frontend_framework or '',
-                'styling': project.styling or '',
-                'backend_framework': project.backend_framework or '',
-                'database': project.database or '',
-                'language': project.language or '',
-            }
-            
-            # TODO: Integrate with your Python prompt generation service
-            # Example integration options:
-            #
-            # Option 1: Import as module
-            # from prompt_generator import generate_prompts
-            # generated_content = generate_prompts(project_data)
-            #
-            # Option 2: HTTP request to separate service
-            # import requests
-            # response = requests.post('http://localhost:8001/generate', json=project_data)
-            # generated_content = response.json()['content']
-            #
-            # Option 3: Subprocess call
-            # import subprocess
-            # result = subprocess.run(['python', 'path/to/prompt_generator.py'], 
-            #                          input=json.dumps(project_data),
-            #                          capture_output=True, text=True)
-            # generated_content = json.loads(result.stdout)['content']
-            
-            # Placeholder - replace with actual generated content
-            generated_content = f"""<h1>{project.name or 'Untitled Project'}</h1>
-<p>{project.description or 'No description provided'}</p>
-<p><strong>AI Tools:</strong> {', '.join(project.ai_tools) if project.ai_tools else 'None selected'}</p>
-<p><strong>Target Users:</strong> {project.target_users or 'Not specified'}</p>
-<p><strong>Experience Level:</strong> {project.experience_level or 'Not specified'}</p>
-<p><strong>Output Type:</strong> {project.output_type or 'Not specified'}</p>
-<p><strong>Note:</strong> Integrate with your Python prompt generation service to generate actual prompts.</p>"""
-            
-            # Save generated content to project
-            project.content = generated_content
-            project.save()
-            
+        project = self.get_object()
+        outcome = generate_project_prompts(project, generate=False)
+        if outcome != 'miss':
             serializer = self.get_serializer(project)
             return Response({
-                'message': 'Prompts generated successfully',
+                'message': 'Prompts are up to date' if outcome == 'unchanged' else 'Prompts generated successfully',
+                'cached': True,
+                'cache': outcome,
                 'project': serializer.data
             }, status=status.HTTP_200_OK)
-            
-        except Exception as e:
-            return Response({
-                'error': str(e),
-                'message': 'Failed to generate prompts'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        job = enqueue(
+            'projects.generate_prompts',
+            {'project_id': project.id},
+            user=request.user,
+            project=project,
+            dedupe_key=f'projects.generate_prompts:{project.id}',
+        )
+        return self._job_accepted(request, job, 'Prompt generation queued')
+
+    @action(detail=False, methods=['post'], url_path='bulk-generate-prompts', permission_classes=[IsAdminUser])
+    def bulk_generate_prompts(self, request):
+        """
+        Queue prompt regeneration for many projects (admin only).
+        Accepts optional project_ids, output_type, statuses (one status or a
+        list), force, batch_size and concurrency; progress is checkpointed in
+        the job's result.
+        """
+        serializer = BulkGeneratePromptsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        options = serializer.validated_data
+        payload = {
+            'project_ids': sorted(set(options.get('project_ids') or [])),
+            'statuses': sorted(set(options.get('statuses') or ['active', 'archived'])),
+            'output_type': options.get('output_type') or None,
+            'force': options['force'],
+            'batch_size': options.get('batch_size') or settings.PROMPT_BULK_BATCH_SIZE,
+            'concurrency': options.get('concurrency') or settings.PROMPT_BULK_CONCURRENCY,
+        }
+        job = enqueue(
+            'projects.bulk_generate_prompts',
+            payload,
+            user=request.user,
+            # Only an identical request joins an active run; a different
+            # selection or option set queues its own job.
+            dedupe_key='projects.bulk_generate_prompts:' + hashlib.sha256(
+                json.dumps(payload, sort_keys=True).encode('utf-8')
+            ).hexdigest(),
+        )
+        return self._job_accepted(request, job, 'Bulk prompt generation queued')
 
     # Plans/Chat endpoints
     @action(detail=True, methods=['get', 'post'], url_path='plans/messages')
@@ -161,37 +169,111 @@ class ProjectViewSet(viewsets.ModelViewSet):
         project = self.get_object()
         
         if request.method == 'GET':
-            messages = PlanMessage.objects.filter(project=project).order_by('created_at')
+            # Latest `limit` messages, or the page before the `before` cursor.
+            try:
+                limit = int(request.query_params.get('limit', settings.PLAN_MESSAGES_PAGE_SIZE))
+            except ValueError:
+                return Response(
+                    {'error': '"limit" must be a number'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                messages, next_cursor = keyset_page(
+                    PlanMessage.objects.filter(project=project),
+                    max(1, min(limit, settings.PLAN_MESSAGES_MAX_PAGE_SIZE)),
+                    before=request.query_params.get('before'),
+                )
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             serializer = PlanMessageSerializer(messages, many=True)
-            return Response(serializer.data)
+            return Response({
+                'results': serializer.data,
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None,
+            })
         
         elif request.method == 'POST':
             serializer = PlanMessageSerializer(data=request.data)
             if serializer.is_valid():
+                # Only stores the message; plans/messages/stream/ also
+                # streams the assistant's reply.
                 serializer.save(project=project)
-                # TODO: Generate assistant response using AI
-                # For now, just return the user message
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['get'], url_path='plans/search')
+    def plans_search(self, request, pk=None):
+        project = self.get_object()
+        try:
+            limit = int(request.query_params.get('limit', settings.PLAN_SEARCH_PAGE_SIZE))
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            return Response(
+                {'error': '"limit" and "offset" must be numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(1, min(limit, settings.PLAN_MESSAGES_MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        try:
+            results, has_more = search_plan_messages(project, request.query_params.get('q', ''), limit, offset)
+        except SearchQueryError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'results': [
+                {
+                    'message': PlanMessageSerializer(result['message']).data,
+                    'rank': result['rank'],
+                    'highlight': result['highlight'],
+                }
+                for result in results
+            ],
+            'next_offset': offset + limit if has_more else None,
+            'has_more': has_more,
+        })
+
     # Status/Todos endpoints
     @action(detail=True, methods=['get', 'post'], url_path='status/items')
     def status_items(self, request, pk=None):
         project = self.get_object()
         
         if request.method == 'GET':
-            items = StatusItem.objects.filter(project=project).order_by('-created_at')
+            items = StatusItem.objects.filter(project=project)
             serializer = StatusItemSerializer(items, many=True)
             return Response(serializer.data)
         
         elif request.method == 'POST':
             serializer = StatusItemSerializer(data=request.data)
             if serializer.is_valid():
+                if 'position' not in serializer.validated_data:
+                    serializer.validated_data['position'] = StatusItem.top_positions(project, 1)[0]
                 serializer.save(project=project)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=True, methods=['patch'], url_path='status/items/(?P<item_id>[^/.]+)')
+    @action(detail=True, methods=['post', 'patch'], url_path='status/items/bulk')
+    def status_items_bulk(self, request, pk=None):
+        """
+        POST creates ``{"items": [...]}``; PATCH applies ``{"items": [{"id",
+        ...fields}]}``. All or nothing: any invalid item fails the request
+        with per-item ``errors``.
+        """
+        project = self.get_object()
+        try:
+            if request.method == 'POST':
+                items = bulk_create_status_items(project, request.data)
+            else:
+                items = bulk_update_status_items(project, request.data)
+        except BulkValidationError as e:
+            return Response(
+                {'error': e.message, 'errors': e.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            StatusItemSerializer(items, many=True).data,
+            status=status.HTTP_201_CREATED if request.method == 'POST' else status.HTTP_200_OK
+        )
+
+    @action(detail=True, methods=['patch'], url_path='status/items/(?P<item_id>[0-9]+)')
     def update_status_item(self, request, pk=None, item_id=None):
         project = self.get_object()
         try:
@@ -224,45 +306,160 @@ class ProjectViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], url_path='docs/initialize')
     def initialize_docs(self, request, pk=None):
         project = self.get_object()
-        
-        # TODO: Generate documentation from repository
-        # For now, create a placeholder structure
-        file_tree = [
-            {
-                'name': 'src',
-                'type': 'directory',
-                'description': 'Source code directory',
-                'children': [
-                    {
-                        'name': 'components',
-                        'type': 'directory',
-                        'description': 'React components',
-                        'children': []
-                    },
-                    {
-                        'name': 'pages',
-                        'type': 'directory',
-                        'description': 'Page components',
-                        'children': []
-                    }
-                ]
-            },
-            {
-                'name': 'README.md',
-                'type': 'file',
-                'description': 'Project documentation and setup instructions'
-            }
-        ]
-        
-        documentation, created = Documentation.objects.get_or_create(
+
+        if project.repository_name:
+            # Fail fast on a bad checkout instead of queueing a doomed job.
+            try:
+                repository_path(project.repository_name)
+            except (ValueError, FileNotFoundError) as e:
+                return Response(
+                    {'error': str(e), 'message': 'Failed to ingest repository'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        job = enqueue(
+            'projects.initialize_docs',
+            {'project_id': project.id},
+            user=request.user,
             project=project,
-            defaults={'file_tree': file_tree}
+            dedupe_key=f'projects.initialize_docs:{project.id}',
         )
-        
-        if not created:
-            documentation.file_tree = file_tree
-            documentation.save()
-        
-        serializer = DocumentationSerializer(documentation)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self._job_accepted(request, job, 'Documentation initialization queued')
+
+    @action(detail=True, methods=['get'], url_path='docs/nodes')
+    def doc_nodes(self, request, pk=None):
+        """
+        One directory level (``depth=1``) or a subtree of the docs tree.
+
+        ``path`` selects the directory to expand ('' for the top level).
+        Nodes carry a short ``summary``; directories below the requested
+        depth report ``child_count`` instead of ``children``.
+        """
+        project = self.get_object()
+        documentation = Documentation.objects.filter(project=project).values('id', 'generated_at').first()
+        if documentation is None:
+            return Response(
+                {'error': 'Documentation not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        documentation_id = documentation['id']
+        path = request.query_params.get('path', '').strip('/')
+        try:
+            depth = int(request.query_params.get('depth', 1))
+        except ValueError:
+            return Response(
+                {'error': '"depth" must be a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        depth = max(1, min(depth, settings.DOCS_TREE_MAX_DEPTH))
+
+        nodes = DocNode.objects.filter(documentation_id=documentation_id)
+        base_depth = 0
+        if path:
+            parent = nodes.filter(path=path).values('depth', 'type').first()
+            if parent is None or parent['type'] != 'directory':
+                return Response(
+                    {'error': f'Directory not found: {path}'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            base_depth = parent['depth'] + 1
+        if depth == 1:
+            # Served straight from the (documentation, parent_path, position) index.
+            nodes = nodes.filter(parent_path=path)
+        else:
+            if path:
+                nodes = nodes.filter(path__startswith=path + '/')
+            nodes = nodes.filter(depth__lt=base_depth + depth)
+        rows = nodes.values('id', 'path', 'parent_path', 'name', 'type', 'position', 'child_count', 'summary')
+        return Response({
+            'path': path,
+            'depth': depth,
+            'generated_at': documentation['generated_at'],
+            'nodes': nest_doc_nodes(rows, path),
+        })
+
+    @action(detail=True, methods=['get'], url_path='docs/nodes/(?P<node_id>[^/.]+)')
+    def doc_node(self, request, pk=None, node_id=None):
+        project = self.get_object()
+        try:
+            node = DocNode.objects.get(id=node_id, documentation__project=project)
+        except (DocNode.DoesNotExist, ValueError):
+            return Response(
+                {'error': 'Documentation node not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(DocNodeSerializer(node).data)
+
+    @action(detail=True, methods=['post'], url_path='repository/upload', parser_classes=[MultiPartParser])
+    def upload_repository(self, request, pk=None):
+        project = self.get_object()
+        upload = request.FILES.get('archive')
+        if upload is None:
+            return Response(
+                {'error': 'An "archive" file (.tar.gz, .tgz, .tar or .zip) is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if upload.size > settings.RAG_ARCHIVE_MAX_UPLOAD_BYTES:
+            return Response(
+                {'error': f'Archive exceeds {settings.RAG_ARCHIVE_MAX_UPLOAD_BYTES} bytes'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
 
+        try:
+            archive_format(upload.name)
+        except ArchiveError as e:
+            return Response(
+                {'error': str(e), 'message': 'Failed to ingest archive'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Staged as-is (members are still never extracted); the job ingests
+        # it under the original name, which decides the format, and removes it.
+        try:
+            with tempfile.NamedTemporaryFile(dir=uploads_dir(project.id), suffix='.upload', delete=False) as staged:
+                for chunk in upload.chunks():
+                    staged.write(chunk)
+        finally:
+            upload.close()
+        job = enqueue(
+            'projects.ingest_archive',
+            {'project_id': project.id, 'path': staged.name, 'name': upload.name},
+            user=request.user,
+            project=project,
+        )
+        return self._job_accepted(request, job, 'Archive ingestion queued')
+
+    @action(detail=True, methods=['get'], url_path='search-code')
+    def search_code(self, request, pk=None):
+        project = self.get_object()
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': 'Query parameter "q" is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            k = int(request.query_params.get('k', 10))
+            budget_ms = request.query_params.get('budget_ms')
+            budget_ms = float(budget_ms) if budget_ms else None
+        except ValueError:
+            return Response(
+                {'error': '"k" and "budget_ms" must be numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        k = max(1, min(k, settings.RAG_SEARCH_MAX_RESULTS))
+
+        try:
+            result = search_project_code(project.id, query, k=k, budget_ms=budget_ms)
+        except IndexNotFound:
+            return Response(
+                {'error': 'Repository not indexed', 'message': 'Initialize docs to ingest the repository first'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(result)
+
+    @staticmethod
+    def _job_accepted(request, job, message):
+        return Response({
+            'message': message,
+            'job': JobSerializer(job).data,
+            'status_url': request.build_absolute_uri(reverse('job-detail', args=[job.id])),
+        }, status=status.HTTP_202_ACCEPTED)
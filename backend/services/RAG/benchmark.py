@@ -0,0 +1,421 @@
+"""
+Ingestion benchmarks over synthetic repositories.
+
+``generate_repository`` writes a deterministic repository of N files with a
+language mix and log-normal size distribution modelled on typical web app
+monorepos: mostly Python/TypeScript/JavaScript source, some docs and
+config, a sprinkling of vendored directories, binary assets and large
+generated files that ingestion has to skip or handle specially. Generated
+trees are cached in the work directory and reused across runs.
+
+``run_case`` runs the RAG ingest end to end on one repository (walk, chunk,
+chunk store, BM25 + vector index with the hashing embedder behind a fresh
+embedding cache, as in production), then re-syncs after touching 1% of the
+files. Every size runs in two scenarios: ``files`` ingests the plain
+directory tree, ``git`` a checkout of the same tree (``git ls-tree`` and
+``cat-file`` reads, the touched files committed before re-syncing), which is
+the path connected repositories take. Each case runs in a fresh process so
+peak RSS is attributable to that case alone.
+
+Reports are plain JSON; ``compare`` flags metrics that moved in the wrong
+direction by more than a tolerance against a stored baseline.
+"""
+import json
+import math
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+
+from .embeddings.backends import HashingEmbedder
+from .embeddings.cache import EmbeddingCache
+from .index.generations import current_generation, generation_path
+from .ingest.incremental import ingest_incremental, rebuild_index
+from .ingest.pipeline import DEFAULT_FILES_PER_TASK
+
+
+SIZES = {'1k': 1_000, '10k': 10_000, '100k': 100_000}
+SCENARIOS = ('files', 'git')
+DEFAULT_TOLERANCE = 0.15
+REPORT_VERSION = 1
+TOUCH_FRACTION = 0.01
+
+# extension -> (share of files, median size in bytes)
+LANGUAGE_MIX = {
+    '.py': (0.24, 4_000),
+    '.ts': (0.18, 3_000),
+    '.tsx': (0.14, 3_500),
+    '.js': (0.10, 2_500),
+    '.md': (0.08, 2_000),
+    '.json': (0.07, 1_200),
+    '.css': (0.05, 1_800),
+    '.go': (0.04, 5_000),
+    '.java': (0.03, 5_500),
+    '.yml': (0.03, 700),
+}
+SIZE_SIGMA = 1.0
+MAX_SOURCE_BYTES = 256 * 1024
+GENERATED_SHARE = 0.005   # large generated/minified files (300 KiB - 1 MiB)
+BINARY_SHARE = 0.01       # images the reader must skip
+VENDORED_SHARE = 0.02     # files under node_modules/, dist/ ...
+
+# Direction each compared metric should move in.
+HIGHER_IS_BETTER = ('files_per_sec', 'chunks_per_sec')
+LOWER_IS_BETTER = ('incremental_seconds', 'peak_rss_bytes', 'index_bytes')
+
+_WORDS = (
+    'project user prompt plan message status item doc tree node chunk index vector token '
+    'query search score cache store repo file path line byte batch worker task queue job '
+    'lease retry config setting model view router handler request response stream event '
+    'render component state effect hook props layout panel button form input list table '
+    'parse build load save update delete create fetch sync merge split filter map reduce'
+).split()
+
+
+def _ident(rng, style='snake', parts=None):
+    words = [rng.choice(_WORDS) for _ in range(parts or rng.randint(1, 3))]
+    if style == 'camel':
+        return words[0] + ''.join(w.title() for w in words[1:])
+    if style == 'pascal':
+        return ''.join(w.title() for w in words)
+    return '_'.join(words)
+
+
+def _python_unit(rng):
+    if rng.random() < 0.3:
+        name = _ident(rng, 'pascal')
+        methods = ''.join(
+            f'\n    def {_ident(rng)}(self, {_ident(rng, parts=1)}):\n'
+            f'        """{" ".join(rng.choice(_WORDS) for _ in range(8))}."""\n'
+            f'        value = self.{_ident(rng)}.get({_ident(rng, parts=1)})\n'
+            f'        if value is None:\n'
+            f'            return []\n'
+            f'        return [item for item in value if item.{_ident(rng)}]\n'
+            for _ in range(rng.randint(2, 6))
+        )
+        return f'\n\nclass {name}:\n    """{" ".join(rng.choice(_WORDS) for _ in range(10))}."""\n{methods}'
+    args = ', '.join(_ident(rng, parts=1) for _ in range(rng.randint(1, 4)))
+    return (
+        f'\n\ndef {_ident(rng)}({args}):\n'
+        f'    result = {{}}\n'
+        f'    for key in {_ident(rng)}():\n'
+        f'        result[key] = {_ident(rng)}(key, {rng.randint(0, 100)})\n'
+        f'    return result\n'
+    )
+
+
+def _js_unit(rng, typed=False, jsx=False):
+    name = _ident(rng, 'camel')
+    arg = _ident(rng, 'camel', 1)
+    annotation = ': string' if typed else ''
+    kind = rng.random()
+    if jsx and kind < 0.5:
+        component = _ident(rng, 'pascal')
+        return (
+            f'\n\nexport function {component}({{ {arg} }}{": Props" if typed else ""}) {{\n'
+            f'  const [{name}, set{name.title()}] = useState(null);\n'
+            f'  useEffect(() => {{\n    {_ident(rng, "camel")}({arg}).then(set{name.title()});\n  }}, [{arg}]);\n'
+            f'  return (\n    <div className="{_ident(rng)}">\n      <span>{{{name}}}</span>\n    </div>\n  );\n}}\n'
+        )
+    if kind < 0.75:
+        return (
+            f'\n\nexport const {name} = async ({arg}{annotation}) => {{\n'
+            f'  const response = await fetch(`/api/{_ident(rng)}/${{{arg}}}`);\n'
+            f'  if (!response.ok) throw new Error("{" ".join(rng.choice(_WORDS) for _ in range(4))}");\n'
+            f'  return response.json();\n}};\n'
+        )
+    methods = ''.join(
+        f'\n  {_ident(rng, "camel")}({arg}{annotation}) {{\n    return this.{_ident(rng, "camel")}.filter((x) => x !== {arg});\n  }}\n'
+        for _ in range(rng.randint(2, 5))
+    )
+    return f'\n\nexport class {_ident(rng, "pascal")} {{{methods}}}\n'
+
+
+def _brace_unit(rng, java=False):
+    name = _ident(rng, 'pascal' if not java else 'camel')
+    if java:
+        return (
+            f'\n    public List<String> {name}(String {_ident(rng, "camel", 1)}) {{\n'
+            f'        List<String> out = new ArrayList<>();\n'
+            f'        for (String item : this.{_ident(rng, "camel")}) {{\n            out.add(item);\n        }}\n'
+            f'        return out;\n    }}\n'
+        )
+    return (
+        f'\n\nfunc {name}({_ident(rng, "camel", 1)} string) ([]string, error) {{\n'
+        f'\tout := make([]string, 0)\n'
+        f'\tfor _, item := range {_ident(rng, "camel")} {{\n\t\tout = append(out, item)\n\t}}\n'
+        f'\treturn out, nil\n}}\n'
+    )
+
+
+def _text_unit(rng, ext):
+    def words(n):
+        return ' '.join(rng.choice(_WORDS) for _ in range(n))
+
+    if ext == '.md':
+        return f'\n## {words(3).title()}\n\n{words(60)}.\n\n- {words(6)}\n- {words(6)}\n'
+    if ext == '.json':
+        return f'  "{_ident(rng)}": {{"{_ident(rng)}": {rng.randint(0, 9999)}, "{_ident(rng)}": "{words(4)}"}},\n'
+    if ext == '.css':
+        return f'\n.{_ident(rng).replace("_", "-")} {{\n  display: flex;\n  margin: {rng.randint(0, 32)}px;\n  color: #{rng.randint(0, 0xffffff):06x};\n}}\n'
+    return f'{_ident(rng)}:\n  {_ident(rng)}: {words(3)}\n  enabled: {rng.choice(["true", "false"])}\n'
+
+
+def _source(rng, ext, target):
+    if ext == '.py':
+        parts, unit = [f'"""{" ".join(rng.choice(_WORDS) for _ in range(12))}."""\nimport os\nimport json\n'], _python_unit
+    elif ext in ('.ts', '.tsx', '.js'):
+        parts = ["import { useEffect, useState } from 'react';\n"]
+        unit = partial(_js_unit, typed=ext != '.js', jsx=ext == '.tsx')
+    elif ext == '.go':
+        parts, unit = ['package main\n\nimport "strings"\n'], _brace_unit
+    elif ext == '.java':
+        parts = [f'package com.example;\n\npublic class {_ident(rng, "pascal")} {{\n']
+        unit = partial(_brace_unit, java=True)
+    else:
+        parts = ['{\n'] if ext == '.json' else []
+        unit = partial(_text_unit, ext=ext)
+    size = sum(len(p) for p in parts)
+    while size < target:
+        part = unit(rng)
+        parts.append(part)
+        size += len(part)
+    if ext == '.java':
+        parts.append('}\n')
+    elif ext == '.json':
+        parts.append('  "end": true\n}\n')
+    return ''.join(parts).encode('utf-8')
+
+
+def _directories(rng, count):
+    tops = ['src', 'backend', 'frontend', 'services', 'lib', 'docs', 'tools']
+    dirs = []
+    for _ in range(count):
+        depth = rng.randint(0, 3)
+        dirs.append('/'.join([rng.choice(tops)] + [_ident(rng, parts=1) for _ in range(depth)]))
+    return dirs
+
+
+def generate_repository(root, files, seed=0):
+    """Write a synthetic repository of ``files`` files under ``root``; returns its byte size."""
+    rng = random.Random(seed)
+    extensions = list(LANGUAGE_MIX)
+    weights = [LANGUAGE_MIX[ext][0] for ext in extensions]
+    dirs = _directories(rng, max(8, files // 25))
+    total = 0
+    for i in range(files):
+        roll = rng.random()
+        directory = rng.choice(dirs)
+        if roll < BINARY_SHARE:
+            rel_path = f'{directory}/asset_{i}.png'
+            data = b'\x89PNG\r\n\x1a\n' + bytes(rng.getrandbits(8) for _ in range(rng.randint(512, 8192)))
+        elif roll < BINARY_SHARE + VENDORED_SHARE:
+            rel_path = f'node_modules/{_ident(rng, parts=1)}/index_{i}.js'
+            data = _source(rng, '.js', rng.randint(500, 5000))
+        elif roll < BINARY_SHARE + VENDORED_SHARE + GENERATED_SHARE:
+            rel_path = f'{directory}/generated_{i}.json'
+            data = _source(rng, '.json', rng.randint(300 * 1024, 1024 * 1024))
+        else:
+            ext = rng.choices(extensions, weights)[0]
+            median = LANGUAGE_MIX[ext][1]
+            target = min(MAX_SOURCE_BYTES, int(rng.lognormvariate(math.log(median), SIZE_SIGMA)))
+            rel_path = f'{directory}/{_ident(rng)}_{i}{ext}'
+            data = _source(rng, ext, target)
+        path = os.path.join(root, *rel_path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as fh:
+            fh.write(data)
+        total += len(data)
+    return total
+
+
+def ensure_repository(workdir, files, seed=0):
+    """Generate (once) and return the cached synthetic repository for ``files``."""
+    root = os.path.join(workdir, f'repo-{files}-{seed}')
+    marker = os.path.join(root, '.bench.json')
+    if os.path.exists(marker):
+        return root
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root)
+    total = generate_repository(root, files, seed)
+    with open(marker, 'w', encoding='utf-8') as fh:
+        json.dump({'files': files, 'seed': seed, 'bytes': total}, fh)
+    return root
+
+
+def _git(root, *args):
+    return subprocess.run(
+        ['git', '-c', 'user.name=benchmark', '-c', 'user.email=benchmark@localhost',
+         '-c', 'commit.gpgsign=false', *args],
+        cwd=root, check=True, capture_output=True,
+    ).stdout.decode().strip()
+
+
+def ensure_git_repository(workdir, files, seed=0):
+    """Create (once) and return a git checkout of the cached synthetic repository."""
+    root = os.path.join(workdir, f'git-{files}-{seed}')
+    marker = os.path.join(root, '.git', 'bench.json')
+    if os.path.exists(marker):
+        return root
+    shutil.rmtree(root, ignore_errors=True)
+    shutil.copytree(ensure_repository(workdir, files, seed), root, ignore=shutil.ignore_patterns('.bench.json'))
+    _git(root, 'init', '-q')
+    _git(root, 'add', '-A')
+    _git(root, 'commit', '-q', '-m', 'Synthetic repository')
+    with open(marker, 'w', encoding='utf-8') as fh:
+        json.dump({'files': files, 'seed': seed}, fh)
+    return root
+
+
+def case_name(size, scenario):
+    return size if scenario == 'files' else f'{size}-{scenario}'
+
+
+def _tree_bytes(path):
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+def _max_rss_bytes():
+    # Only this process: children forked from it (git, pool start-up) report
+    # the parent's high-water mark as their own.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _touch_files(root, fraction, seed):
+    """Append a function to a sample of source files; returns the originals."""
+    rng = random.Random(seed + 1)
+    candidates = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != 'node_modules']
+        candidates.extend(os.path.join(dirpath, n) for n in filenames if n.endswith('.py'))
+    candidates.sort()
+    sample = rng.sample(candidates, max(1, int(len(candidates) * fraction))) if candidates else []
+    originals = {}
+    for path in sample:
+        with open(path, 'rb') as fh:
+            originals[path] = fh.read()
+        with open(path, 'ab') as fh:
+            fh.write(_python_unit(rng).encode('utf-8'))
+    return originals
+
+
+def run_case(files, workdir, workers=1, files_per_task=DEFAULT_FILES_PER_TASK, seed=0,
+             embedding_dim=384, batch_size=256, scenario='files'):
+    """Ingest + index one synthetic repository; returns a metrics dict."""
+    git = scenario == 'git'
+    repo = ensure_git_repository(workdir, files, seed) if git else ensure_repository(workdir, files, seed)
+    data_dir = tempfile.mkdtemp(prefix='bench-', dir=workdir)
+    index_dir = os.path.join(data_dir, 'index')
+    embedder = HashingEmbedder(dim=embedding_dim)
+    cache = EmbeddingCache(os.path.join(data_dir, 'embeddings.sqlite3'))
+    try:
+        started = time.perf_counter()
+        result = ingest_incremental(repo, data_dir, workers=workers, files_per_task=files_per_task)
+        ingested = time.perf_counter()
+        rebuild_index(data_dir, index_dir, embedder=embedder, cache=cache, batch_size=batch_size)
+        indexed = time.perf_counter()
+
+        head = _git(repo, 'rev-parse', 'HEAD') if git else None
+        originals = _touch_files(repo, TOUCH_FRACTION, seed)
+        try:
+            if git:
+                # Git ingestion reads HEAD, so the edit has to be committed.
+                _git(repo, 'commit', '-q', '-a', '-m', 'Touch files')
+            resync_started = time.perf_counter()
+            resync = ingest_incremental(repo, data_dir, workers=workers, files_per_task=files_per_task)
+            rebuild_index(data_dir, index_dir, embedder=embedder, cache=cache, batch_size=batch_size)
+            resynced = time.perf_counter()
+        finally:
+            if git:
+                _git(repo, 'reset', '-q', '--hard', head)
+            else:
+                for path, data in originals.items():
+                    with open(path, 'wb') as fh:
+                        fh.write(data)
+
+        total_seconds = indexed - started
+        ingested_files = len(result.added)
+        generation = generation_path(index_dir, current_generation(index_dir))
+        return {
+            'files': files,
+            'scenario': scenario,
+            'ingested_files': ingested_files,
+            'chunks': result.chunks_written,
+            'repo_bytes': _tree_bytes(repo),
+            'ingest_seconds': round(ingested - started, 3),
+            'index_seconds': round(indexed - ingested, 3),
+            'total_seconds': round(total_seconds, 3),
+            'files_per_sec': round(ingested_files / total_seconds, 1),
+            'chunks_per_sec': round(result.chunks_written / total_seconds, 1),
+            'incremental_files': len(resync.modified),
+            'incremental_seconds': round(resynced - resync_started, 3),
+            'peak_rss_bytes': _max_rss_bytes(),
+            'index_bytes': _tree_bytes(generation),
+            'chunk_store_bytes': _tree_bytes(os.path.join(data_dir, 'chunks')),
+        }
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def run_suite(sizes, workdir, scenarios=SCENARIOS, **options):
+    """Run each named size in every scenario, each in its own process, and return a report dict."""
+    os.makedirs(workdir, exist_ok=True)
+    cases = {}
+    for name in sizes:
+        for scenario in scenarios:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+                cases[case_name(name, scenario)] = pool.submit(
+                    run_case, SIZES[name], workdir, scenario=scenario, **options
+                ).result()
+    return {
+        'version': REPORT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'options': {**options, 'scenarios': list(scenarios)},
+        'cases': cases,
+    }
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """List of metrics that regressed by more than ``tolerance`` against ``baseline``."""
+    regressions = []
+    for name, case in report['cases'].items():
+        base = baseline.get('cases', {}).get(name)
+        if not base:
+            continue
+        for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            old, new = base.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            if worse > tolerance:
+                regressions.append({
+                    'case': name,
+                    'metric': metric,
+                    'baseline': old,
+                    'current': new,
+                    'change': round(change, 3),
+                })
+    return regressions
@@ -0,0 +1,261 @@
+"""
+Per-file descriptions for the Docs panel, cached by git blob SHA.
+
+A describer turns one file's chunks into a one or two sentence summary.
+``HeuristicDescriber`` needs nothing but the chunk store: it uses the module
+docstring or leading comment, the first Markdown heading and paragraph, or
+the file's top-level symbols. ``HTTPDescriber`` asks any OpenAI-compatible
+``/chat/completions`` endpoint instead.
+
+Descriptions are stored in a SQLite table keyed by ``(describer id, blob
+SHA)`` and shared across projects, so re-initializing docs for an unchanged
+repository (or a fork of one already described) only does lookups. Misses
+are described concurrently on a thread pool, since the expensive describer
+is network bound.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from .ingest.read_repo import detect_language
+
+
+MAX_DESCRIPTION_CHARS = 240
+MAX_PROMPT_CHARS = 6_000
+SQLITE_MAX_VARIABLES = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS descriptions (
+    describer TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    description TEXT NOT NULL,
+    PRIMARY KEY (describer, sha)
+);
+"""
+
+_LANGUAGE_LABELS = {
+    'python': 'Python module', 'javascript': 'JavaScript module', 'typescript': 'TypeScript module',
+    'go': 'Go source file', 'rust': 'Rust source file', 'java': 'Java source file',
+    'markdown': 'Markdown document', 'rst': 'reStructuredText document', 'html': 'HTML page',
+    'css': 'Stylesheet', 'scss': 'Stylesheet', 'json': 'JSON data', 'yaml': 'YAML configuration',
+    'toml': 'TOML configuration', 'sql': 'SQL script', 'shell': 'Shell script',
+    'text': 'Text file',
+}
+_ASSET_EXTENSIONS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp', '.woff', '.woff2', '.ttf', '.eot',
+}
+
+_PY_DOCSTRING_RE = re.compile(r'^\s*(?:#[^\n]*\n\s*)*[rRuU]?("""|\'\'\')\s*(.*?)\1', re.S)
+_BLOCK_COMMENT_RE = re.compile(r'^\s*/\*\*?(.*?)\*/', re.S)
+_LINE_COMMENTS_RE = re.compile(r'^(?:\s*//[^\n]*\n)+')
+_MD_HEADING_RE = re.compile(r'^\s{0,3}#{1,6}\s+(.+)$', re.M)
+
+
+def _first_sentence(text):
+    text = ' '.join(text.split())
+    # A list number ("1.") does not end a sentence.
+    match = re.search(r'(.+?[^\d\s][.!?])(?:\s|$)', text)
+    sentence = match.group(1) if match else text
+    if len(sentence) > MAX_DESCRIPTION_CHARS:
+        sentence = sentence[:MAX_DESCRIPTION_CHARS - 1].rsplit(' ', 1)[0] + '…'
+    return sentence
+
+
+def _join_names(names, limit=4):
+    shown = names[:limit]
+    text = ', '.join(shown)
+    if len(names) > limit:
+        text += f' and {len(names) - limit} more'
+    return text
+
+
+class FileDescriber:
+    """Base class: ``describe(rel_path, chunks)`` returns a short summary or ''."""
+
+    describer_id = ''
+
+    def describe(self, rel_path, chunks):
+        raise NotImplementedError
+
+
+class HeuristicDescriber(FileDescriber):
+    describer_id = 'heuristic-v1'
+
+    def describe(self, rel_path, chunks):
+        ext = os.path.splitext(rel_path)[1].lower()
+        language = detect_language(rel_path)
+        if not chunks:
+            return 'Static asset' if ext in _ASSET_EXTENSIONS else 'Binary file'
+        head = chunks[0].text
+
+        if language == 'markdown':
+            heading = _MD_HEADING_RE.search(head)
+            body = _MD_HEADING_RE.sub('', head).strip()
+            summary = _first_sentence(body) if body else ''
+            if heading:
+                title = heading.group(1).strip('# ').strip()
+                return f'{title}: {summary}' if summary else title
+            return summary or _LANGUAGE_LABELS[language]
+
+        comment = ''
+        if language == 'python':
+            match = _PY_DOCSTRING_RE.match(head)
+            comment = match.group(2) if match else ''
+        elif language in ('javascript', 'typescript', 'go', 'rust', 'java', 'css', 'scss'):
+            match = _BLOCK_COMMENT_RE.match(head)
+            if match:
+                comment = re.sub(r'^\s*\*', '', match.group(1), flags=re.M)
+            else:
+                match = _LINE_COMMENTS_RE.match(head)
+                comment = re.sub(r'^\s*//', '', match.group(0), flags=re.M) if match else ''
+        if comment.strip():
+            return _first_sentence(comment)
+
+        label = _LANGUAGE_LABELS.get(language, 'File')
+        if ext == '.tsx' or ext == '.jsx':
+            label = 'React component module'
+        symbols = list(dict.fromkeys(
+            chunk.symbol for chunk in chunks
+            if chunk.symbol and '.' not in chunk.symbol and chunk.kind != 'module'
+        ))
+        if symbols:
+            return f'{label} defining {_join_names(symbols)}'
+        return label
+
+
+class HTTPDescriber(FileDescriber):
+    """Summaries from an OpenAI-compatible ``POST {url}`` chat completions endpoint."""
+
+    def __init__(self, url, model, api_key='', timeout=30):
+        self.url = url
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.describer_id = f'http:{model}'
+
+    def describe(self, rel_path, chunks):
+        if not chunks:
+            return HeuristicDescriber().describe(rel_path, chunks)
+        source = ''.join(chunk.text for chunk in chunks)[:MAX_PROMPT_CHARS]
+        body = json.dumps({
+            'model': self.model,
+            'messages': [
+                {'role': 'system', 'content': 'Summarize what this source file does in one sentence for a repository overview.'},
+                {'role': 'user', 'content': f'{rel_path}\n\n{source}'},
+            ],
+            'max_tokens': 80,
+        }).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, method='POST')
+        request.add_header('Content-Type', 'application/json')
+        if self.api_key:
+            request.add_header('Authorization', f'Bearer {self.api_key}')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.load(response)
+            return _first_sentence(payload['choices'][0]['message']['content'])
+        except (urllib.error.URLError, TimeoutError, KeyError, IndexError, ValueError):
+            # Not cached: the next initialize retries this file.
+            return ''
+
+
+class DescriptionCache:
+    def __init__(self, path):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, describer_id, shas):
+        """``{sha: description}`` for the cached subset of ``shas``."""
+        found = {}
+        unique = list(dict.fromkeys(shas))
+        conn = self._connection()
+        for start in range(0, len(unique), SQLITE_MAX_VARIABLES):
+            batch = unique[start:start + SQLITE_MAX_VARIABLES]
+            placeholders = ','.join('?' * len(batch))
+            found.update(conn.execute(
+                f'SELECT sha, description FROM descriptions WHERE describer = ? AND sha IN ({placeholders})',
+                [describer_id, *batch],
+            ))
+        return found
+
+    def put_many(self, describer_id, descriptions):
+        rows = [(describer_id, sha, text) for sha, text in descriptions.items()]
+        if rows:
+            self._connection().executemany(
+                'INSERT OR REPLACE INTO descriptions (describer, sha, description) VALUES (?, ?, ?)', rows
+            )
+
+
+def describe_files(files, store, describer, cache=None, workers=8):
+    """
+    ``{rel_path: description}`` for a manifest's ``files`` (path -> blob SHA).
+
+    Only blobs missing from ``cache`` are read from the chunk ``store`` and
+    described, ``workers`` at a time; each blob is described once even when
+    several paths share it.
+    """
+    cached = cache.get_many(describer.describer_id, files.values()) if cache is not None else {}
+    missing = {}
+    for rel_path, sha in sorted(files.items()):
+        if sha not in cached:
+            missing.setdefault(sha, rel_path)
+
+    def run(item):
+        sha, rel_path = item
+        return sha, describer.describe(rel_path, list(store.read(sha, rel_path)))
+
+    computed = {}
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for sha, description in pool.map(run, missing.items()):
+                computed[sha] = description
+        if cache is not None:
+            cache.put_many(describer.describer_id, {sha: text for sha, text in computed.items() if text})
+
+    descriptions = {**cached, **computed}
+    return {rel_path: descriptions.get(sha, '') for rel_path, sha in files.items()}
+
+
+def get_describer():
+    """Describer selected by ``RAG_DOCS_DESCRIBER`` (``None`` leaves descriptions empty)."""
+    from django.conf import settings
+
+    describer = settings.RAG_DOCS_DESCRIBER
+    if not describer:
+        return None
+    if describer == 'heuristic':
+        return HeuristicDescriber()
+    if describer == 'http':
+        return HTTPDescriber(
+            settings.RAG_DOCS_LLM_URL,
+            settings.RAG_DOCS_LLM_MODEL,
+            api_key=settings.RAG_DOCS_LLM_API_KEY,
+        )
+    raise ValueError(f'Unknown RAG_DOCS_DESCRIBER: {describer}')
+
+
+def default_description_cache():
+    global _default_cache
+    if _default_cache is None:
+        from django.conf import settings
+
+        _default_cache = DescriptionCache(settings.RAG_DOCS_CACHE_PATH)
+    return _default_cache
+
+
+_default_cache = None
@@ -0,0 +1,132 @@
+"""
+Documentation tree helpers built on top of ingested repository manifests.
+"""
+from collections import Counter
+
+from .ingest.read_repo import detect_language
+
+
+# Listing payloads carry at most this much of each node's description.
+SUMMARY_CHARS = 120
+
+_DIRECTORY_LANGUAGE_LABELS = {
+    'python': 'Python', 'javascript': 'JavaScript', 'typescript': 'TypeScript',
+    'markdown': 'documentation', 'css': 'styles', 'scss': 'styles', 'json': 'JSON',
+    'yaml': 'configuration', 'toml': 'configuration', 'html': 'HTML', 'go': 'Go',
+    'rust': 'Rust', 'java': 'Java', 'sql': 'SQL', 'shell': 'shell scripts',
+}
+
+
+def _directory_description(languages):
+    files = sum(languages.values())
+    label = f'{files} file' if files == 1 else f'{files} files'
+    known = [(count, language) for language, count in languages.items() if language in _DIRECTORY_LANGUAGE_LABELS]
+    if known:
+        count, language = max(known)
+        if count * 2 >= files:
+            label += f', mostly {_DIRECTORY_LANGUAGE_LABELS[language]}'
+    return label
+
+
+def build_file_tree(paths, descriptions=None):
+    """
+    Build the nested ``Documentation.file_tree`` structure from repo paths.
+
+    Directories come before files at every level and both are sorted by name,
+    matching the shape the Docs panel already renders. ``descriptions`` maps
+    paths to file descriptions; directories are summarised by their contents.
+    """
+    descriptions = descriptions or {}
+    root = {}
+    for rel_path in paths:
+        node = root
+        parts = rel_path.split('/')
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = None
+
+    def to_nodes(children, prefix, languages):
+        dirs = sorted(name for name, sub in children.items() if sub is not None)
+        files = sorted(name for name, sub in children.items() if sub is None)
+        nodes = []
+        for name in dirs:
+            sub_languages = Counter()
+            sub_nodes = to_nodes(children[name], f'{prefix}{name}/', sub_languages)
+            languages.update(sub_languages)
+            nodes.append({
+                'name': name,
+                'type': 'directory',
+                'description': _directory_description(sub_languages),
+                'children': sub_nodes,
+            })
+        for name in files:
+            languages[detect_language(name)] += 1
+            nodes.append({'name': name, 'type': 'file', 'description': descriptions.get(prefix + name, '')})
+        return nodes
+
+    return to_nodes(root, '', Counter())
+
+
+def build_repository_file_tree(data_dir, manifest):
+    """``build_file_tree`` for an ingested manifest, with cached per-file descriptions."""
+    from django.conf import settings
+    from .describe import default_description_cache, describe_files, get_describer
+    from .ingest.incremental import ChunkStore
+
+    describer = get_describer()
+    descriptions = None
+    if describer is not None:
+        descriptions = describe_files(
+            manifest.files,
+            ChunkStore(data_dir),
+            describer,
+            cache=default_description_cache(),
+            workers=settings.RAG_DOCS_DESCRIBE_WORKERS,
+        )
+    return build_file_tree(manifest.files, descriptions)
+
+
+def flatten_file_tree(nodes, parent_path='', depth=0):
+    """
+    Yield one row per node of a ``file_tree`` for normalized storage.
+
+    ``path`` is the materialized path (``src/components/App.tsx``);
+    ``position`` keeps the directories-first ordering within each parent.
+    """
+    for position, node in enumerate(nodes):
+        path = f'{parent_path}/{node["name"]}' if parent_path else node['name']
+        children = node.get('children') or []
+        description = node.get('description') or ''
+        summary = description
+        if len(summary) > SUMMARY_CHARS:
+            summary = summary[:SUMMARY_CHARS - 1].rsplit(' ', 1)[0] + '…'
+        yield {
+            'path': path,
+            'parent_path': parent_path,
+            'name': node['name'],
+            'type': node['type'],
+            'depth': depth,
+            'position': position,
+            'child_count': len(children),
+            'summary': summary,
+            'description': description,
+        }
+        yield from flatten_file_tree(children, path, depth + 1)
+
+
+def nest_doc_nodes(rows, parent_path=''):
+    """Rebuild nested nodes under ``parent_path`` from flat node rows."""
+    by_parent = {}
+    for row in rows:
+        by_parent.setdefault(row['parent_path'], []).append(row)
+
+    def children_of(path):
+        nodes = []
+        for row in sorted(by_parent.get(path, ()), key=lambda r: r['position']):
+            node = {key: value for key, value in row.items() if key not in ('parent_path', 'position')}
+            if row['type'] == 'directory' and row['path'] in by_parent:
+                node['children'] = children_of(row['path'])
+            nodes.append(node)
+        return nodes
+
+    return children_of(parent_path)
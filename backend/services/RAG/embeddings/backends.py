@@ -0,0 +1,224 @@
+"""
+Pluggable, batched embedding backends.
+
+Every backend exposes ``model_id``, ``dim`` and ``embed(texts)``, which
+returns a float32 array of shape ``(len(texts), dim)``. ``embed`` never
+makes one call per text: ``EmbeddingBackend`` packs texts into batches
+bounded by item count and approximate token count, runs up to
+``max_concurrency`` batches at once, and retries transient failures with
+exponential backoff. Batch size adapts AIMD-style: a batch rejected as too
+large halves the limit, and each clean batch grows it back.
+
+``HashingEmbedder`` is a deterministic hashing-trick embedder with no
+dependencies beyond NumPy, so ingestion can be tested and benchmarked on a
+machine with no network or GPU. ``HTTPEmbeddingBackend`` talks to any
+OpenAI-compatible ``/embeddings`` endpoint.
+"""
+import hashlib
+import json
+import math
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ..index.lexical import tokenize
+
+
+class EmbeddingError(Exception):
+    pass
+
+
+class TransientEmbeddingError(EmbeddingError):
+    """Worth retrying: rate limits, timeouts, 5xx."""
+
+
+class BatchTooLarge(EmbeddingError):
+    """The backend rejected the batch size; retry with a smaller one."""
+
+
+class EmbeddingBackend:
+    model_id = ''
+    dim = 0
+
+    def __init__(self, max_batch_size=64, max_batch_tokens=32_000, max_concurrency=1,
+                 max_retries=3, backoff_seconds=0.5):
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._batch_limit = max_batch_size
+        self._lock = threading.Lock()
+
+    def embed_batch(self, texts):
+        """Embed one batch; subclasses return an array of shape (n, dim)."""
+        raise NotImplementedError
+
+    @staticmethod
+    def estimate_tokens(text):
+        return len(text) // 4 + 1
+
+    def _plan_batches(self, texts):
+        batches, current, tokens = [], [], 0
+        limit = self._batch_limit
+        for i, text in enumerate(texts):
+            cost = self.estimate_tokens(text)
+            if current and (len(current) >= limit or tokens + cost > self.max_batch_tokens):
+                batches.append(current)
+                current, tokens = [], 0
+            current.append(i)
+            tokens += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def _shrink(self):
+        with self._lock:
+            self._batch_limit = max(1, self._batch_limit // 2)
+
+    def _grow(self):
+        with self._lock:
+            self._batch_limit = min(self.max_batch_size, self._batch_limit + 1)
+
+    def _run_batch(self, texts):
+        attempt = 0
+        while True:
+            try:
+                vectors = np.asarray(self.embed_batch(texts), dtype=np.float32)
+                self._grow()
+                return vectors
+            except BatchTooLarge:
+                if len(texts) == 1:
+                    raise
+                self._shrink()
+                middle = len(texts) // 2
+                return np.concatenate([self._run_batch(texts[:middle]), self._run_batch(texts[middle:])])
+            except TransientEmbeddingError:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                time.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+
+    def embed(self, texts):
+        texts = list(texts)
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        if not texts:
+            return out
+        batches = self._plan_batches(texts)
+
+        def run(indices):
+            out[indices] = self._run_batch([texts[i] for i in indices])
+
+        if self.max_concurrency == 1 or len(batches) == 1:
+            for indices in batches:
+                run(indices)
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                # list() re-raises the first failure.
+                list(pool.map(run, batches))
+        return out
+
+
+class HashingEmbedder(EmbeddingBackend):
+    """
+    Deterministic hashing-trick embedder.
+
+    Code-aware tokens (identifiers plus their camelCase/snake_case parts)
+    and token bigrams are hashed into ``dim`` signed buckets with
+    sublinear term frequency weighting. Same text, same vector, on any
+    machine.
+    """
+
+    def __init__(self, dim=384, **options):
+        options.setdefault('max_batch_size', 512)
+        options.setdefault('max_batch_tokens', 10 ** 9)
+        super().__init__(**options)
+        self.dim = dim
+        self.model_id = f'hashing-v1-{dim}'
+
+    def _features(self, text):
+        tokens = list(tokenize(text))
+        features = Counter(tokens)
+        features.update(f'{a} {b}' for a, b in zip(tokens, tokens[1:]))
+        return features
+
+    def embed_batch(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            if not features:
+                continue
+            buckets = np.empty(len(features), dtype=np.int64)
+            weights = np.empty(len(features), dtype=np.float32)
+            for i, (feature, tf) in enumerate(features.items()):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+                buckets[i] = digest % self.dim
+                weights[i] = (1.0 + math.log(tf)) * (1.0 if digest >> 63 else -1.0)
+            np.add.at(out[row], buckets, weights)
+            norm = np.linalg.norm(out[row])
+            if norm:
+                out[row] /= norm
+        return out
+
+
+class HTTPEmbeddingBackend(EmbeddingBackend):
+    """Client for an OpenAI-compatible ``POST {url}`` embeddings endpoint."""
+
+    def __init__(self, url, model, dim, api_key='', timeout=30, **options):
+        options.setdefault('max_concurrency', 4)
+        super().__init__(**options)
+        self.url = url
+        self.model = model
+        self.dim = dim
+        self.api_key = api_key
+        self.timeout = timeout
+        self.model_id = f'http:{model}:{dim}'
+
+    def embed_batch(self, texts):
+        body = json.dumps({'model': self.model, 'input': texts}).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, method='POST')
+        request.add_header('Content-Type', 'application/json')
+        if self.api_key:
+            request.add_header('Authorization', f'Bearer {self.api_key}')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.load(response)
+        except urllib.error.HTTPError as e:
+            if e.code == 413:
+                raise BatchTooLarge(str(e))
+            if e.code == 429 or e.code >= 500:
+                raise TransientEmbeddingError(str(e))
+            raise EmbeddingError(str(e))
+        except (urllib.error.URLError, TimeoutError) as e:
+            raise TransientEmbeddingError(str(e))
+
+        data = sorted(payload.get('data', []), key=lambda item: item.get('index', 0))
+        if len(data) != len(texts):
+            raise EmbeddingError(f'Expected {len(texts)} embeddings, got {len(data)}')
+        return np.asarray([item['embedding'] for item in data], dtype=np.float32)
+
+
+def get_embedder():
+    """Backend selected by ``RAG_EMBEDDING_BACKEND`` (``None`` disables vectors)."""
+    from django.conf import settings
+
+    backend = settings.RAG_EMBEDDING_BACKEND
+    if not backend:
+        return None
+    if backend == 'hashing':
+        return HashingEmbedder(dim=settings.RAG_EMBEDDING_DIM)
+    if backend == 'http':
+        return HTTPEmbeddingBackend(
+            settings.RAG_EMBEDDING_URL,
+            settings.RAG_EMBEDDING_MODEL,
+            settings.RAG_EMBEDDING_DIM,
+            api_key=settings.RAG_EMBEDDING_API_KEY,
+            max_batch_size=settings.RAG_EMBEDDING_BATCH_SIZE,
+            max_concurrency=settings.RAG_EMBEDDING_CONCURRENCY,
+        )
+    raise ValueError(f'Unknown RAG_EMBEDDING_BACKEND: {backend}')
@@ -0,0 +1,255 @@
+"""
+Content-addressed embedding cache shared by every project.
+
+Vectors are keyed by ``sha256(model_id + NUL + text)``, so identical chunks
+(forks, re-ingests, vendored copies) are embedded once per model no matter
+which project they come from. Entries live in a local SQLite database in
+WAL mode, which lets several ingest workers read and write concurrently.
+
+The cache is size-bounded: when stored vectors exceed ``max_bytes`` the
+least recently used entries are evicted down to ``LOW_WATER`` of the limit.
+Lookups and inserts are batched so a 256-chunk batch costs a handful of
+statements. Lookups are plain reads and never take the write lock: an
+entry's ``last_used`` is only refreshed once it is ``TOUCH_INTERVAL`` old
+(so LRU order is approximate to that granularity), and those refreshes and
+the hit/miss counters are buffered and written together every
+``FLUSH_INTERVAL`` seconds. Hit, miss and eviction counters are persisted in
+the database; ``stats()`` reports them together with the bytes held.
+"""
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+LOW_WATER = 0.9
+SQLITE_MAX_VARIABLES = 500
+TOUCH_INTERVAL = 3600
+FLUSH_INTERVAL = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key BLOB PRIMARY KEY,
+    vector BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters (name, value) VALUES
+    ('hits', 0), ('misses', 0), ('evictions', 0), ('bytes', 0);
+"""
+
+
+def cache_key(model_id, text):
+    h = hashlib.sha256(model_id.encode('utf-8'))
+    h.update(b'\0')
+    h.update(text.encode('utf-8', errors='surrogatepass'))
+    return h.digest()
+
+
+class EmbeddingCache:
+    def __init__(self, path, max_bytes=1024 ** 3):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+        # Buffered lookup bookkeeping, written by flush().
+        self._pending_lock = threading.Lock()
+        self._touched = set()
+        self._hits = self._misses = 0
+        self._flushed_at = time.monotonic()
+
+    def _connection(self):
+        # sqlite3 connections must not be shared across threads.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _connect(self):
+        return _Transaction(self._connection())
+
+    def _bump(self, conn, **deltas):
+        conn.executemany(
+            'UPDATE counters SET value = value + ? WHERE name = ?',
+            [(delta, name) for name, delta in deltas.items() if delta],
+        )
+
+    def get_many(self, model_id, texts):
+        """Return a list parallel to ``texts`` with cached vectors or ``None``."""
+        keys = [cache_key(model_id, text) for text in texts]
+        found, stale = {}, []
+        conn = self._connection()
+        stale_before = time.time() - TOUCH_INTERVAL
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), SQLITE_MAX_VARIABLES):
+            batch = unique[start:start + SQLITE_MAX_VARIABLES]
+            placeholders = ','.join('?' * len(batch))
+            for key, vector, last_used in conn.execute(
+                f'SELECT key, vector, last_used FROM embeddings WHERE key IN ({placeholders})', batch
+            ):
+                key = bytes(key)
+                found[key] = np.frombuffer(vector, dtype=np.float32)
+                if last_used < stale_before:
+                    stale.append(key)
+        hits = sum(1 for key in keys if key in found)
+        with self._pending_lock:
+            self._touched.update(stale)
+            self._hits += hits
+            self._misses += len(keys) - hits
+            due = time.monotonic() - self._flushed_at >= FLUSH_INTERVAL
+        if due:
+            self.flush()
+        return [found.get(key) for key in keys]
+
+    def flush(self):
+        """Write buffered ``last_used`` refreshes and hit/miss counters."""
+        with self._pending_lock:
+            touched, hits, misses = self._touched, self._hits, self._misses
+            self._touched, self._hits, self._misses = set(), 0, 0
+            self._flushed_at = time.monotonic()
+        if not (touched or hits or misses):
+            return
+        with self._connect() as conn:
+            now = time.time()
+            conn.executemany('UPDATE embeddings SET last_used = ? WHERE key = ?', [(now, key) for key in touched])
+            self._bump(conn, hits=hits, misses=misses)
+
+    def put_many(self, model_id, texts, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        now = time.time()
+        rows = {}
+        for text, vector in zip(texts, vectors):
+            blob = vector.tobytes()
+            rows[cache_key(model_id, text)] = (blob, len(blob), now)
+        if not rows:
+            return
+        with self._connect() as conn:
+            added = 0
+            for key, (blob, size, used) in rows.items():
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO embeddings (key, vector, size, last_used) VALUES (?, ?, ?, ?)',
+                    (key, blob, size, used),
+                )
+                if cursor.rowcount:
+                    added += size
+            self._bump(conn, bytes=added)
+            total = conn.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(conn, total)
+
+    def _evict(self, conn, total):
+        target = int(self.max_bytes * LOW_WATER)
+        freed, evicted, doomed = 0, 0, []
+        for key, size in conn.execute('SELECT key, size FROM embeddings ORDER BY last_used'):
+            if total - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+            evicted += 1
+        conn.executemany('DELETE FROM embeddings WHERE key = ?', doomed)
+        self._bump(conn, bytes=-freed, evictions=evicted)
+
+    def stats(self):
+        self.flush()
+        with self._connect() as conn:
+            counters = dict(conn.execute('SELECT name, value FROM counters'))
+            entries = conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+        lookups = counters['hits'] + counters['misses']
+        return {
+            'entries': entries,
+            'bytes': counters['bytes'],
+            'max_bytes': self.max_bytes,
+            'hits': counters['hits'],
+            'misses': counters['misses'],
+            'evictions': counters['evictions'],
+            'hit_rate': counters['hits'] / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._pending_lock:
+            self._touched, self._hits, self._misses = set(), 0, 0
+        with self._connect() as conn:
+            conn.execute('DELETE FROM embeddings')
+            conn.execute('UPDATE counters SET value = 0')
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` ... ``COMMIT`` around a block (rollback on error)."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+class CachedEmbedder:
+    """
+    Wrap an embedding backend so only cache misses reach it.
+
+    Exposes the same ``model_id`` / ``dim`` / ``embed(texts)`` interface as
+    the backend it wraps.
+    """
+
+    def __init__(self, backend, cache):
+        self.backend = backend
+        self.cache = cache
+        self.model_id = backend.model_id
+        self.dim = backend.dim
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, texts):
+        texts = list(texts)
+        cached = self.cache.get_many(self.model_id, texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, vector in enumerate(cached):
+            if vector is not None:
+                out[i] = vector
+        if missing:
+            # Identical texts within a batch are embedded once.
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            computed = np.asarray(self.backend.embed(unique), dtype=np.float32)
+            by_text = dict(zip(unique, computed))
+            for i in missing:
+                out[i] = by_text[texts[i]]
+            self.cache.put_many(self.model_id, unique, computed)
+        return out
+
+
+def default_cache():
+    """The process-wide cache configured by ``RAG_EMBEDDING_CACHE_*`` settings."""
+    global _default_cache
+    if _default_cache is None:
+        from django.conf import settings
+
+        _default_cache = EmbeddingCache(
+            settings.RAG_EMBEDDING_CACHE_PATH,
+            max_bytes=settings.RAG_EMBEDDING_CACHE_MAX_BYTES,
+        )
+        atexit.register(_default_cache.flush)
+    return _default_cache
+
+
+_default_cache = None
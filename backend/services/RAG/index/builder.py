@@ -0,0 +1,191 @@
+"""
+Build index generations (chunk table, BM25, vectors).
+
+``build_index`` streams every chunk into a fresh generation.
+``update_index`` builds the next generation from the live one: files whose
+blob SHA is unchanged have their rows, postings and vectors copied, and
+only added or modified files are read, tokenized and embedded.
+
+``embedder`` is any object exposing ``model_id``, ``dim`` and
+``embed(texts) -> float32 array``; without one only the lexical index is
+built and search runs on BM25 alone.
+"""
+import json
+import os
+from itertools import islice
+
+from .generations import (
+    IndexNotFound,
+    create_generation,
+    current_generation,
+    discard_generation,
+    generation_path,
+    publish_generation,
+)
+from .lexical import LexicalIndex, LexicalIndexWriter
+from .table import ChunkTable, ChunkTableWriter
+from .vectors import DEFAULT_IVF_MIN_VECTORS, META_FILENAME as VECTORS_META_FILENAME, VectorIndex, VectorIndexWriter
+
+
+INDEX_META_FILENAME = 'index.json'
+# path -> [blob sha, first row, row count] for every file the generation was
+# built from, including files without chunks.
+FILES_FILENAME = 'files.json'
+# Bumped whenever rows, postings or vectors change meaning (e.g. the
+# tokenizer), so update_index never copies them into a newer layout.
+INDEX_FORMAT = 1
+DEFAULT_BATCH_SIZE = 256
+
+
+def _add_chunks(chunks, table, lexical, vectors, embedder, batch_size):
+    it = iter(chunks)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            break
+        table.add(batch)
+        lexical.add(batch)
+        if vectors is not None:
+            vectors.add(embedder.embed([chunk.text for chunk in batch]))
+
+
+def _write_generation(index_dir, fill, embedder, ivf_min_vectors, source, files, centroids=None):
+    """Create a generation, let ``fill(table, lexical, vectors)`` populate it, and publish it."""
+    index_dir = str(index_dir)
+    os.makedirs(index_dir, exist_ok=True)
+    generation = create_generation(index_dir)
+    path = generation_path(index_dir, generation)
+    table = ChunkTableWriter(path)
+    lexical = LexicalIndexWriter(path)
+    vectors = None
+    if embedder is not None:
+        vectors = VectorIndexWriter(path, embedder.dim, embedder.model_id, ivf_min_vectors, centroids)
+    writers = [writer for writer in (table, lexical, vectors) if writer is not None]
+
+    try:
+        fill(table, lexical, vectors)
+        for writer in writers:
+            writer.finish()
+        with open(os.path.join(path, INDEX_META_FILENAME), 'w', encoding='utf-8') as fh:
+            json.dump({
+                'source': source,
+                'count': table.count,
+                'model': embedder.model_id if embedder is not None else '',
+                'format': INDEX_FORMAT,
+            }, fh)
+        if files is not None:
+            with open(os.path.join(path, FILES_FILENAME), 'w', encoding='utf-8') as fh:
+                fh.write(json.dumps({
+                    rel_path: [sha, *table.files.get(rel_path, [0, 0])]
+                    for rel_path, sha in files.items()
+                }))
+    except BaseException:
+        for writer in writers:
+            writer.close()
+        discard_generation(index_dir, generation)
+        raise
+
+    publish_generation(index_dir, generation)
+    return generation
+
+
+def build_index(index_dir, chunks, embedder=None, batch_size=DEFAULT_BATCH_SIZE,
+                ivf_min_vectors=DEFAULT_IVF_MIN_VECTORS, source='', files=None):
+    """
+    Stream ``chunks`` into a new generation under ``index_dir`` and publish it.
+
+    ``source`` identifies what the index was built from (a manifest
+    fingerprint) so callers can tell when it is stale. ``files`` (path ->
+    blob SHA) lets a later ``update_index`` reuse this generation; each
+    file's chunks must then be consecutive in ``chunks``. Callers hold
+    ``build_lock(index_dir)``.
+    """
+    def fill(table, lexical, vectors):
+        _add_chunks(chunks, table, lexical, vectors, embedder, batch_size)
+
+    return _write_generation(index_dir, fill, embedder, ivf_min_vectors, source, files)
+
+
+def _reusable_base(index_dir, embedder):
+    """The live generation's ``(path, files)`` when its rows can be copied, else ``None``."""
+    try:
+        path = generation_path(index_dir, current_generation(index_dir))
+        with open(os.path.join(path, INDEX_META_FILENAME), encoding='utf-8') as fh:
+            meta = json.load(fh)
+        with open(os.path.join(path, FILES_FILENAME), encoding='utf-8') as fh:
+            files = json.load(fh)
+    except (IndexNotFound, OSError, ValueError):
+        return None
+    if meta.get('format') != INDEX_FORMAT:
+        return None
+    if meta.get('model', '') != (embedder.model_id if embedder is not None else ''):
+        return None
+    if embedder is not None:
+        try:
+            with open(os.path.join(path, VECTORS_META_FILENAME), encoding='utf-8') as fh:
+                if json.load(fh).get('dim') != embedder.dim:
+                    return None
+        except (OSError, ValueError):
+            return None
+    return path, files
+
+
+def update_index(index_dir, files, read_chunks, embedder=None, batch_size=DEFAULT_BATCH_SIZE,
+                 ivf_min_vectors=DEFAULT_IVF_MIN_VECTORS, source=''):
+    """
+    Publish a generation for ``files`` (path -> blob SHA), copying every
+    file that is unchanged since the live generation and reading the rest
+    through ``read_chunks(sha, path)``.
+
+    Falls back to a full ``build_index`` when there is no live generation
+    or it was built with a different embedder or index format. Callers hold
+    ``build_lock(index_dir)``.
+    """
+    index_dir = str(index_dir)
+    paths = sorted(files)
+    base = _reusable_base(index_dir, embedder)
+    if base is None:
+        chunks = (chunk for rel_path in paths for chunk in read_chunks(files[rel_path], rel_path))
+        return build_index(index_dir, chunks, embedder, batch_size, ivf_min_vectors, source, files)
+
+    base_path, base_files = base
+    base_table = ChunkTable(base_path)
+    base_lexical = LexicalIndex(base_path)
+    base_vectors = VectorIndex(base_path) if embedder is not None else None
+    # Unchanged files' row ranges, with adjacent ranges merged so runs of
+    # unchanged files are copied in one go.
+    reused, changed = [], []
+    for rel_path in paths:
+        entry = base_files.get(rel_path)
+        if entry is None or entry[0] != files[rel_path]:
+            changed.append(rel_path)
+            continue
+        _sha, first, count = entry
+        if not count:
+            continue
+        if reused and reused[-1][0] + reused[-1][1] == first:
+            reused[-1][1] += count
+        else:
+            reused.append([first, count])
+
+    def fill(table, lexical, vectors):
+        for first, count in reused:
+            table.copy_rows(base_table, first, count)
+            lexical.copy_rows(base_lexical, first, count)
+            if vectors is not None:
+                vectors.copy_rows(base_vectors, first, count)
+        chunks = (chunk for rel_path in changed for chunk in read_chunks(files[rel_path], rel_path))
+        _add_chunks(chunks, table, lexical, vectors, embedder, batch_size)
+
+    centroids = base_vectors.centroids if base_vectors is not None else None
+    return _write_generation(index_dir, fill, embedder, ivf_min_vectors, source, files, centroids)
+
+
+def index_source(index_dir):
+    """``source`` recorded by the live generation, or ``None`` if there is none."""
+    try:
+        path = generation_path(str(index_dir), current_generation(str(index_dir)))
+        with open(os.path.join(path, INDEX_META_FILENAME), encoding='utf-8') as fh:
+            return json.load(fh).get('source')
+    except (IndexNotFound, OSError, ValueError):
+        return None
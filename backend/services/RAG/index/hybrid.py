@@ -0,0 +1,74 @@
+"""
+Hybrid retrieval over one index generation: BM25 fused with vector scores.
+
+Each side contributes its top candidates; scores are scaled to [0, 1]
+(BM25 by the best hit, cosine clipped at zero) and combined as
+``alpha * vector + (1 - alpha) * lexical``. Without a query vector, or when
+the generation has no vectors, results are pure BM25.
+"""
+import os
+from dataclasses import dataclass
+
+from .generations import IndexNotFound, current_generation, generation_path
+from .lexical import LexicalIndex
+from .table import ChunkTable
+from .vectors import DEFAULT_NPROBE, META_FILENAME as VECTORS_META_FILENAME, VectorIndex
+
+
+DEFAULT_ALPHA = 0.5
+MIN_CANDIDATES = 50
+
+
+@dataclass
+class SearchHit:
+    row: int
+    score: float
+    lexical_score: float = 0.0
+    vector_score: float = 0.0
+
+
+class ProjectIndex:
+    """Opens the live generation of an index directory for searching."""
+
+    def __init__(self, index_dir):
+        self.index_dir = str(index_dir)
+        self.generation = current_generation(self.index_dir)
+        path = generation_path(self.index_dir, self.generation)
+        self.table = ChunkTable(path)
+        self.lexical = LexicalIndex(path)
+        self.vectors = VectorIndex(path) if os.path.exists(os.path.join(path, VECTORS_META_FILENAME)) else None
+
+    def __len__(self):
+        return len(self.table)
+
+    def is_current(self):
+        """False once a newer generation has been published."""
+        try:
+            return current_generation(self.index_dir) == self.generation
+        except IndexNotFound:
+            return False
+
+    def search(self, query, k=10, query_vector=None, approximate=None,
+               nprobe=DEFAULT_NPROBE, alpha=DEFAULT_ALPHA):
+        candidates = max(k * 4, MIN_CANDIDATES)
+        lexical = self.lexical.search(query, candidates)
+        vector = []
+        if query_vector is not None and self.vectors is not None:
+            vector = self.vectors.search(query_vector, candidates, approximate=approximate, nprobe=nprobe)
+        else:
+            alpha = 0.0
+
+        hits = {}
+        best = lexical[0][1] if lexical else 0.0
+        for row, score in lexical:
+            hits[row] = SearchHit(row, 0.0, lexical_score=score / best if best else 0.0)
+        for row, score in vector:
+            hit = hits.get(row)
+            if hit is None:
+                hit = hits[row] = SearchHit(row, 0.0)
+            hit.vector_score = max(score, 0.0)
+        for hit in hits.values():
+            hit.score = alpha * hit.vector_score + (1 - alpha) * hit.lexical_score
+
+        ranked = sorted(hits.values(), key=lambda hit: (-hit.score, hit.row))
+        return ranked[:k]
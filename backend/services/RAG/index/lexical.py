@@ -0,0 +1,208 @@
+"""
+BM25 inverted index for identifier-heavy code search.
+
+The tokenizer keeps whole identifiers (``generate_prompts``) and also emits
+their camelCase / snake_case parts (``generate``, ``prompts``), so a query
+for either form matches. Postings are stored as flat arrays inside the
+generation directory::
+
+    lexical.json        term -> [offset, df], plus corpus statistics
+    postings_docs.npy   int32 row ids, grouped by term
+    postings_tf.npy     float32 term frequencies, parallel to postings_docs
+    doc_len.npy         int32 token count per row
+
+Row ids are the generation's chunk-table rows, shared with the vector
+index. Rows copied from the previous generation (``copy_rows``) keep their
+postings, renumbered, so an incremental build only tokenizes new chunks.
+Scoring a query touches only the postings of its terms and is fully
+vectorised, so it stays in the low milliseconds on repositories with tens
+of thousands of chunks.
+"""
+import json
+import math
+import os
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+import numpy as np
+
+from .vectors import top_k
+
+
+META_FILENAME = 'lexical.json'
+K1 = 1.2
+B = 0.75
+MAX_TOKEN_LENGTH = 64
+
+_WORD_RE = re.compile(r'[A-Za-z_$][A-Za-z0-9_$]*|\d+')
+_PART_RE = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+
+def tokenize(text):
+    """
+    Yield lower-cased search terms for ``text``.
+
+    ``ProjectViewSet`` -> ``projectviewset``, ``project``, ``view``, ``set``;
+    ``generate_prompts`` -> ``generate_prompts``, ``generate``, ``prompts``.
+    """
+    for word in _WORD_RE.findall(text):
+        whole = word.strip('_$').lower()
+        if 2 <= len(whole) <= MAX_TOKEN_LENGTH:
+            yield whole
+        parts = [
+            part.lower()
+            for piece in re.split(r'[_$]+', word) if piece
+            for part in _PART_RE.findall(piece)
+        ]
+        if len(parts) > 1:
+            for part in parts:
+                if len(part) >= 2:
+                    yield part
+
+
+class LexicalIndexWriter:
+    def __init__(self, path):
+        self.path = str(path)
+        self._docs = {}
+        self._tfs = {}
+        self._doc_len = array('i')
+        self._base = None
+        self._copied = []
+
+    @property
+    def count(self):
+        return len(self._doc_len)
+
+    def add(self, chunks):
+        for chunk in chunks:
+            row = len(self._doc_len)
+            # The symbol name is indexed alongside the body so a definition
+            # outranks call sites of the same identifier.
+            terms = Counter(tokenize(chunk.text))
+            terms.update(tokenize(chunk.symbol))
+            terms.update(tokenize(chunk.path))
+            self._doc_len.append(sum(terms.values()))
+            for term, tf in terms.items():
+                docs = self._docs.get(term)
+                if docs is None:
+                    docs = self._docs[term] = array('i')
+                    self._tfs[term] = array('f')
+                docs.append(row)
+                self._tfs[term].append(tf)
+
+    def copy_rows(self, index, first, count):
+        """Append rows ``first:first + count`` of ``index``; postings are merged in ``finish``."""
+        if self._base is not None and self._base is not index:
+            raise ValueError('Rows can only be copied from one index')
+        self._base = index
+        self._copied.append((first, count, self.count))
+        self._doc_len.extend(index.doc_len[first:first + count].tolist())
+
+    def _copied_postings(self):
+        """``(terms, term ids, rows, tfs)`` of the copied rows, renumbered."""
+        base = self._base
+        if base is None:
+            return [], np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, np.float32)
+        new_row = np.full(base.count, -1, dtype=np.int32)
+        for first, count, row in self._copied:
+            new_row[first:first + count] = np.arange(row, row + count, dtype=np.int32)
+        # Postings are grouped by term in sorted order, i.e. vocab offset order.
+        terms = sorted(base.vocab)
+        dfs = np.array([base.vocab[term][1] for term in terms], dtype=np.int64)
+        term_ids = np.repeat(np.arange(len(terms), dtype=np.int32), dfs)
+        rows = new_row[np.asarray(base.docs)]
+        keep = rows >= 0
+        return terms, term_ids[keep], rows[keep], np.asarray(base.tfs)[keep]
+
+    def finish(self):
+        terms, base_term_ids, base_rows, base_tfs = self._copied_postings()
+        unseen = set(self._docs).difference(terms)
+        if unseen:
+            # Copied postings are numbered by the base vocabulary; renumber
+            # them into the merged one.
+            merged = sorted(unseen.union(terms))
+            term_id = {term: i for i, term in enumerate(merged)}
+            base_term_ids = np.array([term_id[term] for term in terms], dtype=np.int32)[base_term_ids]
+            terms = merged
+        new_terms = sorted(self._docs)
+        term_ids = np.concatenate([
+            base_term_ids,
+            np.repeat(
+                np.array([bisect_left(terms, term) for term in new_terms], dtype=np.int32),
+                [len(self._docs[term]) for term in new_terms],
+            ),
+        ])
+        rows = np.concatenate([base_rows, *(np.frombuffer(self._docs[term], dtype=np.int32) for term in new_terms)])
+        tfs = np.concatenate([base_tfs, *(np.frombuffer(self._tfs[term], dtype=np.float32) for term in new_terms)])
+
+        # Scoring only needs postings grouped by term, not sorted by row.
+        order = np.argsort(term_ids, kind='stable')
+        docs_out = rows[order].astype(np.int32)
+        tfs_out = tfs[order].astype(np.float32)
+        dfs = np.bincount(term_ids, minlength=len(terms))
+        offsets = np.concatenate([[0], np.cumsum(dfs)[:-1]]) if len(terms) else dfs
+        live = dfs > 0
+        if not live.all():
+            # Terms whose only postings were in rows that were not copied.
+            terms = [term for term, keep in zip(terms, live.tolist()) if keep]
+            offsets, dfs = offsets[live], dfs[live]
+        vocab = dict(zip(terms, zip(offsets.tolist(), dfs.tolist())))
+
+        np.save(os.path.join(self.path, 'postings_docs.npy'), docs_out)
+        np.save(os.path.join(self.path, 'postings_tf.npy'), tfs_out)
+        doc_len = np.frombuffer(self._doc_len, dtype=np.int32) if self.count else np.zeros(0, np.int32)
+        np.save(os.path.join(self.path, 'doc_len.npy'), doc_len)
+        with open(os.path.join(self.path, META_FILENAME), 'w', encoding='utf-8') as fh:
+            # json.dumps, not json.dump: only the one-shot encoder is the C one.
+            fh.write(json.dumps({
+                'count': self.count,
+                'avgdl': float(doc_len.mean()) if self.count else 0.0,
+                'vocab': vocab,
+            }))
+        self.close()
+
+    def close(self):
+        self._docs.clear()
+        self._tfs.clear()
+        self._base = None
+        self._copied = []
+
+
+class LexicalIndex:
+    def __init__(self, path, k1=K1, b=B):
+        self.path = str(path)
+        with open(os.path.join(self.path, META_FILENAME), encoding='utf-8') as fh:
+            meta = json.load(fh)
+        self.count = meta['count']
+        self.vocab = meta['vocab']
+        self.k1 = k1
+        self.docs = np.load(os.path.join(self.path, 'postings_docs.npy'), mmap_mode='r')
+        self.tfs = np.load(os.path.join(self.path, 'postings_tf.npy'), mmap_mode='r')
+        self.doc_len = np.load(os.path.join(self.path, 'doc_len.npy'))
+        avgdl = meta['avgdl'] or 1.0
+        # Per-row length normalisation is query independent; precompute it.
+        self._norm = (k1 * (1 - b + b * self.doc_len / avgdl)).astype(np.float32)
+
+    def search(self, query, k=10):
+        """Top-``k`` ``(row, bm25)`` pairs for the query text."""
+        if not self.count:
+            return []
+        scores = None
+        for term in set(tokenize(query)):
+            entry = self.vocab.get(term)
+            if entry is None:
+                continue
+            offset, df = entry
+            docs = self.docs[offset:offset + df]
+            tf = self.tfs[offset:offset + df]
+            idf = math.log(1 + (self.count - df + 0.5) / (df + 0.5))
+            if scores is None:
+                scores = np.zeros(self.count, dtype=np.float32)
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + self._norm[docs])
+        if scores is None:
+            return []
+        matched = np.flatnonzero(scores)
+        top = top_k(scores[matched], k)
+        return [(int(matched[i]), float(scores[matched[i]])) for i in top]
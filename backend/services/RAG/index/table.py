@@ -0,0 +1,138 @@
+"""
+Chunk side table shared by every index in a generation.
+
+Row ``i`` of ``rows.npy`` describes chunk ``i``; the vector and lexical
+indexes use the same row ids, so a hit from either can be resolved to a
+path, symbol and line/byte range without touching the chunk store.
+Strings (paths, symbols) are interned into ``strings.json`` and chunk
+texts are concatenated into ``texts.bin``, which is memory-mapped so a
+snippet is a slice, not a file read plus parse.
+
+A file's chunks occupy consecutive rows with consecutive text bytes;
+``files`` records each path's ``[first row, row count]`` so an incremental
+build can copy an unchanged file's rows (``copy_rows``) instead of
+re-reading its chunks.
+"""
+import json
+import os
+
+import numpy as np
+
+
+ROW_DTYPE = np.dtype([
+    ('path', np.int32),
+    ('symbol', np.int32),
+    ('start_line', np.int32),
+    ('end_line', np.int32),
+    ('start_byte', np.int64),
+    ('end_byte', np.int64),
+    ('text_offset', np.int64),
+    ('text_length', np.int32),
+])
+
+
+class ChunkTableWriter:
+    def __init__(self, path):
+        self.path = str(path)
+        self._rows = open(os.path.join(self.path, 'rows.bin'), 'wb')
+        self._texts = open(os.path.join(self.path, 'texts.bin'), 'wb')
+        self._text_offset = 0
+        self._strings = {}
+        self.files = {}
+        self.count = 0
+
+    def _string_id(self, value):
+        string_id = self._strings.get(value)
+        if string_id is None:
+            string_id = self._strings[value] = len(self._strings)
+        return string_id
+
+    def add(self, chunks):
+        rows = np.empty(len(chunks), dtype=ROW_DTYPE)
+        for i, chunk in enumerate(chunks):
+            text = chunk.text.encode('utf-8', errors='replace')
+            rows[i] = (
+                self._string_id(chunk.path), self._string_id(chunk.symbol),
+                chunk.start_line, chunk.end_line, chunk.start_byte, chunk.end_byte,
+                self._text_offset, len(text),
+            )
+            self._texts.write(text)
+            self._text_offset += len(text)
+            self.files.setdefault(chunk.path, [self.count + i, 0])[1] += 1
+        self._rows.write(rows.tobytes())
+        self.count += len(chunks)
+
+    def copy_rows(self, table, first, count):
+        """Append rows ``first:first + count`` of ``table``: whole files, texts contiguous."""
+        rows = np.array(table.rows[first:first + count])
+        start = int(rows[0]['text_offset'])
+        end = int(rows[-1]['text_offset']) + int(rows[-1]['text_length'])
+        self._texts.write(table.texts[start:end].tobytes())
+        rows['text_offset'] += self._text_offset - start
+        self._text_offset += end - start
+        paths = rows['path'].copy()
+        for column in ('path', 'symbol'):
+            ids, inverse = np.unique(rows[column], return_inverse=True)
+            remapped = np.array([self._string_id(table.strings[i]) for i in ids], dtype=np.int32)
+            rows[column] = remapped[inverse]
+        self._rows.write(rows.tobytes())
+        # One [first, count] range per file in the copied run.
+        starts = np.flatnonzero(np.diff(paths, prepend=-1))
+        counts = np.diff(starts, append=count)
+        for file_start, file_count in zip(starts.tolist(), counts.tolist()):
+            self.files[table.strings[paths[file_start]]] = [self.count + file_start, file_count]
+        self.count += count
+
+    def finish(self):
+        self.close()
+        rows_path = os.path.join(self.path, 'rows.bin')
+        np.save(os.path.join(self.path, 'rows.npy'), np.fromfile(rows_path, dtype=ROW_DTYPE))
+        os.remove(rows_path)
+        strings = [None] * len(self._strings)
+        for value, string_id in self._strings.items():
+            strings[string_id] = value
+        with open(os.path.join(self.path, 'strings.json'), 'w', encoding='utf-8') as fh:
+            fh.write(json.dumps(strings))
+
+    def close(self):
+        self._rows.close()
+        self._texts.close()
+
+
+class ChunkTable:
+    def __init__(self, path):
+        self.path = str(path)
+        self.rows = np.load(os.path.join(self.path, 'rows.npy'), mmap_mode='r')
+        texts_path = os.path.join(self.path, 'texts.bin')
+        # np.memmap cannot map an empty file.
+        if os.path.getsize(texts_path):
+            self.texts = np.memmap(texts_path, dtype=np.uint8, mode='r')
+        else:
+            self.texts = np.zeros(0, dtype=np.uint8)
+        with open(os.path.join(self.path, 'strings.json'), encoding='utf-8') as fh:
+            self.strings = json.load(fh)
+
+    def __len__(self):
+        return self.rows.shape[0]
+
+    def row(self, row_id):
+        """Side-table entry for ``row_id`` as a dict."""
+        row = self.rows[row_id]
+        return {
+            'path': self.strings[row['path']],
+            'symbol': self.strings[row['symbol']],
+            'start_line': int(row['start_line']),
+            'end_line': int(row['end_line']),
+            'start_byte': int(row['start_byte']),
+            'end_byte': int(row['end_byte']),
+        }
+
+    def text(self, row_id, max_chars=None):
+        row = self.rows[row_id]
+        start = int(row['text_offset'])
+        length = int(row['text_length'])
+        if max_chars is not None:
+            # UTF-8 is at most 4 bytes per character; trim after decoding.
+            length = min(length, max_chars * 4)
+        text = self.texts[start:start + length].tobytes().decode('utf-8', errors='ignore')
+        return text[:max_chars] if max_chars is not None else text
@@ -0,0 +1,218 @@
+"""
+Memory-mapped vector index for one index generation.
+
+Files written into the generation directory (see ``generations``)::
+
+    vectors.npy       float32 [count, dim], L2-normalised; row i is chunk i
+                      of the generation's chunk table
+    vectors.json      dim, count, model, IVF parameters
+    centroids.npy     IVF only: float32 [nlist, dim]
+    ivf_order.npy     IVF only: row ids grouped by list
+    ivf_offsets.npy   IVF only: list boundaries into ivf_order
+
+Arrays are opened with ``mmap_mode='r'``: nothing is copied into the heap,
+and every worker that opens the same index shares the pages through the OS
+page cache. Search is a vectorised dot product (cosine similarity, since
+vectors are normalised) with ``argpartition`` top-k. Indexes above
+``ivf_min_vectors`` also get an IVF coarse quantiser so approximate search
+only scans the ``nprobe`` closest lists.
+"""
+import json
+import os
+
+import numpy as np
+
+
+META_FILENAME = 'vectors.json'
+DEFAULT_IVF_MIN_VECTORS = 100_000
+DEFAULT_NPROBE = 8
+KMEANS_SAMPLE = 50_000
+KMEANS_ITERATIONS = 10
+BLOCK_ROWS = 65_536
+# Incremental builds keep the previous IVF centroids while at least this
+# share of the vectors was carried over; past that they are re-trained.
+CENTROID_REUSE_MIN_SHARE = 0.8
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores, k):
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.shape[0]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[0])
+    # Stable tie-break on row id keeps results reproducible.
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def _kmeans(vectors, nlist, seed=0):
+    """Spherical k-means on a sample; returns normalised centroids."""
+    rng = np.random.default_rng(seed)
+    count = vectors.shape[0]
+    sample_ids = np.sort(rng.choice(count, size=min(count, KMEANS_SAMPLE), replace=False))
+    sample = np.asarray(vectors[sample_ids], dtype=np.float32)
+    centroids = sample[rng.choice(sample.shape[0], size=nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = np.bincount(assign, minlength=nlist) == 0
+        # Re-seed empty clusters rather than letting them collapse.
+        sums[empty] = sample[rng.choice(sample.shape[0], size=int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+class VectorIndexWriter:
+    """
+    Streams vectors into a generation directory.
+
+    Vectors are appended to a raw scratch file as they arrive, so building
+    an index needs memory for one batch, not for the whole corpus. Given
+    ``centroids`` (from the previous generation) the IVF lists are assigned
+    against them rather than re-trained, as long as most vectors were
+    copied from that generation.
+    """
+
+    def __init__(self, path, dim, model='', ivf_min_vectors=DEFAULT_IVF_MIN_VECTORS, centroids=None):
+        self.path = str(path)
+        self.dim = dim
+        self.model = model
+        self.ivf_min_vectors = ivf_min_vectors
+        self.centroids = centroids
+        self._raw = open(os.path.join(self.path, 'vectors.f32'), 'wb')
+        self.count = 0
+        self._copied = 0
+
+    def add(self, vectors):
+        vectors = normalize(vectors)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f'Expected vectors of shape (n, {self.dim}), got {vectors.shape}')
+        self._raw.write(vectors.tobytes())
+        self.count += vectors.shape[0]
+
+    def copy_rows(self, index, first, count):
+        """Append rows ``first:first + count`` of ``index``, already normalised."""
+        if index.dim != self.dim:
+            raise ValueError(f'Expected vectors of dimension {self.dim}, got {index.dim}')
+        for start in range(first, first + count, BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, first + count)
+            self._raw.write(np.ascontiguousarray(index.vectors[start:stop]).tobytes())
+        self.count += count
+        self._copied += count
+
+    def _finalize_vectors(self):
+        self._raw.close()
+        raw_path = os.path.join(self.path, 'vectors.f32')
+
+        vectors = np.lib.format.open_memmap(
+            os.path.join(self.path, 'vectors.npy'), mode='w+',
+            dtype=np.float32, shape=(self.count, self.dim),
+        )
+        if self.count:
+            raw = np.memmap(raw_path, dtype=np.float32, mode='r', shape=(self.count, self.dim))
+            for start in range(0, self.count, BLOCK_ROWS):
+                vectors[start:start + BLOCK_ROWS] = raw[start:start + BLOCK_ROWS]
+            del raw
+        vectors.flush()
+        os.remove(raw_path)
+        return vectors
+
+    def _build_ivf(self, vectors):
+        if self.centroids is not None and self._copied >= CENTROID_REUSE_MIN_SHARE * self.count:
+            centroids = np.asarray(self.centroids, dtype=np.float32)
+            nlist = centroids.shape[0]
+        else:
+            nlist = int(min(4096, max(16, np.sqrt(self.count))))
+            centroids = _kmeans(vectors, nlist)
+        assign = np.empty(self.count, dtype=np.int32)
+        for start in range(0, self.count, BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + BLOCK_ROWS])
+            assign[start:start + BLOCK_ROWS] = np.argmax(block @ centroids.T, axis=1)
+        order = np.argsort(assign, kind='stable').astype(np.int64)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=nlist), out=offsets[1:])
+        np.save(os.path.join(self.path, 'centroids.npy'), centroids)
+        np.save(os.path.join(self.path, 'ivf_order.npy'), order)
+        np.save(os.path.join(self.path, 'ivf_offsets.npy'), offsets)
+        return nlist
+
+    def finish(self):
+        """Write the final arrays (and IVF lists when the index is large enough)."""
+        vectors = self._finalize_vectors()
+        nlist = self._build_ivf(vectors) if self.count >= self.ivf_min_vectors else 0
+        del vectors
+        with open(os.path.join(self.path, META_FILENAME), 'w', encoding='utf-8') as fh:
+            json.dump({'dim': self.dim, 'count': self.count, 'model': self.model, 'nlist': nlist}, fh)
+
+    def close(self):
+        self._raw.close()
+
+
+class VectorIndex:
+    """Read-only, memory-mapped view of the vectors in one generation."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(os.path.join(self.path, META_FILENAME), encoding='utf-8') as fh:
+            meta = json.load(fh)
+        self.dim = meta['dim']
+        self.count = meta['count']
+        self.model = meta.get('model', '')
+        self.nlist = meta.get('nlist', 0)
+        self.vectors = np.load(os.path.join(self.path, 'vectors.npy'), mmap_mode='r')
+        if self.nlist:
+            self.centroids = np.load(os.path.join(self.path, 'centroids.npy'))
+            self.ivf_order = np.load(os.path.join(self.path, 'ivf_order.npy'), mmap_mode='r')
+            self.ivf_offsets = np.load(os.path.join(self.path, 'ivf_offsets.npy'))
+        else:
+            self.centroids = self.ivf_order = self.ivf_offsets = None
+
+    @property
+    def has_ivf(self):
+        return self.nlist > 0
+
+    def search_exact(self, query, k=10):
+        if not self.count:
+            return []
+        query = normalize(query).reshape(-1)
+        scores = np.empty(self.count, dtype=np.float32)
+        for start in range(0, self.count, BLOCK_ROWS):
+            np.dot(self.vectors[start:start + BLOCK_ROWS], query, out=scores[start:start + BLOCK_ROWS])
+        top = top_k(scores, k)
+        return [(int(row), float(scores[row])) for row in top]
+
+    def search_approx(self, query, k=10, nprobe=DEFAULT_NPROBE):
+        if not self.has_ivf:
+            return self.search_exact(query, k)
+        query = normalize(query).reshape(-1)
+        lists = top_k(self.centroids @ query, nprobe)
+        candidates = np.concatenate([
+            self.ivf_order[self.ivf_offsets[i]:self.ivf_offsets[i + 1]] for i in lists
+        ])
+        if not candidates.size:
+            return []
+        candidates.sort()  # sequential page access on the memmap
+        scores = self.vectors[candidates] @ query
+        top = top_k(scores, k)
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def search(self, query, k=10, approximate=None, nprobe=DEFAULT_NPROBE):
+        """
+        Top-``k`` ``(row, score)`` pairs for ``query``.
+
+        ``approximate=None`` picks IVF search when the index has one.
+        """
+        if approximate is None:
+            approximate = self.has_ivf
+        if approximate:
+            return self.search_approx(query, k, nprobe)
+        return self.search_exact(query, k)
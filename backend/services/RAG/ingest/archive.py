@@ -0,0 +1,227 @@
+"""
+Ingest repositories uploaded as .tar(.gz|.bz2|.xz) or .zip archives.
+
+Archives are never extracted to disk. Tarballs are read in stream mode
+(``r|*``), one member at a time, so a compressed upload is decompressed
+exactly once as it is consumed; zip members are opened individually from
+the central directory. Member contents feed the same chunking pipeline and
+content-addressed chunk store as git ingestion, so re-uploading an archive
+only chunks files whose contents changed.
+
+Limits are enforced while streaming: the number of regular files and their
+total uncompressed size raise ``ArchiveLimitExceeded`` as soon as they are
+crossed, before the manifest is touched. Individual files above
+``max_file_bytes`` are skipped, like in a checkout.
+
+Archives produced by ``git archive`` or code hosts wrap everything in one
+top-level directory; it is stripped from manifest paths once the whole
+archive has been seen (chunk files are keyed by blob SHA, not path, so
+nothing needs re-chunking).
+"""
+import os
+import tarfile
+import zipfile
+
+from .incremental import (
+    ChunkStore,
+    IngestResult,
+    Manifest,
+    blob_sha,
+    diff_manifests,
+    prune_chunk_store,
+)
+from .pipeline import DEFAULT_FILES_PER_TASK, ChunkingPipeline
+from .read_repo import DEFAULT_MAX_CHUNK_BYTES, DEFAULT_MAX_FILE_BYTES, should_skip_file
+
+
+DEFAULT_MAX_TOTAL_BYTES = 1024 ** 3
+DEFAULT_MAX_FILES = 100_000
+
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+ZIP_EXTENSIONS = ('.zip',)
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+class ArchiveLimitExceeded(ArchiveError):
+    pass
+
+
+def archive_format(name):
+    """``'tar'`` or ``'zip'`` from the file name; ``ArchiveError`` otherwise."""
+    lowered = name.lower()
+    if lowered.endswith(TAR_EXTENSIONS):
+        return 'tar'
+    if lowered.endswith(ZIP_EXTENSIONS):
+        return 'zip'
+    raise ArchiveError(f'Unsupported archive type: {name} (expected .tar.gz, .tgz, .tar or .zip)')
+
+
+def _member_path(name):
+    """Normalised repo-relative path, or ``None`` for unsafe/empty names."""
+    parts = [part for part in name.replace('\\', '/').split('/') if part not in ('', '.')]
+    if not parts or '..' in parts:
+        return None
+    return '/'.join(parts)
+
+
+class _Limits:
+    def __init__(self, max_files, max_total_bytes):
+        self.max_files = max_files
+        self.max_total_bytes = max_total_bytes
+        self.files = 0
+        self.total_bytes = 0
+
+    def count(self, size):
+        self.files += 1
+        self.total_bytes += size
+        if self.files > self.max_files:
+            raise ArchiveLimitExceeded(f'Archive has more than {self.max_files} files')
+        if self.total_bytes > self.max_total_bytes:
+            raise ArchiveLimitExceeded(
+                f'Archive expands to more than {self.max_total_bytes} bytes'
+            )
+
+
+def _iter_tar(fileobj, limits, max_file_bytes):
+    try:
+        with tarfile.open(fileobj=fileobj, mode='r|*') as tar:
+            for member in tar:
+                # Symlinks, devices and hard links are not repository content.
+                if not member.isfile():
+                    continue
+                limits.count(member.size)
+                rel_path = _member_path(member.name)
+                if rel_path is None or member.size == 0 or member.size > max_file_bytes:
+                    continue
+                if should_skip_file(rel_path) or rel_path.rsplit('/', 1)[-1] == '.gitignore':
+                    continue
+                yield rel_path, tar.extractfile(member).read()
+    except tarfile.TarError as e:
+        raise ArchiveError(f'Invalid tar archive: {e}')
+
+
+def _iter_zip(fileobj, limits, max_file_bytes):
+    if not fileobj.seekable():
+        raise ArchiveError('Zip archives must be readable with random access')
+    try:
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                limits.count(info.file_size)
+                rel_path = _member_path(info.filename)
+                if rel_path is None or info.file_size == 0 or info.file_size > max_file_bytes:
+                    continue
+                if should_skip_file(rel_path) or rel_path.rsplit('/', 1)[-1] == '.gitignore':
+                    continue
+                with archive.open(info) as fh:
+                    # Never trust the declared size of a compressed member.
+                    data = fh.read(max_file_bytes + 1)
+                if len(data) > max_file_bytes:
+                    continue
+                yield rel_path, data
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f'Invalid zip archive: {e}')
+
+
+def iter_archive_members(fileobj, name, max_file_bytes=DEFAULT_MAX_FILE_BYTES,
+                         max_total_bytes=DEFAULT_MAX_TOTAL_BYTES, max_files=DEFAULT_MAX_FILES):
+    """Yield ``(rel_path, bytes)`` for each ingestible file in the archive."""
+    limits = _Limits(max_files, max_total_bytes)
+    if archive_format(name) == 'tar':
+        return _iter_tar(fileobj, limits, max_file_bytes)
+    return _iter_zip(fileobj, limits, max_file_bytes)
+
+
+def strip_common_root(files):
+    """Drop a single top-level directory shared by every path in ``files``."""
+    roots = {path.split('/', 1)[0] for path in files}
+    if len(roots) != 1 or any('/' not in path for path in files):
+        return files
+    return {path.split('/', 1)[1]: sha for path, sha in files.items()}
+
+
+def ingest_archive(fileobj, name, data_dir, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+                   max_file_bytes=DEFAULT_MAX_FILE_BYTES, max_total_bytes=DEFAULT_MAX_TOTAL_BYTES,
+                   max_files=DEFAULT_MAX_FILES, workers=1, files_per_task=DEFAULT_FILES_PER_TASK):
+    """
+    Replace the project's manifest with the contents of an uploaded archive.
+
+    Files whose blob is already in the chunk store are hashed but not
+    chunked again. Nothing is committed to the manifest if the archive is
+    invalid or exceeds a limit.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    old = Manifest.load(data_dir)
+    store = ChunkStore(data_dir)
+    archive_files = {}
+
+    def new_contents():
+        queued = set()
+        for rel_path, data in iter_archive_members(
+            fileobj, name, max_file_bytes=max_file_bytes,
+            max_total_bytes=max_total_bytes, max_files=max_files,
+        ):
+            sha = archive_files[rel_path] = blob_sha(data)
+            if sha in queued or store.has(sha):
+                continue
+            queued.add(sha)
+            yield rel_path, data
+
+    pipeline = ChunkingPipeline(workers=workers, files_per_task=files_per_task, max_chunk_bytes=max_chunk_bytes)
+    chunks_written = 0
+    written = []
+    try:
+        for rel_path, chunks in pipeline.chunk_contents(new_contents()):
+            if chunks is None:
+                continue
+            sha = archive_files[rel_path]
+            chunks_written += store.write(sha, chunks)
+            written.append(sha)
+    except ArchiveError:
+        # The manifest still describes the previous upload; drop blobs that
+        # only this rejected archive introduced.
+        for sha in written:
+            store.delete(sha)
+        raise
+
+    new_files = strip_common_root(archive_files)
+    diff = diff_manifests(old.files, new_files)
+    prune_chunk_store(store, diff, old.files, new_files)
+    Manifest(files=new_files).save(data_dir)
+    return IngestResult('', diff.added, diff.modified, diff.deleted, diff.unchanged, chunks_written)
+
+
+def sync_project_archive(project, fileobj, name, index=True):
+    """``ingest_archive`` into ``project``'s data dir, then refresh its index."""
+    from django.conf import settings
+    from services.RAG.embeddings.backends import get_embedder
+    from services.RAG.embeddings.cache import default_cache
+    from services.RAG.index.generations import build_lock
+    from services.RAG.ingest.incremental import rebuild_index
+    from services.RAG.paths import index_dir, project_data_dir
+
+    data_dir = project_data_dir(project.id)
+    with build_lock(index_dir(project.id)):
+        result = ingest_archive(
+            fileobj,
+            name,
+            data_dir,
+            max_chunk_bytes=settings.RAG_MAX_CHUNK_BYTES,
+            max_file_bytes=settings.RAG_MAX_FILE_BYTES,
+            max_total_bytes=settings.RAG_ARCHIVE_MAX_TOTAL_BYTES,
+            max_files=settings.RAG_ARCHIVE_MAX_FILES,
+            workers=settings.RAG_INGEST_WORKERS,
+            files_per_task=settings.RAG_INGEST_FILES_PER_TASK,
+        )
+        if index:
+            rebuild_index(
+                data_dir, index_dir(project.id),
+                embedder=get_embedder(), cache=default_cache(),
+                batch_size=settings.RAG_INGEST_CHUNK_BATCH_SIZE,
+                ivf_min_vectors=settings.RAG_IVF_MIN_VECTORS,
+            )
+    return result
@@ -0,0 +1,320 @@
+"""
+Symbol-aware code chunking.
+
+Python files are split with ``ast`` and TypeScript/JavaScript files with a
+lightweight brace scanner so that each chunk is one function, class or
+module section instead of an arbitrary byte window. Every chunk records its
+byte offsets and line range, so retrieval can slice the original file
+directly without parsing it again.
+
+Segments larger than ``max_chunk_bytes`` (a huge class, a generated table)
+are subdivided: classes by method, anything else by line-aligned windows
+that keep the owning symbol's name. Other languages, and sources that fail
+to parse, fall back to plain windows.
+"""
+import ast
+import re
+
+from .read_repo import DEFAULT_MAX_CHUNK_BYTES, Chunk, detect_language, iter_buffer_chunks
+
+
+BRACE_LANGUAGES = {'javascript', 'typescript'}
+
+MODULE = 'module'
+
+_PY_DEFS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+_JS_DECL_RE = re.compile(
+    r'\s*(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?(?:async\s+)?'
+    r'(function\*?|class|interface|type|enum|const|let|var|namespace|module)(?![\w$])\s*'
+    r'([A-Za-z_$][\w$]*)?'
+)
+
+_JS_KINDS = {
+    'function': 'function', 'function*': 'function', 'class': 'class',
+    'interface': 'type', 'type': 'type', 'enum': 'type',
+    'const': 'variable', 'let': 'variable', 'var': 'variable',
+    'namespace': 'namespace', 'module': 'namespace',
+}
+
+_OPENERS = '({['
+_CLOSERS = ')}]'
+
+
+class _Lines:
+    """
+    Line -> byte offset table for a source buffer (1-based lines).
+
+    ``data`` is used in place (``bytes`` or an ``mmap``); only the slices
+    that become chunks are copied.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        starts = [0]
+        find = data.find
+        pos = find(b'\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find(b'\n', pos + 1)
+        if starts[-1] == len(data) and len(starts) > 1:
+            starts.pop()
+        self.starts = starts
+
+    @property
+    def count(self):
+        return len(self.starts)
+
+    def start(self, line):
+        return self.starts[line - 1]
+
+    def end(self, line):
+        return self.starts[line] if line < len(self.starts) else len(self.data)
+
+    def size(self, first, last):
+        return self.end(last) - self.start(first)
+
+    def is_blank(self, line):
+        return not self.data[self.start(line):self.end(line)].strip()
+
+
+class _Segment:
+    __slots__ = ('start', 'end', 'kind', 'symbol')
+
+    def __init__(self, start, end, kind, symbol=''):
+        self.start = start
+        self.end = end
+        self.kind = kind
+        self.symbol = symbol
+
+
+def _node_start(node):
+    decorators = getattr(node, 'decorator_list', None)
+    if decorators:
+        return min(d.lineno for d in decorators)
+    return node.lineno
+
+
+def _python_segments(nodes, cursor, last_line, lines, max_chunk_bytes,
+                     prefix='', section_kind=MODULE, section_symbol=''):
+    segments = []
+
+    def add_section(end):
+        last = segments[-1] if segments else None
+        if last is not None and last.kind == section_kind and last.symbol == section_symbol:
+            last.end = end
+        else:
+            segments.append(_Segment(cursor, end, section_kind, section_symbol))
+
+    for node in nodes:
+        end = max(node.end_lineno, cursor)
+        if isinstance(node, _PY_DEFS):
+            name = prefix + node.name
+            if isinstance(node, ast.ClassDef):
+                kind = 'class'
+            else:
+                kind = 'method' if prefix else 'function'
+            body_defs = isinstance(node, ast.ClassDef) and any(
+                isinstance(child, _PY_DEFS) for child in node.body
+            )
+            if body_defs and lines.size(cursor, end) > max_chunk_bytes:
+                # Oversized class: header, then one chunk per method.
+                body_start = _node_start(node.body[0])
+                members = _python_segments(
+                    node.body, body_start, end, lines, max_chunk_bytes,
+                    prefix=name + '.', section_kind='class', section_symbol=name,
+                )
+                if members[0].kind == 'class':
+                    members[0].start = cursor
+                else:
+                    segments.append(_Segment(cursor, body_start - 1, 'class', name))
+                segments.extend(members)
+            else:
+                segments.append(_Segment(cursor, end, kind, name))
+        else:
+            add_section(end)
+        cursor = end + 1
+
+    if cursor <= last_line:
+        if segments:
+            segments[-1].end = last_line
+        else:
+            add_section(last_line)
+    return segments
+
+
+def python_segments(lines, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES):
+    """Segment a Python source by top-level definitions using ``ast``."""
+    # ast only parses bytes or str, so an mmap'd source is copied here.
+    data = lines.data
+    tree = ast.parse(data if isinstance(data, bytes) else data[:])
+    return _python_segments(tree.body, 1, lines.count, lines, max_chunk_bytes)
+
+
+def _scan_depth(text, depth, in_comment, quote):
+    """Advance brace/paren depth over one line, skipping strings and comments."""
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if in_comment:
+            if c == '*' and text.startswith('/', i + 1):
+                in_comment = False
+                i += 1
+        elif quote:
+            if c == '\\':
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c == '/' and text.startswith('/', i + 1):
+            break
+        elif c == '/' and text.startswith('*', i + 1):
+            in_comment = True
+            i += 1
+        elif c in '\'"`':
+            quote = c
+        elif c in _OPENERS:
+            depth += 1
+        elif c in _CLOSERS:
+            depth = max(0, depth - 1)
+        i += 1
+    # Plain string literals cannot span lines; template literals can.
+    if quote != '`':
+        quote = None
+    return depth, in_comment, quote
+
+
+def _non_blank_lines(lines, segment):
+    return sum(1 for n in range(segment.start, segment.end + 1) if not lines.is_blank(n))
+
+
+def brace_segments(lines):
+    """
+    Segment a JS/TS source at top-level declarations.
+
+    A line that starts at bracket depth zero and matches a declaration
+    keyword opens a new symbol segment, which runs until the next top-level
+    line. Comment blocks directly above a declaration are attached to it.
+    """
+    segments = []
+    depth, in_comment, quote = 0, False, None
+    lead_start = None
+    for number in range(1, lines.count + 1):
+        raw = lines.data[lines.start(number):lines.end(number)]
+        text = raw.decode('utf-8', errors='replace')
+        stripped = text.strip()
+        top = depth == 0 and not quote
+
+        if top and stripped:
+            is_comment = in_comment or stripped.startswith(('//', '/*', '*'))
+            match = None if is_comment else _JS_DECL_RE.match(text)
+            if match and not match.group(2) and not match.group(1).startswith(('function', 'class')):
+                match = None  # `type = ...`, `module.exports = ...`
+            if is_comment:
+                if lead_start is None:
+                    lead_start = number
+            elif match:
+                start = lead_start or number
+                if segments and segments[-1].end >= start:
+                    segments[-1].end = start - 1
+                    if segments[-1].end < segments[-1].start:
+                        segments.pop()
+                kind = _JS_KINDS[match.group(1)]
+                segments.append(_Segment(start, number, kind, match.group(2) or 'default'))
+                lead_start = None
+            else:
+                if not segments or segments[-1].kind != MODULE:
+                    start = lead_start or number
+                    if segments and segments[-1].end >= start:
+                        segments[-1].end = start - 1
+                        if segments[-1].end < segments[-1].start:
+                            segments.pop()
+                    segments.append(_Segment(start, number, MODULE))
+                lead_start = None
+        elif not stripped:
+            lead_start = None
+
+        if segments:
+            segments[-1].end = number
+        else:
+            segments.append(_Segment(1, number, MODULE))
+        depth, in_comment, quote = _scan_depth(text, depth, in_comment, quote)
+
+    # One-line `const x = ...` declarations are not worth a chunk each; fold
+    # them into the surrounding module section.
+    merged = []
+    for segment in segments:
+        if segment.kind == 'variable' and _non_blank_lines(lines, segment) <= 1:
+            segment.kind, segment.symbol = MODULE, ''
+        previous = merged[-1] if merged else None
+        if previous is not None and previous.kind == MODULE and segment.kind == MODULE:
+            previous.end = segment.end
+        else:
+            merged.append(segment)
+    return merged
+
+
+def _trim_leading_blank_lines(segments, lines):
+    """Move blank lines at the top of a segment onto the previous one."""
+    for previous, segment in zip(segments, segments[1:]):
+        while segment.start < segment.end and lines.is_blank(segment.start):
+            segment.start += 1
+            previous.end = segment.start - 1
+
+
+def _segment_chunks(rel_path, language, lines, segment, max_chunk_bytes):
+    start_byte = lines.start(segment.start)
+    end_byte = lines.end(segment.end)
+    if end_byte <= start_byte:
+        return
+    if end_byte - start_byte <= max_chunk_bytes:
+        yield Chunk(
+            path=rel_path,
+            language=language,
+            start_line=segment.start,
+            end_line=segment.end,
+            start_byte=start_byte,
+            end_byte=end_byte,
+            text=lines.data[start_byte:end_byte].decode('utf-8', errors='replace'),
+            symbol=segment.symbol,
+            kind=segment.kind,
+        )
+        return
+    for window in iter_buffer_chunks(rel_path, lines.data[start_byte:end_byte], max_chunk_bytes):
+        yield Chunk(
+            path=rel_path,
+            language=language,
+            start_line=window.start_line + segment.start - 1,
+            end_line=window.end_line + segment.start - 1,
+            start_byte=window.start_byte + start_byte,
+            end_byte=window.end_byte + start_byte,
+            text=window.text,
+            symbol=segment.symbol,
+            kind=segment.kind,
+        )
+
+
+def chunk_buffer(rel_path, buffer, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES):
+    """
+    Yield symbol-aligned chunks for ``buffer`` (``bytes`` or an ``mmap``).
+
+    Falls back to ``iter_buffer_chunks`` for languages without a segmenter
+    and for sources that do not parse.
+    """
+    language = detect_language(rel_path)
+    if language != 'python' and language not in BRACE_LANGUAGES:
+        yield from iter_buffer_chunks(rel_path, buffer, max_chunk_bytes)
+        return
+
+    lines = _Lines(buffer)
+    try:
+        if language == 'python':
+            segments = python_segments(lines, max_chunk_bytes)
+        else:
+            segments = brace_segments(lines)
+    except (SyntaxError, ValueError, RecursionError):
+        yield from iter_buffer_chunks(rel_path, buffer, max_chunk_bytes)
+        return
+
+    _trim_leading_blank_lines(segments, lines)
+    for segment in segments:
+        yield from _segment_chunks(rel_path, language, lines, segment, max_chunk_bytes)
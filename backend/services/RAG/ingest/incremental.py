@@ -0,0 +1,417 @@
+"""
+Incremental re-ingestion keyed by git blob SHA.
+
+Each project keeps a manifest (``manifest.json``) mapping repo-relative path
+to blob SHA, plus a content-addressed chunk store holding one chunk file per
+blob. Re-ingesting diffs the manifest against HEAD and only re-chunks files
+that were added or modified; chunks for deleted or replaced blobs are
+dropped. An unchanged HEAD costs a single ``git rev-parse``.
+
+Directories that are not git checkouts fall back to walking the tree and
+hashing contents the same way git does, so SHAs stay comparable.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+from dataclasses import dataclass, field
+
+from .read_repo import (
+    DEFAULT_MAX_CHUNK_BYTES,
+    DEFAULT_MAX_FILE_BYTES,
+    Chunk,
+    detect_language,
+    open_file_buffer,
+    should_skip_file,
+    walk_repository,
+)
+from .pipeline import DEFAULT_FILES_PER_TASK, ChunkingPipeline
+from ..embeddings.cache import CachedEmbedder
+from ..index.builder import build_index, index_source, update_index
+from ..index.generations import build_lock
+
+
+MANIFEST_FILENAME = 'manifest.json'
+CHUNKS_DIRNAME = 'chunks'
+SYMLINK_MODE = b'120000'
+
+
+class GitError(Exception):
+    pass
+
+
+@dataclass
+class Manifest:
+    commit: str = ''
+    files: dict = field(default_factory=dict)
+    fingerprint: str = ''
+
+    @classmethod
+    def load(cls, data_dir):
+        try:
+            with open(os.path.join(data_dir, MANIFEST_FILENAME), encoding='utf-8') as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return cls()
+        return cls(
+            commit=data.get('commit', ''),
+            files=data.get('files', {}),
+            fingerprint=data.get('fingerprint', ''),
+        )
+
+    def save(self, data_dir):
+        # The fingerprint changes whenever any path or blob does; indexes
+        # record it to detect that they were built from an older manifest.
+        encoded = json.dumps(self.files, sort_keys=True)
+        self.fingerprint = hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+        path = os.path.join(data_dir, MANIFEST_FILENAME)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump({
+                'commit': self.commit,
+                'fingerprint': self.fingerprint,
+                'files': self.files,
+            }, fh, sort_keys=True)
+        os.replace(tmp, path)
+
+
+@dataclass
+class ManifestDiff:
+    added: list = field(default_factory=list)
+    modified: list = field(default_factory=list)
+    deleted: list = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def changed(self):
+        return bool(self.added or self.modified or self.deleted)
+
+
+@dataclass
+class IngestResult:
+    commit: str
+    added: list
+    modified: list
+    deleted: list
+    unchanged: int
+    chunks_written: int
+    skipped: bool = False
+
+    def as_dict(self):
+        return {
+            'commit': self.commit,
+            'added': len(self.added),
+            'modified': len(self.modified),
+            'deleted': len(self.deleted),
+            'unchanged': self.unchanged,
+            'chunks_written': self.chunks_written,
+            'skipped': self.skipped,
+        }
+
+
+def diff_manifests(old_files, new_files):
+    diff = ManifestDiff()
+    for path, sha in new_files.items():
+        old_sha = old_files.get(path)
+        if old_sha is None:
+            diff.added.append(path)
+        elif old_sha != sha:
+            diff.modified.append(path)
+        else:
+            diff.unchanged += 1
+    diff.deleted = [path for path in old_files if path not in new_files]
+    diff.added.sort()
+    diff.modified.sort()
+    diff.deleted.sort()
+    return diff
+
+
+def blob_sha(data):
+    """SHA-1 of ``data`` as git would store it (``git hash-object``)."""
+    h = hashlib.sha1(b'blob %d\0' % len(data))
+    h.update(data)
+    return h.hexdigest()
+
+
+class ChunkStore:
+    """Content-addressed chunk files: ``chunks/<sha[:2]>/<sha>.jsonl``."""
+
+    def __init__(self, data_dir):
+        self.root = os.path.join(data_dir, CHUNKS_DIRNAME)
+
+    def _path(self, sha):
+        return os.path.join(self.root, sha[:2], sha + '.jsonl')
+
+    def has(self, sha):
+        return os.path.exists(self._path(sha))
+
+    def write(self, sha, chunks):
+        path = self._path(sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        count = 0
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            for chunk in chunks:
+                fh.write(json.dumps([
+                    chunk.start_line, chunk.end_line,
+                    chunk.start_byte, chunk.end_byte, chunk.text,
+                    chunk.symbol, chunk.kind,
+                ]) + '\n')
+                count += 1
+        os.replace(tmp, path)
+        return count
+
+    def read(self, sha, rel_path):
+        language = detect_language(rel_path)
+        try:
+            fh = open(self._path(sha), encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with fh:
+            for line in fh:
+                yield Chunk(rel_path, language, *json.loads(line))
+
+    def delete(self, sha):
+        try:
+            os.remove(self._path(sha))
+        except FileNotFoundError:
+            pass
+
+    def iter_chunks(self, manifest):
+        """Yield every chunk referenced by ``manifest`` in path order."""
+        for rel_path in sorted(manifest.files):
+            yield from self.read(manifest.files[rel_path], rel_path)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def prune_chunk_store(store, diff, old_files, new_files):
+    """Drop chunk files of blobs that no path in ``new_files`` references."""
+    live = set(new_files.values())
+    for rel_path in diff.modified + diff.deleted:
+        sha = old_files.get(rel_path)
+        if sha and sha not in live:
+            store.delete(sha)
+
+
+def _git(root, *args):
+    try:
+        result = subprocess.run(
+            ['git', '-C', str(root), *args],
+            capture_output=True, check=True,
+        )
+    except FileNotFoundError:
+        raise GitError('git executable not found')
+    except subprocess.CalledProcessError as e:
+        raise GitError(e.stderr.decode('utf-8', errors='replace').strip())
+    return result.stdout
+
+
+def is_git_checkout(root):
+    """True only when ``root`` is the top of a work tree, not a directory inside one."""
+    try:
+        toplevel = _git(root, 'rev-parse', '--show-toplevel').decode().strip()
+    except GitError:
+        return False
+    return os.path.realpath(toplevel) == os.path.realpath(root)
+
+
+def head_commit(root):
+    return _git(root, 'rev-parse', 'HEAD').decode().strip()
+
+
+def git_tree_blobs(root, max_file_bytes=DEFAULT_MAX_FILE_BYTES):
+    """Map path -> blob SHA for ingestible files in HEAD, from ``git ls-tree``."""
+    out = _git(root, 'ls-tree', '-r', '-z', '-l', '--full-tree', 'HEAD')
+    files = {}
+    for record in out.split(b'\0'):
+        if not record:
+            continue
+        meta, _, rel_path = record.partition(b'\t')
+        mode, obj_type, sha, size = meta.split()
+        # Symlink blobs hold a link target, not content; the work tree
+        # walker skips symlinks too.
+        if obj_type != b'blob' or mode == SYMLINK_MODE or size == b'-':
+            continue
+        rel_path = rel_path.decode('utf-8', errors='surrogateescape')
+        size = int(size)
+        if size == 0 or size > max_file_bytes or should_skip_file(rel_path):
+            continue
+        if rel_path.rsplit('/', 1)[-1] == '.gitignore':
+            continue
+        files[rel_path] = sha.decode()
+    return files
+
+
+def iter_git_blobs(root, shas):
+    """Stream ``(sha, data)`` for ``shas`` through one ``git cat-file --batch``."""
+    proc = subprocess.Popen(
+        ['git', '-C', str(root), 'cat-file', '--batch'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for sha in shas:
+            proc.stdin.write(sha.encode() + b'\n')
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            if len(header) < 3:
+                continue
+            data = proc.stdout.read(int(header[2]))
+            proc.stdout.read(1)
+            yield sha, data
+    finally:
+        proc.stdin.close()
+        proc.stdout.close()
+        proc.wait()
+
+
+def _worktree_blobs(root, max_file_bytes):
+    files = {}
+    for repo_file in walk_repository(root, max_file_bytes=max_file_bytes):
+        try:
+            with open_file_buffer(repo_file.path, repo_file.size) as buffer:
+                files[repo_file.rel_path] = blob_sha(buffer)
+        except OSError:
+            continue
+    return files
+
+
+def _iter_worktree_contents(root, rel_paths):
+    for rel_path in rel_paths:
+        path = os.path.join(root, *rel_path.split('/'))
+        try:
+            # A file swapped for a symlink since the walk must not be followed
+            # out of the checkout.
+            fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+            with open(fd, 'rb') as fh:
+                yield rel_path, fh.read()
+        except OSError:
+            continue
+
+
+def ingest_incremental(root, data_dir, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+                       max_file_bytes=DEFAULT_MAX_FILE_BYTES, force=False,
+                       workers=1, files_per_task=DEFAULT_FILES_PER_TASK):
+    """
+    Bring the chunk store in ``data_dir`` up to date with ``root``.
+
+    Only added/modified files are read and chunked; stale chunk files are
+    removed once no path in the new manifest references their blob. Large
+    change sets are chunked across ``workers`` processes.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    old = Manifest() if force else Manifest.load(data_dir)
+    store = ChunkStore(data_dir)
+    if force:
+        store.clear()
+
+    use_git = is_git_checkout(root)
+    if use_git:
+        commit = head_commit(root)
+        if commit and commit == old.commit:
+            return IngestResult(commit, [], [], [], len(old.files), 0, skipped=True)
+        new_files = git_tree_blobs(root, max_file_bytes)
+    else:
+        commit = ''
+        new_files = _worktree_blobs(root, max_file_bytes)
+
+    diff = diff_manifests(old.files, new_files)
+
+    # One representative path per blob that is not already in the store.
+    path_by_sha = {}
+    for rel_path in diff.added + diff.modified:
+        sha = new_files[rel_path]
+        if sha not in path_by_sha and not store.has(sha):
+            path_by_sha[sha] = rel_path
+
+    if use_git:
+        contents = ((path_by_sha[sha], data) for sha, data in iter_git_blobs(root, list(path_by_sha)))
+    else:
+        contents = _iter_worktree_contents(root, list(path_by_sha.values()))
+
+    # A process pool only pays off once there is more than one task's worth
+    # of files; single-file updates stay in-process.
+    pipeline = ChunkingPipeline(
+        workers=workers if len(path_by_sha) > files_per_task else 1,
+        files_per_task=files_per_task,
+        max_chunk_bytes=max_chunk_bytes,
+    )
+    chunks_written = 0
+    for rel_path, chunks in pipeline.chunk_contents(contents):
+        # Binary blobs stay in the manifest (so they are not re-read on every
+        # sync) but get no chunk file.
+        if chunks is None:
+            continue
+        chunks_written += store.write(new_files[rel_path], chunks)
+
+    prune_chunk_store(store, diff, old.files, new_files)
+    Manifest(commit=commit, files=new_files).save(data_dir)
+    return IngestResult(
+        commit, diff.added, diff.modified, diff.deleted, diff.unchanged, chunks_written,
+    )
+
+
+def rebuild_index(data_dir, index_dir, embedder=None, cache=None, force=False, **build_options):
+    """
+    Bring the search index up to date with the chunk store if it is stale.
+
+    Files whose blob SHA is unchanged are copied from the live generation;
+    only changed files are re-indexed (``force`` rebuilds everything). With
+    a ``cache`` the embedder only sees chunks whose vectors are not cached
+    yet. Returns the new generation, or ``None`` when the live index
+    already matches the manifest.
+    """
+    if embedder is not None and cache is not None:
+        embedder = CachedEmbedder(embedder, cache)
+    # Checked under the lock: a sync that waited on another may find the
+    # index already built from the manifest it would have used.
+    with build_lock(index_dir):
+        manifest = Manifest.load(data_dir)
+        if not force and manifest.fingerprint and index_source(index_dir) == manifest.fingerprint:
+            return None
+        store = ChunkStore(data_dir)
+        if force:
+            return build_index(
+                index_dir, store.iter_chunks(manifest), embedder=embedder,
+                source=manifest.fingerprint, files=manifest.files, **build_options
+            )
+        return update_index(
+            index_dir, manifest.files, store.read, embedder=embedder,
+            source=manifest.fingerprint, **build_options
+        )
+
+
+def sync_project_repository(project, force=False, index=True):
+    """
+    Incrementally ingest ``project``'s connected repository into its data dir.
+
+    With ``index`` the project's search index is rebuilt afterwards whenever
+    the manifest moved past the one it was built from.
+    """
+    from django.conf import settings
+    from services.RAG.embeddings.backends import get_embedder
+    from services.RAG.embeddings.cache import default_cache
+    from services.RAG.paths import project_data_dir, repository_path, index_dir
+
+    root = repository_path(project.repository_name)
+    data_dir = project_data_dir(project.id)
+    with build_lock(index_dir(project.id)):
+        result = ingest_incremental(
+            root,
+            data_dir,
+            max_chunk_bytes=settings.RAG_MAX_CHUNK_BYTES,
+            max_file_bytes=settings.RAG_MAX_FILE_BYTES,
+            force=force,
+            workers=settings.RAG_INGEST_WORKERS,
+            files_per_task=settings.RAG_INGEST_FILES_PER_TASK,
+        )
+        if index:
+            rebuild_index(
+                data_dir, index_dir(project.id),
+                embedder=get_embedder(), cache=default_cache(), force=force,
+                batch_size=settings.RAG_INGEST_CHUNK_BATCH_SIZE,
+                ivf_min_vectors=settings.RAG_IVF_MIN_VECTORS,
+            )
+    return result
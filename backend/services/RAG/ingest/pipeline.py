@@ -0,0 +1,137 @@
+"""
+Process-pool chunking pipeline.
+
+File reading and chunking are fanned out to a ``ProcessPoolExecutor`` in
+batches of ``files_per_task`` files. At most ``max_pending`` batches are in
+flight at once: the input iterator is only advanced when a slot frees up,
+so a slow consumer (embedding, index writes) throttles reading instead of
+letting results pile up in memory. Results are yielded in submission
+order, which keeps output identical to the single-process path.
+
+Usage:
+    pipeline = ChunkingPipeline(workers=8, chunk_batch_size=256)
+    for batch in pipeline.iter_batches(walk_repository(root)):
+        ...
+"""
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .chunker import chunk_buffer
+from .read_repo import (
+    DEFAULT_MAX_CHUNK_BYTES,
+    DEFAULT_MAX_FILE_BYTES,
+    iter_file_chunks,
+    looks_binary,
+    walk_repository,
+)
+
+
+DEFAULT_FILES_PER_TASK = 32
+DEFAULT_CHUNK_BATCH_SIZE = 256
+
+
+def _batched(iterable, size):
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def ordered_pool_map(fn, tasks, workers, max_pending):
+    """
+    Like ``Executor.map`` but lazy on input and bounded in flight.
+
+    With ``workers <= 1`` tasks run inline, which keeps tests and tiny
+    repositories free of process start-up cost.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield fn(task)
+        return
+
+    # Forked workers would inherit the caller's open pipes (e.g. a running
+    # ``git cat-file --batch``) and keep them from ever reaching EOF.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    pending = deque()
+    try:
+        for task in tasks:
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+            pending.append(pool.submit(fn, task))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _chunk_file_task(args):
+    repo_files, max_chunk_bytes = args
+    return [
+        (repo_file.rel_path, list(iter_file_chunks(repo_file, max_chunk_bytes)))
+        for repo_file in repo_files
+    ]
+
+
+def _chunk_content_task(args):
+    items, max_chunk_bytes = args
+    results = []
+    for rel_path, data in items:
+        if looks_binary(data):
+            results.append((rel_path, None))
+        else:
+            results.append((rel_path, list(chunk_buffer(rel_path, data, max_chunk_bytes))))
+    return results
+
+
+class ChunkingPipeline:
+    """Parallel, order-preserving file -> chunks pipeline with backpressure."""
+
+    def __init__(self, workers=None, files_per_task=DEFAULT_FILES_PER_TASK,
+                 chunk_batch_size=DEFAULT_CHUNK_BATCH_SIZE, max_pending=None,
+                 max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES):
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.files_per_task = max(1, files_per_task)
+        self.chunk_batch_size = max(1, chunk_batch_size)
+        # Two batches per worker keeps every core busy while one result waits
+        # to be consumed, without buffering more than that.
+        self.max_pending = max_pending or max(2, self.workers * 2)
+        self.max_chunk_bytes = max_chunk_bytes
+
+    def _run(self, fn, items):
+        tasks = ((batch, self.max_chunk_bytes) for batch in _batched(items, self.files_per_task))
+        for results in ordered_pool_map(fn, tasks, self.workers, self.max_pending):
+            yield from results
+
+    def chunk_files(self, repo_files):
+        """Yield ``(rel_path, chunks)`` for each ``RepoFile``, in input order."""
+        return self._run(_chunk_file_task, repo_files)
+
+    def chunk_contents(self, items):
+        """
+        Yield ``(rel_path, chunks)`` for ``(rel_path, bytes)`` items.
+
+        ``chunks`` is ``None`` for binary content.
+        """
+        return self._run(_chunk_content_task, items)
+
+    def iter_chunks(self, repo_files):
+        for _rel_path, chunks in self.chunk_files(repo_files):
+            yield from chunks
+
+    def iter_batches(self, repo_files):
+        """Yield lists of at most ``chunk_batch_size`` chunks."""
+        return _batched(self.iter_chunks(repo_files), self.chunk_batch_size)
+
+
+def read_repository_parallel(root, workers=None, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+                             max_file_bytes=DEFAULT_MAX_FILE_BYTES, **pipeline_options):
+    """Parallel equivalent of ``read_repository``; yields the same chunk stream."""
+    pipeline = ChunkingPipeline(workers=workers, max_chunk_bytes=max_chunk_bytes, **pipeline_options)
+    return pipeline.iter_chunks(walk_repository(root, max_file_bytes=max_file_bytes))
@@ -0,0 +1,335 @@
+"""
+Streaming repository reader for RAG ingestion.
+
+Walks a local checkout lazily, honouring .gitignore files and skipping
+binary/vendored content, and yields bounded-size text chunks. Nothing is
+loaded whole: files are read one at a time (large ones through mmap) and
+each chunk is at most ``max_chunk_bytes`` long, so memory use stays flat
+regardless of repository size.
+
+Usage:
+    from services.RAG.ingest.read_repo import read_repository
+
+    for chunk in read_repository('/path/to/checkout'):
+        ...
+"""
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+
+
+DEFAULT_MAX_CHUNK_BYTES = 8 * 1024
+DEFAULT_MAX_FILE_BYTES = 5 * 1024 * 1024
+MMAP_THRESHOLD_BYTES = 256 * 1024
+BINARY_SNIFF_BYTES = 8000
+
+VENDORED_DIRS = {
+    '.git', '.hg', '.svn', 'node_modules', 'bower_components', 'vendor',
+    'third_party', '__pycache__', '.venv', 'venv', 'env', '.tox', '.mypy_cache',
+    '.pytest_cache', 'dist', 'build', 'target', '.next', '.nuxt', 'coverage',
+}
+
+VENDORED_FILE_PATTERNS = [
+    '*.min.js', '*.min.css', '*.map', '*.lock', '*.lockb',
+    'package-lock.json', 'pnpm-lock.yaml', 'yarn.lock', 'poetry.lock',
+]
+
+BINARY_EXTENSIONS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.webp', '.tiff', '.psd',
+    '.pdf', '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.tar', '.jar',
+    '.war', '.class', '.so', '.dll', '.dylib', '.exe', '.bin', '.o', '.a',
+    '.pyc', '.pyo', '.whl', '.egg', '.db', '.sqlite', '.sqlite3', '.woff',
+    '.woff2', '.ttf', '.otf', '.eot', '.mp3', '.mp4', '.mov', '.avi', '.wav',
+    '.flac', '.ogg', '.webm', '.npy', '.npz', '.pkl', '.parquet',
+}
+
+LANGUAGE_BY_EXTENSION = {
+    '.py': 'python', '.js': 'javascript', '.jsx': 'javascript', '.mjs': 'javascript',
+    '.cjs': 'javascript', '.ts': 'typescript', '.tsx': 'typescript', '.go': 'go',
+    '.rs': 'rust', '.java': 'java', '.kt': 'kotlin', '.rb': 'ruby', '.php': 'php',
+    '.c': 'c', '.h': 'c', '.cc': 'cpp', '.cpp': 'cpp', '.hpp': 'cpp', '.cs': 'csharp',
+    '.swift': 'swift', '.md': 'markdown', '.rst': 'rst', '.html': 'html',
+    '.css': 'css', '.scss': 'scss', '.json': 'json', '.yaml': 'yaml', '.yml': 'yaml',
+    '.toml': 'toml', '.sql': 'sql', '.sh': 'shell',
+}
+
+
+@dataclass(frozen=True)
+class RepoFile:
+    """A candidate source file discovered while walking a repository."""
+    path: str
+    rel_path: str
+    size: int
+
+    @property
+    def language(self):
+        return detect_language(self.rel_path)
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A bounded slice of a file; offsets let callers re-read the original bytes."""
+    path: str
+    language: str
+    start_line: int
+    end_line: int
+    start_byte: int
+    end_byte: int
+    text: str
+    symbol: str = ''
+    kind: str = ''
+
+
+def detect_language(rel_path):
+    return LANGUAGE_BY_EXTENSION.get(os.path.splitext(rel_path)[1].lower(), 'text')
+
+
+def _translate_gitignore_glob(pattern):
+    """Translate a gitignore glob into a regex body (no anchors)."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 3] == '**/':
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern[i:i + 2] == '**':
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            j = pattern.find(']', i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j].replace('\\', '\\\\')
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class GitIgnoreRule:
+    __slots__ = ('base', 'regex', 'negate', 'dir_only', 'anchored')
+
+    def __init__(self, base, pattern):
+        self.negate = pattern.startswith('!')
+        if self.negate:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        # A slash anywhere but the end anchors the pattern to its .gitignore.
+        self.anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+        self.base = base
+        self.regex = re.compile(_translate_gitignore_glob(pattern) + r'\Z')
+
+    def matches(self, rel_path, is_dir):
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel_path.startswith(self.base + '/'):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+        if self.anchored:
+            return self.regex.match(rel_path) is not None
+        return self.regex.match(rel_path.rsplit('/', 1)[-1]) is not None
+
+
+def parse_gitignore(base, lines):
+    """Parse .gitignore lines into rules scoped to ``base`` (repo-relative dir)."""
+    rules = []
+    for line in lines:
+        line = line.rstrip('\n').rstrip('\r')
+        if not line or line.startswith('#'):
+            continue
+        if not line.endswith('\\ '):
+            line = line.rstrip(' ')
+        if line.startswith('\\#') or line.startswith('\\!'):
+            line = line[1:]
+        if line in ('', '!', '/'):
+            continue
+        rules.append(GitIgnoreRule(base, line))
+    return rules
+
+
+def is_ignored(rules, rel_path, is_dir):
+    """Last matching rule wins, as in git."""
+    ignored = False
+    for rule in rules:
+        if rule.matches(rel_path, is_dir):
+            ignored = not rule.negate
+    return ignored
+
+
+def _load_gitignore(dir_path, rel_dir):
+    path = os.path.join(dir_path, '.gitignore')
+    try:
+        with open(path, encoding='utf-8', errors='replace') as fh:
+            return parse_gitignore(rel_dir, fh)
+    except OSError:
+        return []
+
+
+def is_vendored_file(name):
+    return any(fnmatchcase(name, pattern) for pattern in VENDORED_FILE_PATTERNS)
+
+
+def is_binary_path(name):
+    return os.path.splitext(name)[1].lower() in BINARY_EXTENSIONS
+
+
+def looks_binary(sample):
+    """Same heuristic git uses: a NUL byte near the start means binary."""
+    return b'\0' in sample[:BINARY_SNIFF_BYTES]
+
+
+def should_skip_file(rel_path):
+    """Path-only vendored/binary filter, usable without touching the file."""
+    parts = rel_path.split('/')
+    if any(part in VENDORED_DIRS for part in parts[:-1]):
+        return True
+    name = parts[-1]
+    return is_binary_path(name) or is_vendored_file(name)
+
+
+def walk_repository(root, max_file_bytes=DEFAULT_MAX_FILE_BYTES):
+    """
+    Lazily yield ``RepoFile`` entries for every ingestible file under ``root``.
+
+    Directories are visited depth-first in sorted order so the output is
+    deterministic. Ignored and vendored directories are pruned without being
+    descended into.
+    """
+    root = os.path.abspath(root)
+    stack = [(root, '', _load_gitignore(root, ''))]
+    while stack:
+        dir_path, rel_dir, rules = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+            if entry.is_symlink():
+                continue
+            if entry.is_dir():
+                if entry.name in VENDORED_DIRS or is_ignored(rules, rel_path, True):
+                    continue
+                subdirs.append((entry.path, rel_path))
+                continue
+            if not entry.is_file() or entry.name == '.gitignore':
+                continue
+            if is_ignored(rules, rel_path, False) or should_skip_file(rel_path):
+                continue
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
+            if size == 0 or size > max_file_bytes:
+                continue
+            yield RepoFile(path=entry.path, rel_path=rel_path, size=size)
+
+        # Push in reverse so the smallest name is popped (visited) first.
+        for sub_path, sub_rel in reversed(subdirs):
+            stack.append((sub_path, sub_rel, rules + _load_gitignore(sub_path, sub_rel)))
+
+
+@contextmanager
+def open_file_buffer(path, size=None):
+    """
+    Yield a read-only bytes-like buffer for ``path``.
+
+    Files at or above ``MMAP_THRESHOLD_BYTES`` are memory-mapped so their
+    pages are faulted in on demand instead of copied into the heap.
+    """
+    if size is None:
+        size = os.path.getsize(path)
+    with open(path, 'rb') as fh:
+        if size >= MMAP_THRESHOLD_BYTES:
+            buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield buf
+            finally:
+                buf.close()
+        else:
+            yield fh.read()
+
+
+def iter_buffer_chunks(rel_path, buffer, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES):
+    """
+    Split ``buffer`` into chunks of at most ``max_chunk_bytes``.
+
+    Chunks end on a line boundary whenever the window contains one; a single
+    over-long line is hard-split. Only the current window is ever copied.
+    """
+    language = detect_language(rel_path)
+    total = len(buffer)
+    start = 0
+    line = 1
+    while start < total:
+        end = min(start + max_chunk_bytes, total)
+        if end < total:
+            newline = buffer.rfind(b'\n', start, end)
+            if newline != -1:
+                end = newline + 1
+        data = buffer[start:end]
+        newlines = data.count(b'\n')
+        end_line = line + newlines - (1 if data.endswith(b'\n') else 0)
+        yield Chunk(
+            path=rel_path,
+            language=language,
+            start_line=line,
+            end_line=max(end_line, line),
+            start_byte=start,
+            end_byte=end,
+            text=data.decode('utf-8', errors='replace'),
+        )
+        line += newlines
+        start = end
+
+
+def iter_file_chunks(repo_file, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES):
+    """Yield symbol-aware chunks for a single ``RepoFile``, skipping binary content."""
+    # Imported here: the chunker builds on this module's Chunk/window helpers.
+    from .chunker import chunk_buffer
+
+    try:
+        with open_file_buffer(repo_file.path, repo_file.size) as buffer:
+            if looks_binary(buffer[:BINARY_SNIFF_BYTES]):
+                return
+            yield from chunk_buffer(repo_file.rel_path, buffer, max_chunk_bytes)
+    except (OSError, ValueError):
+        return
+
+
+def read_span(path, start_byte, end_byte):
+    """Read the original bytes of a chunk back from disk using its offsets."""
+    with open(path, 'rb') as fh:
+        fh.seek(start_byte)
+        return fh.read(end_byte - start_byte)
+
+
+def read_repository(root, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+                    max_file_bytes=DEFAULT_MAX_FILE_BYTES):
+    """Walk ``root`` and yield a ``Chunk`` stream for the whole repository."""
+    for repo_file in walk_repository(root, max_file_bytes=max_file_bytes):
+        yield from iter_file_chunks(repo_file, max_chunk_bytes)
@@ -0,0 +1,57 @@
+"""
+Filesystem locations used by the RAG services, resolved from Django settings.
+"""
+import os
+from pathlib import Path, PurePath
+
+from django.conf import settings
+
+
+def check_repository_name(repository_name):
+    """
+    Raise ``ValueError`` unless ``repository_name`` is a relative path that
+    stays inside ``RAG_REPOSITORIES_ROOT`` once resolved (``..`` and
+    symlinks included). ``Project.repository_name`` is user-editable, so it
+    must never reach files outside the root.
+    """
+    if not repository_name:
+        raise ValueError('Project has no repository connected')
+    if PurePath(repository_name).is_absolute() or repository_name.startswith('~'):
+        raise ValueError('Repository name must be relative to the repositories root')
+    root = Path(settings.RAG_REPOSITORIES_ROOT).resolve()
+    path = (root / repository_name).resolve()
+    if path == root or not path.is_relative_to(root):
+        raise ValueError('Repository name must stay inside the repositories root')
+    return path
+
+
+def repository_path(repository_name):
+    """Resolve ``Project.repository_name`` to a checkout under ``RAG_REPOSITORIES_ROOT``."""
+    path = check_repository_name(repository_name)
+    if not path.is_dir():
+        raise FileNotFoundError(f'Repository checkout not found: {repository_name}')
+    return path
+
+
+def project_data_dir(project_id, create=True):
+    """Directory holding ingestion artifacts for a single project."""
+    path = Path(settings.RAG_DATA_DIR) / str(project_id)
+    if create:
+        os.makedirs(path, exist_ok=True)
+    return path
+
+
+def index_dir(project_id, create=True):
+    """
+    Search index generations (chunk table, BM25, vectors) for a project.
+    Read-only callers pass ``create=False`` so looking up a project that was
+    never indexed leaves nothing behind.
+    """
+    return project_data_dir(project_id, create=create) / 'index'
+
+
+def uploads_dir(project_id):
+    """Uploaded archives waiting for their ingest job."""
+    path = project_data_dir(project_id) / 'uploads'
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,186 @@
+"""
+Code search over a project's published index, tuned for interactive use.
+
+Opened indexes are kept per process (``max_open`` most recently used
+projects) and reused until a newer generation is published, so a query
+costs an embedding plus a few vectorised scans, not a reload of the index
+files. Query vectors are memoised for repeated queries.
+
+Each search runs under a latency budget. The searcher keeps a moving
+average of how long exact (brute-force) hybrid search takes for the
+project; when that estimate no longer fits in what is left of the budget,
+it degrades to IVF approximate search, or to BM25 only when the index has
+no IVF lists. Degraded searchers re-probe exact search every
+``PROBE_EVERY`` queries so they recover once the machine is less loaded.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from .embeddings.backends import EmbeddingError, get_embedder
+from .index.hybrid import ProjectIndex
+from .paths import index_dir
+
+
+DEFAULT_BUDGET_MS = 50
+DEFAULT_MAX_OPEN = 32
+QUERY_CACHE_SIZE = 256
+EWMA_WEIGHT = 0.2
+PROBE_EVERY = 32
+
+MODE_EXACT = 'exact'
+MODE_APPROXIMATE = 'approximate'
+MODE_LEXICAL = 'lexical'
+
+
+class CodeSearcher:
+    """Searches one opened index generation and tracks its exact-search cost."""
+
+    def __init__(self, index, embedder=None, nprobe=None):
+        self.index = index
+        self.nprobe = nprobe
+        vectors = index.vectors
+        # Vectors from a different model are not comparable with the query.
+        self.embedder = embedder if vectors is not None and embedder is not None \
+            and embedder.model_id == vectors.model else None
+        self.exact_ms = None
+        self._degraded = 0
+        self._lock = threading.Lock()
+        self._query_vectors = OrderedDict()
+
+    def _query_vector(self, query):
+        if self.embedder is None:
+            return None
+        with self._lock:
+            vector = self._query_vectors.get(query)
+            if vector is not None:
+                self._query_vectors.move_to_end(query)
+                return vector
+        try:
+            vector = self.embedder.embed([query])[0]
+        except EmbeddingError:
+            return None
+        with self._lock:
+            self._query_vectors[query] = vector
+            if len(self._query_vectors) > QUERY_CACHE_SIZE:
+                self._query_vectors.popitem(last=False)
+        return vector
+
+    def _choose_mode(self, query_vector, remaining_ms):
+        if query_vector is None:
+            return MODE_LEXICAL
+        with self._lock:
+            if self.exact_ms is None or self.exact_ms <= remaining_ms:
+                return MODE_EXACT
+            self._degraded += 1
+            if self._degraded % PROBE_EVERY == 0:
+                return MODE_EXACT
+        return MODE_APPROXIMATE if self.index.vectors.has_ivf else MODE_LEXICAL
+
+    def _record_exact(self, elapsed_ms):
+        with self._lock:
+            if self.exact_ms is None:
+                self.exact_ms = elapsed_ms
+            else:
+                self.exact_ms += EWMA_WEIGHT * (elapsed_ms - self.exact_ms)
+
+    def search(self, query, k=10, budget_ms=DEFAULT_BUDGET_MS, snippet_chars=None):
+        started = time.perf_counter()
+        query_vector = self._query_vector(query)
+        remaining_ms = budget_ms - (time.perf_counter() - started) * 1000
+        mode = self._choose_mode(query_vector, remaining_ms)
+
+        options = {}
+        if self.nprobe:
+            options['nprobe'] = self.nprobe
+        search_started = time.perf_counter()
+        hits = self.index.search(
+            query, k,
+            query_vector=query_vector if mode != MODE_LEXICAL else None,
+            approximate=mode == MODE_APPROXIMATE,
+            **options,
+        )
+        if mode == MODE_EXACT:
+            self._record_exact((time.perf_counter() - search_started) * 1000)
+
+        table = self.index.table
+        results = []
+        for hit in hits:
+            row = table.row(hit.row)
+            results.append({
+                'path': row['path'],
+                'symbol': row['symbol'],
+                'start_line': row['start_line'],
+                'end_line': row['end_line'],
+                'snippet': table.text(hit.row, snippet_chars),
+                'score': round(hit.score, 4),
+            })
+        return {
+            'query': query,
+            'mode': mode,
+            'took_ms': round((time.perf_counter() - started) * 1000, 2),
+            'budget_ms': budget_ms,
+            'results': results,
+        }
+
+
+class SearcherRegistry:
+    """Process-wide LRU of open ``CodeSearcher`` objects keyed by project."""
+
+    def __init__(self, max_open=DEFAULT_MAX_OPEN):
+        self.max_open = max_open
+        self._searchers = OrderedDict()
+        self._lock = threading.Lock()
+        self._embedder = None
+
+    def _get_embedder(self):
+        if self._embedder is None:
+            self._embedder = get_embedder()
+        return self._embedder
+
+    def get(self, project_id, nprobe=None):
+        """
+        Searcher for the project's live generation.
+
+        Raises ``IndexNotFound`` when the project has not been indexed.
+        """
+        with self._lock:
+            searcher = self._searchers.get(project_id)
+            if searcher is not None and searcher.index.is_current():
+                self._searchers.move_to_end(project_id)
+                return searcher
+
+        # Open outside the lock so one slow open does not stall other projects.
+        searcher = CodeSearcher(ProjectIndex(index_dir(project_id, create=False)), self._get_embedder(), nprobe)
+        with self._lock:
+            self._searchers[project_id] = searcher
+            self._searchers.move_to_end(project_id)
+            while len(self._searchers) > self.max_open:
+                self._searchers.popitem(last=False)
+        return searcher
+
+    def evict(self, project_id):
+        with self._lock:
+            self._searchers.pop(project_id, None)
+
+
+def default_registry():
+    global _default_registry
+    if _default_registry is None:
+        from django.conf import settings
+
+        _default_registry = SearcherRegistry(max_open=settings.RAG_SEARCH_MAX_OPEN_INDEXES)
+    return _default_registry
+
+
+def search_project_code(project_id, query, k=10, budget_ms=None):
+    """Top-``k`` chunks for ``query`` in a project's index (see ``CodeSearcher``)."""
+    from django.conf import settings
+
+    searcher = default_registry().get(project_id, nprobe=settings.RAG_IVF_NPROBE)
+    if budget_ms is None:
+        budget_ms = settings.RAG_SEARCH_LATENCY_BUDGET_MS
+    return searcher.search(query, k, budget_ms=budget_ms, snippet_chars=settings.RAG_SEARCH_SNIPPET_CHARS)
+
+
+_default_registry = None
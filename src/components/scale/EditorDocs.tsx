@@ -1,12 +1,13 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState, useEffect, useRef } from "react"
 import { ScaleButton } from "./buttons"
 import { ScaleCard } from "./cards"
 import { H3, Body } from "./typography"
 import { CodeSnippetCard } from "./CodeSnippetCard"
 import { BackgroundBeams } from "@/components/ui/background-beams"
 import { api } from "@/lib/api"
+import { useProjectEvents } from "@/hooks/use-project-events"
 import { toast } from "sonner"
 import { FileCode, File, Folder, FolderOpen, ChevronRight, ChevronDown } from "lucide-react"
 import { cn } from "@/lib/utils"
@@ -15,35 +16,67 @@ interface EditorDocsProps {
   projectId: number
 }
 
-interface FileTreeNode {
+// One node of GET docs/nodes/: directories report child_count and carry
+// children only when they were part of the requested subtree.
+interface DocNode {
+  id: number
+  path: string
   name: string
   type: "file" | "directory"
-  description?: string
-  children?: FileTreeNode[]
+  child_count: number
+  summary: string
+  children?: DocNode[]
 }
 
-interface Documentation {
-  file_tree: FileTreeNode[]
+interface DocNodesResponse {
+  path: string
   generated_at: string
+  nodes: DocNode[]
 }
 
 export function EditorDocs({ projectId }: EditorDocsProps) {
-  const [docs, setDocs] = useState<Documentation | null>(null)
+  // Loaded directory levels, keyed by parent path ("" is the top level).
+  const [levels, setLevels] = useState<Map<string, DocNode[]>>(new Map())
+  const [generatedAt, setGeneratedAt] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
   const [generating, setGenerating] = useState(false)
   const [expandedPaths, setExpandedPaths] = useState<Set<string>>(new Set())
+  const [loadingPaths, setLoadingPaths] = useState<Set<string>>(new Set())
+  // Full descriptions, fetched when a file is opened.
+  const [descriptions, setDescriptions] = useState<Map<number, string>>(new Map())
+  const [openFiles, setOpenFiles] = useState<Set<number>>(new Set())
+  const levelsRef = useRef(levels)
+  levelsRef.current = levels
 
   useEffect(() => {
+    setLevels(new Map())
+    setExpandedPaths(new Set())
+    setDescriptions(new Map())
+    setOpenFiles(new Set())
     loadDocs()
   }, [projectId])
 
-  const loadDocs = async () => {
+  useProjectEvents(projectId, (event) => {
+    if (event === "documentation.updated" || event === "resync") {
+      refreshLoadedLevels()
+    }
+  })
+
+  const fetchLevel = async (path: string) => {
+    const data = await api.getDocNodes(projectId, path) as DocNodesResponse
+    setGeneratedAt(data.generated_at)
+    return data.nodes
+  }
+
+  const loadDocs = async (showLoading = true) => {
     try {
-      setLoading(true)
-      const data = await api.getDocs(projectId) as Documentation
-      setDocs(data)
+      if (showLoading) setLoading(true)
+      const nodes = await fetchLevel("")
+      setLevels(new Map([["", nodes]]))
     } catch (error: any) {
       console.error("Failed to load docs:", error)
+      setLevels(new Map())
+      setGeneratedAt(null)
       // Don't show error for empty state
       if (!error.message?.includes("404")) {
         toast.error("Failed to load documentation")
@@ -53,15 +86,34 @@ export function EditorDocs({ projectId }: EditorDocsProps) {
     }
   }
 
+  // Re-fetch only the levels already on screen; directories that no longer
+  // exist are dropped.
+  const refreshLoadedLevels = async () => {
+    const paths = Array.from(levelsRef.current.keys())
+    if (paths.length === 0) {
+      loadDocs(false)
+      return
+    }
+    const results = await Promise.allSettled(paths.map((path) => fetchLevel(path)))
+    const next = new Map<string, DocNode[]>()
+    results.forEach((result, i) => {
+      if (result.status === "fulfilled") next.set(paths[i], result.value)
+    })
+    if (!next.has("")) {
+      loadDocs(false)
+      return
+    }
+    setLevels(next)
+    setDescriptions(new Map())
+    setOpenFiles(new Set())
+  }
+
   const handleInitialize = async () => {
     setGenerating(true)
     try {
       await api.initializeDocs(projectId)
-      toast.success("Documentation generation started!")
-      // Reload after a short delay
-      setTimeout(() => {
-        loadDocs()
-      }, 2000)
+      toast.success("Documentation generated!")
+      loadDocs(false)
     } catch (error: any) {
       toast.error(error.message || "Failed to initialize documentation")
     } finally {
@@ -69,32 +121,76 @@ export function EditorDocs({ projectId }: EditorDocsProps) {
     }
   }
 
-  const togglePath = (path: string) => {
-    setExpandedPaths((prev) => {
-      const next = new Set(prev)
-      if (next.has(path)) {
+  const togglePath = async (node: DocNode) => {
+    const path = node.path
+    if (expandedPaths.has(path)) {
+      setExpandedPaths((prev) => {
+        const next = new Set(prev)
         next.delete(path)
+        return next
+      })
+      return
+    }
+    setExpandedPaths((prev) => new Set(prev).add(path))
+    if (levels.has(path) || loadingPaths.has(path)) return
+    if (node.child_count === 0) {
+      setLevels((prev) => new Map(prev).set(path, []))
+      return
+    }
+    setLoadingPaths((prev) => new Set(prev).add(path))
+    try {
+      const nodes = await fetchLevel(path)
+      setLevels((prev) => new Map(prev).set(path, nodes))
+    } catch (error: any) {
+      toast.error("Failed to load folder")
+      setExpandedPaths((prev) => {
+        const next = new Set(prev)
+        next.delete(path)
+        return next
+      })
+    } finally {
+      setLoadingPaths((prev) => {
+        const next = new Set(prev)
+        next.delete(path)
+        return next
+      })
+    }
+  }
+
+  const toggleFile = async (node: DocNode) => {
+    setOpenFiles((prev) => {
+      const next = new Set(prev)
+      if (next.has(node.id)) {
+        next.delete(node.id)
       } else {
-        next.add(path)
+        next.add(node.id)
       }
       return next
     })
+    if (descriptions.has(node.id)) return
+    try {
+      const detail = await api.getDocNode(projectId, node.id) as { description: string }
+      setDescriptions((prev) => new Map(prev).set(node.id, detail.description))
+    } catch (error) {
+      console.error("Failed to load description:", error)
+    }
   }
 
-  const renderTreeNode = (node: FileTreeNode, path: string = "", depth: number = 0) => {
-    const fullPath = path ? `${path}/${node.name}` : node.name
-    const isExpanded = expandedPaths.has(fullPath)
+  const renderTreeNode = (node: DocNode, depth: number = 0) => {
     const isDirectory = node.type === "directory"
+    const isExpanded = isDirectory ? expandedPaths.has(node.path) : openFiles.has(node.id)
+    const children = levels.get(node.path)
+    const description = !isDirectory && isExpanded ? descriptions.get(node.id) || node.summary : node.summary
 
     return (
-      <div key={fullPath} className="select-none">
+      <div key={node.path} className="select-none">
         <div
           className={cn(
             "flex items-start gap-2 py-2 px-3 rounded-lg hover:bg-secondary/50 cursor-pointer transition-colors",
             depth > 0 && "ml-4"
           )}
           style={{ paddingLeft: `${depth * 16 + 12}px` }}
-          onClick={() => isDirectory && togglePath(fullPath)}
+          onClick={() => (isDirectory ? togglePath(node) : toggleFile(node))}
         >
           {isDirectory ? (
             <>
@@ -117,20 +213,33 @@ export function EditorDocs({ projectId }: EditorDocsProps) {
           )}
           <div className="flex-1 min-w-0">
             <div className="font-medium text-sm text-foreground">{node.name}</div>
-            {node.description && (
-              <div className="text-xs text-muted-foreground mt-1">{node.description}</div>
+            {description && (
+              <div className={cn("text-xs text-muted-foreground mt-1", !isExpanded && "line-clamp-2")}>
+                {description}
+              </div>
             )}
           </div>
         </div>
-        {isDirectory && isExpanded && node.children && (
+        {isDirectory && isExpanded && (
           <div>
-            {node.children.map((child) => renderTreeNode(child, fullPath, depth + 1))}
+            {children ? (
+              children.map((child) => renderTreeNode(child, depth + 1))
+            ) : (
+              <div
+                className="py-2 text-xs text-muted-foreground"
+                style={{ paddingLeft: `${(depth + 1) * 16 + 12}px` }}
+              >
+                Loading...
+              </div>
+            )}
           </div>
         )}
       </div>
     )
   }
 
+  const topLevel = levels.get("")
+
   if (loading) {
     return (
       <div className="flex flex-1 flex-col min-w-0 overflow-hidden">
@@ -144,7 +253,7 @@ export function EditorDocs({ projectId }: EditorDocsProps) {
   return (
     <div className="flex flex-1 flex-col min-w-0 overflow-hidden">
       <div className="flex-1 overflow-y-auto scrollbar-thin p-6">
-        {!docs || !docs.file_tree || docs.file_tree.length === 0 ? (
+        {!topLevel || topLevel.length === 0 ? (
           <div className="relative flex items-center justify-center h-full">
             <BackgroundBeams />
             <CodeSnippetCard className="max-w-md w-full relative z-10" showActions={false}>
@@ -173,12 +282,12 @@ export function EditorDocs({ projectId }: EditorDocsProps) {
             <div>
               <H3 className="text-2xl font-semibold mb-2">Documentation</H3>
               <Body className="text-muted-foreground">
-                Generated on {new Date(docs.generated_at).toLocaleDateString()}
+                Generated on {generatedAt && new Date(generatedAt).toLocaleDateString()}
               </Body>
             </div>
             <ScaleCard className="p-4">
               <div className="space-y-1">
-                {docs.file_tree.map((node) => renderTreeNode(node))}
+                {topLevel.map((node) => renderTreeNode(node))}
               </div>
             </ScaleCard>
           </div>
@@ -5,6 +5,7 @@ import { H3, Body, BodySmall } from "./typography"
 import { IconButton } from "./buttons"
 import { BackgroundBeams } from "@/components/ui/background-beams"
 import { api } from "@/lib/api"
+import { useProjectEvents } from "@/hooks/use-project-events"
 import { toast } from "sonner"
 import { cn } from "@/lib/utils"
 import { 
@@ -26,7 +27,8 @@ import {
   Info,
   MessageCircle,
   FilePlus2,
-  BookOpen
+  BookOpen,
+  Search
 } from "lucide-react"
 import {
   DropdownMenu,
@@ -48,12 +50,36 @@ interface PlanMessage {
   created_at: string
 }
 
+interface PlanMessagePage {
+  results: PlanMessage[]
+  next_cursor: string | null
+  has_more: boolean
+}
+
+interface PlanSearchResult {
+  message: PlanMessage
+  rank: number
+  highlight: string
+}
+
+interface PlanSearchPage {
+  results: PlanSearchResult[]
+  next_offset: number | null
+  has_more: boolean
+}
+
 export function EditorPlans({ projectId }: EditorPlansProps) {
   const [messages, setMessages] = useState<PlanMessage[]>([])
   const [loading, setLoading] = useState(true)
+  const [olderCursor, setOlderCursor] = useState<string | null>(null)
+  const [loadingOlder, setLoadingOlder] = useState(false)
   const [inputValue, setInputValue] = useState("")
   const [sending, setSending] = useState(false)
   const [temporaryChat, setTemporaryChat] = useState(false)
+  const [searchQuery, setSearchQuery] = useState("")
+  const [searchResults, setSearchResults] = useState<PlanSearchResult[] | null>(null)
+  const [searchNextOffset, setSearchNextOffset] = useState<number | null>(null)
+  const [searching, setSearching] = useState(false)
   const messagesEndRef = useRef<HTMLDivElement>(null)
   const textareaRef = useRef<HTMLTextAreaElement>(null)
 
@@ -61,9 +87,25 @@ export function EditorPlans({ projectId }: EditorPlansProps) {
     loadMessages()
   }, [projectId])
 
+  // Messages saved elsewhere (other tabs, our own sends) arrive as events;
+  // ids already shown are skipped.
+  useProjectEvents(projectId, (event, data) => {
+    if (event === "plan_message.created") {
+      setMessages((prev) => (prev.some((m) => m.id === data.id) ? prev : [...prev, data]))
+    } else if (event === "plan_message.updated") {
+      setMessages((prev) => prev.map((m) => (m.id === data.id ? data : m)))
+    } else if (event === "plan_message.deleted") {
+      setMessages((prev) => prev.filter((m) => m.id !== data.id))
+    } else if (event === "resync") {
+      loadMessages()
+    }
+  })
+
+  // Only new messages at the end scroll; prepending older history does not.
+  const lastMessageId = messages[messages.length - 1]?.id
   useEffect(() => {
     scrollToBottom()
-  }, [messages])
+  }, [lastMessageId])
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" })
@@ -72,8 +114,9 @@ export function EditorPlans({ projectId }: EditorPlansProps) {
   const loadMessages = async () => {
     try {
       setLoading(true)
-      const data = await api.getPlanMessages(projectId) as PlanMessage[]
-      setMessages(data || [])
+      const data = await api.getPlanMessages(projectId) as PlanMessagePage
+      setMessages(data.results || [])
+      setOlderCursor(data.next_cursor)
     } catch (error: any) {
       console.error("Failed to load messages:", error)
       if (!error.message?.includes("404")) {
@@ -84,6 +127,28 @@ export function EditorPlans({ projectId }: EditorPlansProps) {
     }
   }
 
+  const loadOlderMessages = async () => {
+    if (!olderCursor || loadingOlder) return
+    try {
+      setLoadingOlder(true)
+      const data = await api.getPlanMessages(projectId, olderCursor) as PlanMessagePage
+      setMessages((prev) => [...(data.results || []), ...prev])
+      setOlderCursor(data.next_cursor)
+    } catch (error: any) {
+      toast.error("Failed to load earlier messages")
+    } finally {
+      setLoadingOlder(false)
+    }
+  }
+
+  // Swaps a placeholder for its saved message, which may already have
+  // arrived as an event.
+  const replaceMessage = (placeholderId: number, saved: PlanMessage) => {
+    setMessages((prev) =>
+      prev.filter((m) => m.id !== saved.id).map((m) => (m.id === placeholderId ? saved : m))
+    )
+  }
+
   const handleSendMessage = async () => {
     if (!inputValue.trim() || sending) return
 
@@ -100,20 +165,54 @@ export function EditorPlans({ projectId }: EditorPlansProps) {
       content: message,
       created_at: new Date().toISOString(),
     }
-    setMessages((prev) => [...prev, userMessage])
+    // Filled in as the reply streams, then swapped for the saved message.
+    const draftReply: PlanMessage = {
+      id: userMessage.id + 1,
+      role: "assistant",
+      content: "",
+      created_at: userMessage.created_at,
+    }
+    setMessages((prev) => [...prev, userMessage, draftReply])
     setSending(true)
 
+    let savedUserMessage = false
     try {
-      await api.sendPlanMessage(projectId, message)
-      await loadMessages()
+      const reply = await api.streamPlanReply(projectId, message, {
+        onMessage: (saved: PlanMessage) => {
+          savedUserMessage = true
+          replaceMessage(userMessage.id, saved)
+        },
+        onDelta: (content) => {
+          setMessages((prev) =>
+            prev.map((m) => (m.id === draftReply.id ? { ...m, content: m.content + content } : m))
+          )
+        },
+      }) as PlanMessage
+      replaceMessage(draftReply.id, reply)
     } catch (error: any) {
       toast.error(error.message || "Failed to send message")
-      setMessages((prev) => prev.filter((m) => m.id !== userMessage.id))
+      setMessages((prev) =>
+        prev.filter((m) => m.id !== draftReply.id && (savedUserMessage || m.id !== userMessage.id))
+      )
     } finally {
       setSending(false)
     }
   }
 
+  const runSearch = async (offset = 0) => {
+    if (!searchQuery.trim() || searching) return
+    try {
+      setSearching(true)
+      const data = await api.searchPlanMessages(projectId, searchQuery.trim(), offset) as PlanSearchPage
+      setSearchResults((prev) => (offset > 0 && prev ? [...prev, ...data.results] : data.results))
+      setSearchNextOffset(data.next_offset)
+    } catch (error: any) {
+      toast.error(error.message || "Search failed")
+    } finally {
+      setSearching(false)
+    }
+  }
+
   const handleKeyDown = (e: React.KeyboardEvent) => {
     if (e.key === "Enter" && !e.shiftKey) {
       e.preventDefault()
@@ -181,42 +280,96 @@ export function EditorPlans({ projectId }: EditorPlansProps) {
           </DropdownMenuContent>
         </DropdownMenu>
 
-        {/* User Avatar Dropdown */}
-        <DropdownMenu>
-          <DropdownMenuTrigger asChild>
-            <button className="flex items-center justify-center w-8 h-8 rounded-full bg-primary text-primary-foreground font-medium text-sm hover:opacity-90 transition-opacity">
-              A
-            </button>
-          </DropdownMenuTrigger>
-          <DropdownMenuContent align="end" className="w-56 backdrop-blur-xl bg-popover/90 border-border/50 shadow-xl">
-            <DropdownMenuItem className="flex items-center gap-3">
-              <Sparkles className="w-4 h-4" />
-              <span>My GPTs</span>
-            </DropdownMenuItem>
-            <DropdownMenuItem className="flex items-center gap-3">
-              <Settings className="w-4 h-4" />
-              <span>Customize ChatGPT</span>
-            </DropdownMenuItem>
-            <DropdownMenuItem className="flex items-center gap-3">
-              <Settings className="w-4 h-4" />
-              <span>Settings</span>
-            </DropdownMenuItem>
-            <DropdownMenuSeparator />
-            <DropdownMenuItem className="flex items-center gap-3">
-              <Laptop className="w-4 h-4" />
-              <span>Download the macOS app</span>
-            </DropdownMenuItem>
-            <DropdownMenuItem className="flex items-center gap-3">
-              <Cloud className="w-4 h-4" />
-              <span>Upgrade plan</span>
-            </DropdownMenuItem>
-            <DropdownMenuSeparator />
-            <DropdownMenuItem className="flex items-center gap-3 text-destructive">
-              <LogOut className="w-4 h-4" />
-              <span>Log out</span>
-            </DropdownMenuItem>
-          </DropdownMenuContent>
-        </DropdownMenu>
+        <div className="flex items-center gap-2">
+          {/* Chat Search */}
+          <DropdownMenu>
+            <DropdownMenuTrigger asChild>
+              <IconButton variant="ghost" size="sm" aria-label="Search this chat">
+                <Search className="w-4 h-4" />
+              </IconButton>
+            </DropdownMenuTrigger>
+            <DropdownMenuContent align="end" className="w-96 max-h-[70vh] overflow-y-auto scrollbar-thin backdrop-blur-xl bg-popover/90 border-border/50 shadow-xl">
+              <div className="p-2">
+                <input
+                  value={searchQuery}
+                  onChange={(e) => setSearchQuery(e.target.value)}
+                  onKeyDown={(e) => {
+                    // Keep the menu's typeahead from taking the keystrokes.
+                    e.stopPropagation()
+                    if (e.key === "Enter") runSearch()
+                  }}
+                  placeholder='Search this chat, "exact phrase"'
+                  className="w-full rounded-lg border border-border/50 bg-transparent px-3 py-2 text-sm text-foreground placeholder:text-muted-foreground focus:outline-none focus:border-primary/50"
+                />
+              </div>
+              {searchResults?.length === 0 && (
+                <div className="px-3 py-2">
+                  <BodySmall className="text-muted-foreground">No matching messages</BodySmall>
+                </div>
+              )}
+              {searchResults?.map((result) => (
+                <DropdownMenuItem key={result.message.id} className="flex flex-col items-start gap-1 px-3 py-2">
+                  <BodySmall className="text-muted-foreground">
+                    {result.message.role === "user" ? "You" : "Assistant"} · {new Date(result.message.created_at).toLocaleDateString()}
+                  </BodySmall>
+                  {/* Escaped by the server; only <mark> tags are markup. */}
+                  <span
+                    className="text-sm text-foreground [&_mark]:bg-primary/30 [&_mark]:text-foreground [&_mark]:rounded-sm"
+                    dangerouslySetInnerHTML={{ __html: result.highlight }}
+                  />
+                </DropdownMenuItem>
+              ))}
+              {searchNextOffset !== null && (
+                <DropdownMenuItem
+                  className="justify-center text-sm text-muted-foreground"
+                  onSelect={(e) => {
+                    e.preventDefault()
+                    runSearch(searchNextOffset)
+                  }}
+                >
+                  {searching ? "Searching..." : "More results"}
+                </DropdownMenuItem>
+              )}
+            </DropdownMenuContent>
+          </DropdownMenu>
+
+          {/* User Avatar Dropdown */}
+          <DropdownMenu>
+            <DropdownMenuTrigger asChild>
+              <button className="flex items-center justify-center w-8 h-8 rounded-full bg-primary text-primary-foreground font-medium text-sm hover:opacity-90 transition-opacity">
+                A
+              </button>
+            </DropdownMenuTrigger>
+            <DropdownMenuContent align="end" className="w-56 backdrop-blur-xl bg-popover/90 border-border/50 shadow-xl">
+              <DropdownMenuItem className="flex items-center gap-3">
+                <Sparkles className="w-4 h-4" />
+                <span>My GPTs</span>
+              </DropdownMenuItem>
+              <DropdownMenuItem className="flex items-center gap-3">
+                <Settings className="w-4 h-4" />
+                <span>Customize ChatGPT</span>
+              </DropdownMenuItem>
+              <DropdownMenuItem className="flex items-center gap-3">
+                <Settings className="w-4 h-4" />
+                <span>Settings</span>
+              </DropdownMenuItem>
+              <DropdownMenuSeparator />
+              <DropdownMenuItem className="flex items-center gap-3">
+                <Laptop className="w-4 h-4" />
+                <span>Download the macOS app</span>
+              </DropdownMenuItem>
+              <DropdownMenuItem className="flex items-center gap-3">
+                <Cloud className="w-4 h-4" />
+                <span>Upgrade plan</span>
+              </DropdownMenuItem>
+              <DropdownMenuSeparator />
+              <DropdownMenuItem className="flex items-center gap-3 text-destructive">
+                <LogOut className="w-4 h-4" />
+                <span>Log out</span>
+              </DropdownMenuItem>
+            </DropdownMenuContent>
+          </DropdownMenu>
+        </div>
       </div>
 
       {/* Main Content Area */}
@@ -299,6 +452,17 @@ export function EditorPlans({ projectId }: EditorPlansProps) {
           </div>
         ) : (
           <div className="max-w-3xl mx-auto py-6 px-4">
+            {olderCursor && (
+              <div className="flex justify-center mb-4">
+                <button
+                  onClick={loadOlderMessages}
+                  disabled={loadingOlder}
+                  className="text-sm text-muted-foreground hover:text-foreground transition-colors"
+                >
+                  {loadingOlder ? "Loading..." : "Load earlier messages"}
+                </button>
+              </div>
+            )}
             {messages.map((message) => (
               <div
                 key={message.id}
@@ -8,6 +8,7 @@ import { H3, Body } from "./typography"
 import { CodeSnippetCard } from "./CodeSnippetCard"
 import { BackgroundBeams } from "@/components/ui/background-beams"
 import { api } from "@/lib/api"
+import { useProjectEvents } from "@/hooks/use-project-events"
 import { toast } from "sonner"
 import { Plus } from "lucide-react"
 import { Checkbox } from "@/components/ui/checkbox"
@@ -21,9 +22,14 @@ interface StatusItem {
   title: string
   description: string
   completed: boolean
+  position: number
   created_at: string
 }
 
+// Board order, as the API returns it: position, then newest first.
+const byPosition = (a: StatusItem, b: StatusItem) =>
+  a.position - b.position || b.created_at.localeCompare(a.created_at)
+
 export function EditorStatus({ projectId }: EditorStatusProps) {
   const [items, setItems] = useState<StatusItem[]>([])
   const [loading, setLoading] = useState(true)
@@ -36,6 +42,18 @@ export function EditorStatus({ projectId }: EditorStatusProps) {
     loadItems()
   }, [projectId])
 
+  useProjectEvents(projectId, (event, data) => {
+    if (event === "status_item.created") {
+      setItems((prev) => (prev.some((item) => item.id === data.id) ? prev : [...prev, data].sort(byPosition)))
+    } else if (event === "status_item.updated") {
+      setItems((prev) => prev.map((item) => (item.id === data.id ? data : item)).sort(byPosition))
+    } else if (event === "status_item.deleted") {
+      setItems((prev) => prev.filter((item) => item.id !== data.id))
+    } else if (event === "resync") {
+      loadItems()
+    }
+  })
+
   const loadItems = async () => {
     try {
       setLoading(true)
@@ -74,7 +92,7 @@ export function EditorStatus({ projectId }: EditorStatusProps) {
         description: newItemDescription,
       }) as StatusItem
       
-      setItems((prev) => [newItem, ...prev])
+      setItems((prev) => [newItem, ...prev.filter((item) => item.id !== newItem.id)])
       setNewItemTitle("")
       setNewItemDescription("")
       setShowAddForm(false)
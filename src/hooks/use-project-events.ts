@@ -0,0 +1,17 @@
+import * as React from "react";
+
+import { api } from "@/lib/api";
+
+// Calls onEvent for each change event on the project (see api.subscribeProjectEvents).
+export function useProjectEvents(
+  projectId: number | undefined,
+  onEvent: (event: string, data: any) => void,
+) {
+  const handlerRef = React.useRef(onEvent);
+  handlerRef.current = onEvent;
+
+  React.useEffect(() => {
+    if (!projectId) return;
+    return api.subscribeProjectEvents(projectId, (event, data) => handlerRef.current(event, data));
+  }, [projectId]);
+}
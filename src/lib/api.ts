@@ -6,9 +6,15 @@ interface ApiResponse<T = any> {
   message?: string;
 }
 
+interface ProjectEventStream {
+  listeners: Set<(event: string, data: any) => void>;
+  controller: AbortController;
+}
+
 class ApiClient {
   private baseURL: string;
   private token: string | null = null;
+  private projectStreams = new Map<number, ProjectEventStream>();
 
   constructor(baseURL: string) {
     this.baseURL = baseURL;
@@ -222,16 +228,191 @@ class ApiClient {
     return this.request('/referrals/stats/');
   }
 
+  // Background jobs: slow endpoints return 202 with a job to poll
+  async getJob(jobId: number) {
+    return this.request<any>(`/jobs/${jobId}/`);
+  }
+
+  // Rejects if no worker has picked the job up within startTimeoutMs (the
+  // worker is probably not running) or it has not finished by timeoutMs.
+  async waitForJob(
+    jobId: number,
+    { intervalMs = 1000, startTimeoutMs = 30_000, timeoutMs = 10 * 60_000 } = {},
+  ) {
+    const startedWaiting = Date.now();
+    for (;;) {
+      const job = await this.getJob(jobId);
+      if (job.status === 'succeeded') {
+        return job.result;
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Job failed');
+      }
+      const waited = Date.now() - startedWaiting;
+      if (job.status === 'queued' && job.attempts === 0 && waited > startTimeoutMs) {
+        throw new Error('The job has not started; is the background worker (manage.py run_jobs) running?');
+      }
+      if (waited > timeoutMs) {
+        throw new Error(`Job ${jobId} is still ${job.status} after ${Math.round(timeoutMs / 1000)}s`);
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  }
+
   // Prompt generation endpoint
   async generatePrompts(projectId: number) {
-    return this.request(`/projects/${projectId}/generate-prompts/`, {
+    const response = await this.request<any>(`/projects/${projectId}/generate-prompts/`, {
+      method: 'POST',
+    });
+    // Unchanged or cached specs are answered directly; misses are queued.
+    return response.job ? this.waitForJob(response.job.id) : response;
+  }
+
+  // Parses a server-sent event stream into { event, data } pairs.
+  private async *readEvents(body: ReadableStream<Uint8Array>) {
+    const reader = body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) {
+        return;
+      }
+      buffer += decoder.decode(value, { stream: true });
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const raw = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        if (raw.startsWith(':')) {
+          continue; // keepalive comment
+        }
+        const event = raw.match(/^event: (.*)$/m)?.[1] || 'message';
+        const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}');
+        yield { event, data };
+      }
+    }
+  }
+
+  // POSTs to an SSE endpoint and calls onEvent for each event until `done`,
+  // whose data is returned; an `error` event rejects.
+  private async streamEvents(endpoint: string, body: any, onEvent: (event: string, data: any) => void) {
+    const headers: HeadersInit = { 'Content-Type': 'application/json' };
+    if (this.token) {
+      headers['Authorization'] = `Bearer ${this.token}`;
+    }
+    const response = await fetch(`${this.baseURL}${endpoint}`, {
       method: 'POST',
+      headers,
+      body: JSON.stringify(body ?? {}),
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Streaming failed with status ${response.status}`);
+    }
+
+    for await (const { event, data } of this.readEvents(response.body)) {
+      if (event === 'done') {
+        return data;
+      }
+      if (event === 'error') {
+        throw new Error(data.error || data.message);
+      }
+      onEvent(event, data);
+    }
+    throw new Error('Stream ended before it finished');
+  }
+
+  // Project change events (plan_message.created, status_item.updated,
+  // documentation.updated, project.updated, ...). One connection per project
+  // is shared by every listener and reconnects when dropped; listeners get
+  // `resync` when events may have been missed and should reload.
+  // Returns a function that removes the listener.
+  subscribeProjectEvents(projectId: number, onEvent: (event: string, data: any) => void) {
+    let stream = this.projectStreams.get(projectId);
+    if (!stream) {
+      stream = { listeners: new Set(), controller: new AbortController() };
+      this.projectStreams.set(projectId, stream);
+      this.runProjectEvents(projectId, stream);
+    }
+    stream.listeners.add(onEvent);
+    return () => {
+      stream!.listeners.delete(onEvent);
+      if (stream!.listeners.size === 0) {
+        stream!.controller.abort();
+        this.projectStreams.delete(projectId);
+      }
+    };
+  }
+
+  private async runProjectEvents(projectId: number, stream: ProjectEventStream) {
+    let retryMs = 1000;
+    let connectedBefore = false;
+    while (!stream.controller.signal.aborted) {
+      try {
+        const headers: HeadersInit = {};
+        if (this.token) {
+          headers['Authorization'] = `Bearer ${this.token}`;
+        }
+        const response = await fetch(`${this.baseURL}/projects/${projectId}/events/`, {
+          headers,
+          signal: stream.controller.signal,
+        });
+        if (response.status === 401 || response.status === 404 || !response.body) {
+          return;
+        }
+        for await (const { event, data } of this.readEvents(response.body)) {
+          if (event === 'ready') {
+            retryMs = 1000;
+            // Changes made while disconnected were not delivered.
+            if (connectedBefore) {
+              stream.listeners.forEach((listener) => listener('resync', {}));
+            }
+            connectedBefore = true;
+            continue;
+          }
+          stream.listeners.forEach((listener) => listener(event, data));
+        }
+      } catch (error) {
+        if (stream.controller.signal.aborted) {
+          return;
+        }
+      }
+      await new Promise((resolve) => setTimeout(resolve, retryMs));
+      retryMs = Math.min(retryMs * 2, 30000);
+    }
+  }
+
+  // Streams generation as server-sent events; onDelta receives each piece.
+  async streamPrompts(projectId: number, onDelta: (content: string) => void) {
+    return this.streamEvents(`/projects/${projectId}/generate-prompts/stream/`, {}, (event, data) => {
+      if (event === 'delta') onDelta(data.content);
     });
   }
 
   // Plans/Chat endpoints
-  async getPlanMessages(projectId: number) {
-    return this.request(`/projects/${projectId}/plans/messages/`);
+  // Newest `limit` messages, or the page before `before` (a previous next_cursor)
+  async getPlanMessages(projectId: number, before?: string | null, limit = 50) {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (before) params.append('before', before);
+    return this.request(`/projects/${projectId}/plans/messages/?${params}`);
+  }
+
+  // Ranked full-text search; each result's `highlight` is escaped HTML with
+  // matches wrapped in <mark>.
+  async searchPlanMessages(projectId: number, query: string, offset = 0, limit = 20) {
+    const params = new URLSearchParams({ q: query, offset: String(offset), limit: String(limit) });
+    return this.request(`/projects/${projectId}/plans/search/?${params}`);
+  }
+
+  // Sends a message and streams the assistant's reply; resolves to the saved reply.
+  async streamPlanReply(
+    projectId: number,
+    message: string,
+    handlers: { onMessage?: (message: any) => void; onDelta?: (content: string) => void } = {}
+  ) {
+    return this.streamEvents(`/projects/${projectId}/plans/messages/stream/`, { content: message }, (event, data) => {
+      if (event === 'message') handlers.onMessage?.(data);
+      if (event === 'delta') handlers.onDelta?.(data.content);
+    });
   }
 
   async sendPlanMessage(projectId: number, message: string) {
@@ -260,16 +441,49 @@ class ApiClient {
     });
   }
 
+  // Creates many items in one request, in order, above the existing ones.
+  // Fails as a whole with per-item `errors` if any item is invalid.
+  async createStatusItems(
+    projectId: number,
+    items: { title: string; description?: string; completed?: boolean; position?: number }[]
+  ) {
+    return this.request(`/projects/${projectId}/status/items/bulk/`, {
+      method: 'POST',
+      body: JSON.stringify({ items }),
+    });
+  }
+
+  // Partial updates by id, e.g. toggling `completed` or reordering by `position`.
+  async updateStatusItems(
+    projectId: number,
+    items: { id: number; title?: string; description?: string; completed?: boolean; position?: number }[]
+  ) {
+    return this.request(`/projects/${projectId}/status/items/bulk/`, {
+      method: 'PATCH',
+      body: JSON.stringify({ items }),
+    });
+  }
+
   // Documentation endpoints
   async initializeDocs(projectId: number) {
-    return this.request(`/projects/${projectId}/docs/initialize/`, {
+    const { job } = await this.request<any>(`/projects/${projectId}/docs/initialize/`, {
       method: 'POST',
     });
+    return this.waitForJob(job.id);
   }
 
   async getDocs(projectId: number) {
     return this.request(`/projects/${projectId}/docs/`);
   }
+
+  async getDocNodes(projectId: number, path = '', depth = 1) {
+    const params = new URLSearchParams({ path, depth: String(depth) });
+    return this.request(`/projects/${projectId}/docs/nodes/?${params}`);
+  }
+
+  async getDocNode(projectId: number, nodeId: number) {
+    return this.request(`/projects/${projectId}/docs/nodes/${nodeId}/`);
+  }
 }
 
 export const api = new ApiClient(API_BASE_URL);
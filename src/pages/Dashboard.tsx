@@ -32,6 +32,7 @@ function JobCard({
   role,
   status,
   location,
+  progress,
   onClick,
 }: {
   icon: React.ReactNode
@@ -39,6 +40,7 @@ function JobCard({
   role: string
   status: string
   location: string
+  progress?: { completed: number; total: number }
   onClick?: () => void
 }) {
   // Map project status to StatusBadge status
@@ -98,6 +100,19 @@ function JobCard({
           label={getStatusLabel(status)}
           className="px-2"
         />
+        {progress && progress.total > 0 && (
+          <div className="flex flex-col gap-1">
+            <span className="text-xs text-muted-foreground">
+              {progress.completed}/{progress.total} done
+            </span>
+            <div className="h-1 w-full rounded-full bg-secondary overflow-hidden">
+              <div
+                className="h-full rounded-full bg-primary transition-all"
+                style={{ width: `${Math.round((progress.completed / progress.total) * 100)}%` }}
+              />
+            </div>
+          </div>
+        )}
         <div className="flex items-center gap-1.5 text-xs text-muted-foreground">
           <MapPin className="w-3 h-3" />
           <span>{location}</span>
@@ -107,6 +122,17 @@ function JobCard({
   )
 }
 
+// Progress and last activity come precomputed with each project in the list.
+const projectProgress = (project: any) => ({
+  completed: project.status_items_completed || 0,
+  total: project.status_items_total || 0,
+})
+
+const lastActivity = (project: any) =>
+  [project.updated_at, project.last_message_at, project.docs_updated_at, project.created_at]
+    .filter(Boolean)
+    .reduce((latest: string, value: string) => (value > latest ? value : latest))
+
 // ============================================
 // CREATE PROJECT CARD COMPONENT
 // ============================================
@@ -258,7 +284,8 @@ export default function Dashboard() {
                     company={project.name}
                     role={project.output_type || "Project"}
                     status={project.status}
-                    location={new Date(project.created_at).toLocaleDateString()}
+                    location={new Date(lastActivity(project)).toLocaleDateString()}
+                    progress={projectProgress(project)}
                     onClick={() => {
                       if (project.id) {
                         navigate(`/editor/${project.id}`)
@@ -283,7 +310,8 @@ export default function Dashboard() {
                       company={project.name}
                       role={project.output_type || "Project"}
                       status={project.status}
-                      location={new Date(project.created_at).toLocaleDateString()}
+                      location={new Date(lastActivity(project)).toLocaleDateString()}
+                      progress={projectProgress(project)}
                       onClick={() => {
                         if (project.id) {
                           navigate(`/editor/${project.id}/library`)
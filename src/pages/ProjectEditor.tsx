@@ -10,6 +10,7 @@ import { EditorStatus } from "@/components/scale/EditorStatus"
 import { EditorDocs } from "@/components/scale/EditorDocs"
 import { SimpleHeader } from "@/components/scale/header"
 import { api } from "@/lib/api"
+import { useProjectEvents } from "@/hooks/use-project-events"
 import { toast } from "sonner"
 
 // TypeScript types
@@ -147,6 +148,24 @@ export default function ProjectEditor() {
   }, [id, navigate, generatePrompts])
 
 
+  // Changes saved elsewhere (another tab, a background job). Events for our
+  // own saves carry the updated_at we already have and are ignored.
+  useProjectEvents(project?.id, async (event, data) => {
+    if (event !== "project.updated" && event !== "resync") return
+    if (event === "project.updated" && data.updated_at === project?.updated_at) return
+    if (event === "project.updated" && !data.content_changed) {
+      const { content_changed, ...fields } = data
+      setProject((prev) => (prev && prev.id === data.id ? { ...prev, ...fields } : prev))
+      return
+    }
+    try {
+      const updatedProject = await api.getProject(project!.id) as Project
+      setProject((prev) => (prev && prev.id === updatedProject.id ? updatedProject : prev))
+    } catch (error) {
+      console.error("Failed to refresh project:", error)
+    }
+  })
+
   if (loading) {
     return <ProjectEditorSkeleton />;
   }